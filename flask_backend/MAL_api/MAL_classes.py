@@ -1,19 +1,37 @@
 # native imports
 
+from codecs import getincrementaldecoder
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from requests import get, Response, HTTPError
-from typing import Any
+from requests import Response, HTTPError
+from requests.exceptions import JSONDecodeError as ResponseJSONDecodeError
+from threading import Lock
+from typing import Any, Callable, Iterable, Iterator
 from urllib.parse import quote
 
 # local imports
 
+from .cache import get_default_cache, get_default_details_cache
+from .client import MALClient, get_default_client
+from .codec import loads
+from .coalesce import SingleFlight
+from .columns import AnimeListColumns
 from .constants import (
     ANIME_DEFAULT_ATTRIBUTES,
+    ANIMEDETAILSNODE_ATTRIBUTES,
+    ANIMELISTNODE_ATTRIBUTES,
     ANIMELISTNODE_OPTIONAL_ATTRIBUTES,
     ANIMEDETAILSNODE_OPTIONAL_ATTRIBUTES,
-    MAL_ANIME_ENDPOINT
+    MAL_ANIME_ENDPOINT,
+    MAL_BATCH_MAX_WORKERS,
+    MAL_LAZY_NODES,
+    MAL_RANKING_MAX_LIMIT,
+    MAL_RANKING_TYPES,
+    MAL_STREAM_CHUNK_SIZE
 )
-from .key import APIKey
+from .key import get_default_credentials
+from .rate_limit import BACKGROUND
+from .streaming import ListStreamDecoder
 from .MAL_exceptions import (
     AnimeDetailsGetAttributeError,
     AnimeListGetAttributeError,
@@ -24,8 +42,475 @@ from .MAL_exceptions import (
     InvalidAnimeListLimitRangeError,
     InvalidAnimeListOffsetRangeError,
     InvalidAnimeListQError,
+    InvalidAnimeRankingTypeError,
 )
 
+# identical queries in flight share one upstream request
+_inflight : SingleFlight = SingleFlight()
+
+# every field a node can hold
+_ANIMEDETAILS_FIELDS : frozenset[str] = frozenset(ANIMEDETAILSNODE_ATTRIBUTES)
+_ANIMELISTNODE_FIELDS : frozenset[str] = frozenset(ANIMELISTNODE_ATTRIBUTES)
+
+# compact AnimeListNode classes keyed by their attributes and mode
+_node_classes : dict[tuple[tuple[str, ...], bool], type] = dict()
+_node_classes_lock : Lock = Lock()
+
+# helpers
+
+def _validate_anime_id(anime_id : int) -> None :
+    """
+    _validate_anime_id (private function)
+
+    Verifies the anime id is within the valid range before any query is sent.
+
+    Parameters
+    ----------
+    anime_id : int
+        The anime id in question.
+
+    Raises
+    ------
+    InvalidAnimeDetailsAnimeIdError
+        The anime_id is not posative.
+    """
+    if anime_id <= 0 : 
+        raise InvalidAnimeDetailsAnimeIdError(anime_id)
+
+def _validate_attributes(attributes : list[str],
+                         optional_attributes : list[str],
+                         attribute_error : type[Exception]
+                         ) -> list[str] :
+    """
+    _validate_attributes (private function)
+
+    Builds the final attribute list for a query. The default attributes are
+    always included and any attribute that is invalid or already a default is
+    reported and dropped.
+
+    Parameters
+    ----------
+    attributes : list[str]
+        The attributes requested by the caller.
+    optional_attributes : list[str]
+        The optional attributes available for the query type.
+    attribute_error : type[Exception]
+        The exception reported for an invalid attribute.
+
+    Returns
+    -------
+    list[str]
+        The default attributes followed by the valid requested attributes.
+    """
+    fin_attributes = ANIME_DEFAULT_ATTRIBUTES[:]
+    for attribute in attributes :
+        try :
+            if attribute not in optional_attributes or attribute in ANIME_DEFAULT_ATTRIBUTES:
+                raise attribute_error(attribute)
+            else :
+                fin_attributes.append(attribute)
+        except attribute_error as error :
+            print(error)
+    return fin_attributes
+
+def _validate_list_range(limit : int, offset : int) -> tuple[int, int] :
+    """
+    _validate_list_range (private function)
+
+    Verifies the limit and offset of an AnimeList query, falling back to the
+    defaults when either is out of range.
+
+    Parameters
+    ----------
+    limit : int
+        The requested limit.
+    offset : int
+        The requested offset.
+
+    Returns
+    -------
+    tuple[int, int]
+        The (limit, offset) pairing used for the query.
+    """
+    try :
+        if limit > 100 or limit <= 0 :
+            raise InvalidAnimeListLimitRangeError()
+    except InvalidAnimeListLimitRangeError as error :
+        print(error)
+        limit = 100
+
+    try :
+        if offset < 0 :
+            raise InvalidAnimeListOffsetRangeError()
+    except InvalidAnimeListOffsetRangeError as error :
+        print(error)
+        offset = 0
+
+    return (limit, offset)
+
+def _anime_details_url(anime_id : int, attributes : list[str]) -> str :
+    """
+    _anime_details_url (private function)
+
+    Builds the url for an AnimeDetails query.
+    """
+    fields : str = ','.join(attributes)
+    return ''.join([
+        MAL_ANIME_ENDPOINT,
+        f'/{anime_id}',
+        '?',
+        f'fields={fields}' if len(attributes) > 0 else ''
+    ])
+
+def _anime_list_url(q : str, limit : int, offset : int, attributes : list[str]) -> str :
+    """
+    _anime_list_url (private function)
+
+    Builds the url for an AnimeList query.
+    """
+    fields : str = ','.join(attributes)
+    return ''.join([
+        MAL_ANIME_ENDPOINT,
+        '?',
+        f'q={quote(q)}',
+        f'&limit={limit}',
+        f'&offset={offset}',
+        f'&fields={fields}' if len(attributes) > 0 else ''
+    ])
+
+def _anime_ranking_url(ranking_type : str, limit : int, offset : int, attributes : list[str]) -> str :
+    """
+    _anime_ranking_url (private function)
+
+    Builds the url for an anime ranking query.
+    """
+    fields : str = ','.join(attributes)
+    return ''.join([
+        MAL_ANIME_ENDPOINT,
+        '/ranking',
+        '?',
+        f'ranking_type={ranking_type}',
+        f'&limit={limit}',
+        f'&offset={offset}',
+        f'&fields={fields}' if len(attributes) > 0 else ''
+    ])
+
+def _client_id_header() -> dict[str, str] :
+    """
+    _client_id_header (private function)
+
+    Builds the header authenticating a query with the client id.
+    """
+    return {'X-MAL-CLIENT-ID' : f'{get_default_credentials().getKey()[0]}'}
+
+def _query(client : MALClient, url : str) -> dict[str, Any] :
+    """
+    _query (private function)
+
+    Submits a query through MAL and returns the decoded json body.
+
+    Parameters
+    ----------
+    client : MALClient
+        The client used to submit the query.
+    url : str
+        The full url of the query.
+
+    Returns
+    -------
+    dict[str, Any]
+        The json object from the https GET response.
+
+    Raises
+    ------
+    HTTPError
+        HTTPError extension for cases where raised response code not being 200.
+    """
+    response : Response = client.get(url, headers=_client_id_header())
+    try :
+        raw : dict[str, Any] = loads(response.content)
+    except ValueError as error :
+        # a body that is not json, such as a proxy error page
+        response.raise_for_status()
+        raise ResponseJSONDecodeError(str(error), response.text, 0)
+    response.raise_for_status()
+    return raw
+
+def _query_anime_list(client : MALClient, url : str) -> dict[str, Any] :
+    """
+    _query_anime_list (private function)
+
+    Submits an AnimeList query through MAL.
+
+    Raises
+    ------
+    InvalidAnimeListQError
+        MAL rejected the query string.
+    HTTPError
+        HTTPError extension for cases where raised response code not being 200.
+    """
+    try :
+        return _query(client, url)
+    except HTTPError as QueryException :
+        _raise_anime_list_error(QueryException)
+
+def _raise_anime_list_error(error : HTTPError) -> None :
+    """
+    _raise_anime_list_error (private function)
+
+    Re-raises the HTTPError of an AnimeList query, as InvalidAnimeListQError
+    when MAL rejected the query string. An error body that is not json, such
+    as a proxy error page, keeps the HTTPError.
+
+    Raises
+    ------
+    InvalidAnimeListQError
+        MAL rejected the query string.
+    HTTPError
+        Any other error.
+    """
+    try :
+        message = loads(error.response.content).get('message')
+    except (AttributeError, ValueError) :
+        message = None
+    if message == 'invalid q' :
+        raise InvalidAnimeListQError
+    raise error
+
+def _details_key(anime_id : int, attributes : list[str]) -> tuple :
+    """
+    _details_key (private function)
+
+    Builds the canonical key of an AnimeDetails query.
+    """
+    return ('anime', anime_id, None, None, tuple(sorted(attributes)))
+
+def _list_key(q : str, limit : int, offset : int, attributes : list[str]) -> tuple :
+    """
+    _list_key (private function)
+
+    Builds the canonical key of an AnimeList query.
+    """
+    return ('anime_list', q, limit, offset, tuple(sorted(attributes)))
+
+def _cached_query(key : tuple, query : Callable, client : MALClient, url : str) -> dict[str, Any] :
+    """
+    _cached_query (private function)
+
+    Serves a query from the response cache when possible. On a miss the
+    query is sent upstream, with concurrent callers for the same key sharing
+    a single request, and the result is cached for the next caller.
+    """
+    raw : dict[str, Any] | None = get_default_cache().get(key)
+    if raw is not None :
+        return raw
+
+    def _fill() -> dict[str, Any] :
+        raw = query(client, url)
+        get_default_cache().put(key, raw)
+        return raw
+
+    return _inflight.do(key, _fill)
+
+def _cached_details_node(anime_id : int,
+                         attributes : list[str],
+                         memory_only : bool = False
+                         ) -> dict[str, Any] | None :
+    """
+    _cached_details_node (private function)
+
+    Looks up the node of an AnimeDetails query in the details cache only.
+    With memory_only set the disk tier is skipped, so it is safe to call on an
+    event loop.
+    """
+    return get_default_details_cache().lookup(anime_id, attributes, memory_only)[0]
+
+def _fetch_details_node(anime_id : int,
+                        attributes : list[str],
+                        client : MALClient,
+                        cache : bool = True
+                        ) -> dict[str, Any] :
+    """
+    _fetch_details_node (private function)
+
+    Queries the node of an AnimeDetails object through the details cache. Any
+    request whose fields are already cached is answered from the cache, and
+    otherwise only the missing fields are fetched and merged into the entry.
+    Concurrent callers missing the same fields share a single request. With
+    cache set to False the node is queried directly and never stored, for
+    one-shot bulk jobs that would otherwise evict the interactive working set.
+    """
+    if not cache :
+        return _query(client, _anime_details_url(anime_id, attributes))
+
+    details_cache = get_default_details_cache()
+    raw_node, missing = details_cache.lookup(anime_id, attributes)
+    if raw_node is not None :
+        return raw_node
+
+    # the default attributes are always returned by MAL
+    fetch_attributes : list[str] = ANIME_DEFAULT_ATTRIBUTES + sorted(
+        attr for attr in set(missing) if attr not in ANIME_DEFAULT_ATTRIBUTES
+    )
+
+    def _fill() -> dict[str, Any] :
+        node = _query(client, _anime_details_url(anime_id, fetch_attributes))
+        return details_cache.merge(anime_id, fetch_attributes, node)
+
+    node = _inflight.do(_details_key(anime_id, fetch_attributes), _fill)
+    return details_cache.project(node, attributes)
+
+def _cached_list_data(q : str,
+                      limit : int,
+                      offset : int,
+                      attributes : list[str],
+                      memory_only : bool = False
+                      ) -> dict[str, Any] | None :
+    """
+    _cached_list_data (private function)
+
+    Looks up the result of an AnimeList page in the response cache only. With
+    memory_only set the disk tier is skipped, so it is safe to call on an
+    event loop.
+    """
+    return get_default_cache().get(_list_key(q, limit, offset, attributes), memory_only)
+
+def _fetch_list_data(q : str,
+                     limit : int,
+                     offset : int,
+                     attributes : list[str],
+                     client : MALClient
+                     ) -> dict[str, Any] :
+    """
+    _fetch_list_data (private function)
+
+    Queries the result of an AnimeList page through the response cache.
+    """
+    url : str = _anime_list_url(q, limit, offset, attributes)
+    return _cached_query(_list_key(q, limit, offset, attributes), _query_anime_list, client, url)
+
+def _build_anime_details(anime_id : int,
+                         attributes : list[str],
+                         raw_node : dict[str, Any]
+                         ) -> 'AnimeDetails' :
+    """
+    _build_anime_details (private function)
+
+    Builds an AnimeDetails object from a node that was already queried, so
+    paths that submit the query themselves do not query MAL a second time.
+    """
+    details : AnimeDetails = AnimeDetails.__new__(AnimeDetails)
+    object.__setattr__(details, 'anime_id', anime_id)
+    object.__setattr__(details, 'attributes', attributes)
+    _load_node(details, raw_node, MAL_LAZY_NODES)
+    return details
+
+def _fetch_anime_details(anime_id : int,
+                         attributes : list[str],
+                         client : MALClient,
+                         cache : bool
+                         ) -> 'AnimeDetails' :
+    """
+    _fetch_anime_details (private function)
+
+    Builds an AnimeDetails object from validated attributes, optionally
+    bypassing the details cache.
+    """
+    _validate_anime_id(anime_id)
+    raw_node : dict[str, Any] = _fetch_details_node(anime_id, attributes, client, cache)
+    return _build_anime_details(anime_id, attributes, raw_node)
+
+def _build_anime_list(q : str,
+                      limit : int,
+                      offset : int,
+                      attributes : list[str],
+                      raw_data : dict[str, Any]
+                      ) -> 'AnimeList' :
+    """
+    _build_anime_list (private function)
+
+    Builds an AnimeList object from a query result that was already received.
+    """
+    anime_list : AnimeList = AnimeList.__new__(AnimeList)
+    object.__setattr__(anime_list, 'q', q)
+    object.__setattr__(anime_list, 'limit', limit)
+    object.__setattr__(anime_list, 'offset', offset)
+    object.__setattr__(anime_list, 'attributes', attributes)
+    _load_list(anime_list, raw_data)
+    return anime_list
+
+def _load_node(obj : Any, raw_node : dict[str, Any], lazy : bool) -> None :
+    """
+    _load_node (private function)
+
+    Stores the raw node and, unless lazy, copies out the attributes aquired
+    from the query. Lazy objects resolve them from the raw node on access.
+    """
+    object.__setattr__(obj, 'raw_node', raw_node)
+    if lazy :
+        return
+    for attribute in obj.attributes :
+        object.__setattr__(obj, attribute, raw_node.get(attribute, None))
+
+def _load_list(anime_list : 'AnimeList', raw_data : dict[str, Any]) -> None :
+    """
+    _load_list (private function)
+
+    Stores the raw query result along with its paging and AnimeListNode data.
+    """
+    object.__setattr__(anime_list, 'raw_data', raw_data)
+
+    # put the paging dictionary with the paging attribute
+    object.__setattr__(anime_list, 'paging', raw_data['paging'])
+
+    # populate the data attribute
+    data_array : list[AnimeListNode] = []
+    for raw_node in raw_data['data'] :
+        data_array.append(AnimeListNode(raw_node['node'], anime_list.attributes))
+    object.__setattr__(anime_list, 'data', data_array)
+
+def _node_class(attributes : list[str], lazy : bool) -> type['AnimeListNode'] :
+    """
+    _node_class (private function)
+
+    Returns the AnimeListNode subclass for a list of queried attributes, so the
+    nodes of a large list stay as small as possible. Eager nodes hold one slot
+    per queried attribute and nothing else. Lazy nodes hold only the raw node,
+    and each queried attribute is a class level property reading it from the
+    raw node. Every node built with the same attributes and mode shares one
+    class.
+    """
+    key : tuple[tuple[str, ...], bool] = (tuple(attributes), lazy)
+    cls : type | None = _node_classes.get(key)
+    if cls is None :
+        with _node_classes_lock :
+            cls = _node_classes.get(key)
+            if cls is None :
+                fields : tuple[str, ...] = tuple(dict.fromkeys(
+                    attr for attr in attributes if attr in _ANIMELISTNODE_FIELDS
+                ))
+                namespace : dict[str, Any] = {
+                    '__slots__' : () if lazy else fields,
+                    '__module__' : AnimeListNode.__module__,
+                    '__qualname__' : AnimeListNode.__qualname__,
+                    '_lazy' : lazy
+                }
+                if lazy :
+                    namespace.update({attr : _raw_field(attr) for attr in fields})
+                cls = type('AnimeListNode', (AnimeListNode,), namespace)
+                _node_classes[key] = cls
+    return cls
+
+def _raw_field(attribute : str) -> property :
+    """
+    _raw_field (private function)
+
+    Builds a read-only property resolving an attribute from the raw node.
+    """
+    def _get(self) -> Any :
+        return self.raw_node.get(attribute, None)
+    return property(_get)
+
 # dataclasses
 
 @dataclass(init=False)
@@ -46,6 +531,10 @@ class AnimeDetails :
         the default value for that attribute will be what is specified in the
         description.
         By default [].
+    client : MALClient, optional
+        The pooled client used to submit the query. If not provided, the
+        process-wide client is used.
+        By default None.
 
     Attributes
     ----------
@@ -126,6 +615,11 @@ class AnimeDetails :
     InvalidAnimeDetailsAnimeIdError
         The anime_id is invalid or not in the correct range.
     """
+    # one slot per field keeps nodes compact and attribute reads native
+    # the client is only used to submit the query and is not kept, so
+    # results stay picklable and compare by their data alone
+    __slots__ = ('anime_id', 'attributes', 'raw_node') + tuple(sorted(_ANIMEDETAILS_FIELDS))
+
     # parameters for initialization    
     anime_id                 : int
     attributes               : list[str]
@@ -135,61 +629,34 @@ class AnimeDetails :
 
     def __init__(self,
                  anime_id : str,
-                 attributes : list[str] = []
+                 attributes : list[str] = [],
+                 client : MALClient | None = None
                  ) :
         
-        if anime_id <= 0 : 
-            raise InvalidAnimeDetailsAnimeIdError(anime_id)
+        _validate_anime_id(anime_id)
         object.__setattr__(self, 'anime_id', anime_id)
-
-        fin_attributes = ANIME_DEFAULT_ATTRIBUTES[:]
-        for attribute in attributes :
-            try :
-                if attribute not in ANIMEDETAILSNODE_OPTIONAL_ATTRIBUTES or attribute in ANIME_DEFAULT_ATTRIBUTES:
-                    raise InvalidAnimeDetailsAttributeError(attribute)
-                else :
-                    fin_attributes.append(attribute)
-            except InvalidAnimeListAttributeError as error :
-                print(error)
-            finally :
-                continue
-        object.__setattr__(self, "attributes", fin_attributes)
+        object.__setattr__(self, "attributes", _validate_attributes(
+            attributes, ANIMEDETAILSNODE_OPTIONAL_ATTRIBUTES, InvalidAnimeDetailsAttributeError
+        ))
         
-        self.__post_init__()
+        self.__post_init__(client if client is not None else get_default_client())
 
-    def __post_init__(self) :
-        try :
-            # setup and submit the query through MAL
-            url : str = ''.join([
-                MAL_ANIME_ENDPOINT,
-                f'/{self.anime_id}'
-                '?',
-                f'fields={','.join(self.attributes)}' if len(self.attributes) > 0 else ''
-            ])
-            header = {'X-MAL-CLIENT-ID' : f'{APIKey().getKey()[0]}'}
-            response : Response = get(url, headers=header)
-            object.__setattr__(self, 'raw_node', dict(response.json()))
-            response.raise_for_status()
-        except HTTPError as QueryException:
-            raise QueryException
-        
-        # only add the attributes aquired from the query
-        for attribute in self.attributes :
-            object.__setattr__(self, attribute, self.raw_node.get(attribute, None))
-
-    def __getattribute__(self, attribute : str) :
-        # go around the native attributes first
-        x_list = ['raw_node', 'anime_id', 'attributes', 'get_attribute_dict']
-        x_list = x_list + [
-            method for method in dir(AnimeDetails) if method.startswith("__") and method.endswith("__")
-        ]
-        if attribute in x_list :
-            return super().__getattribute__(attribute)
-        
-        # make a check if the attribute was queried
-        if attribute not in self.attributes :
-            raise AnimeDetailsGetAttributeError(attribute)
-        return super().__getattribute__(attribute)
+    def __post_init__(self, client : MALClient) :
+        # setup and submit the query through MAL
+        raw_node = _fetch_details_node(self.anime_id, self.attributes, client)
+        _load_node(self, raw_node, MAL_LAZY_NODES)
+
+    def __getattr__(self, attribute : str) :
+        # only reached when the slot was never filled
+        if attribute.startswith('__') :
+            raise AttributeError(attribute)
+
+        # a queried attribute of a lazy object is resolved and memoized in its slot
+        if attribute in _ANIMEDETAILS_FIELDS and attribute in self.attributes :
+            value = self.raw_node.get(attribute, None)
+            object.__setattr__(self, attribute, value)
+            return value
+        raise AnimeDetailsGetAttributeError(attribute)
     
     def get_attribute_dict(self) -> dict :
         """
@@ -202,10 +669,7 @@ class AnimeDetails :
         dict
             A dictionary object containing only attributes grabbed from query.
         """
-        attr_dict = dict()
-        for attr in self.attributes :
-            attr_dict[attr] = self.__getattribute__(attr)
-        return attr_dict
+        return {attr : getattr(self, attr) for attr in self.attributes}
 
 @dataclass(init=False)
 class AnimeListNode :
@@ -223,6 +687,11 @@ class AnimeListNode :
     attributes : list[str]
         A list of strings that corispond to valid attributes for AnimeList queries.
 
+    lazy : bool, optional
+        Resolve attributes from raw_node on access instead of copying them out
+        up front, which keeps only raw_node per node.
+        By default MAL_LAZY_NODES.
+
     Attributes
     ----------
     id : int
@@ -286,36 +755,42 @@ class AnimeListNode :
         There was an attribute being accessed that was not within the object
         attributes.
     """
+    # one slot per field keeps nodes compact and attribute reads native
+    # the queried fields are slots of a subclass built per attribute list
+    __slots__ = ('raw_node', 'attributes')
+
+    # set on each subclass built by _node_class
+    _lazy = False
+
     # parameters for initialization
     raw_node : dict[str, Any]
     attributes : list[str]
 
+    def __new__(cls, raw_node : dict[str, Any], attributes : list[str], lazy : bool = MAL_LAZY_NODES) :
+        if cls is AnimeListNode :
+            cls = _node_class(attributes, lazy)
+        return object.__new__(cls)
+
+    def __reduce__(self) :
+        # the per attribute subclasses are not importable, rebuild through the base class
+        return (AnimeListNode, (self.raw_node, self.attributes, self._lazy))
+
     def __init__(self,
                  raw_node : dict[str, Any],
-                 attributes : list[str]) :
-        object.__setattr__(self, 'raw_node', raw_node)
+                 attributes : list[str],
+                 lazy : bool = MAL_LAZY_NODES) :
         object.__setattr__(self, 'attributes', attributes)
 
-        self.__post_init__()
+        self.__post_init__(raw_node)
     
-    def __post_init__(self) :
-        # only add the attributes aquired from the query
-        for attribute in self.attributes :
-            object.__setattr__(self, attribute, self.raw_node.get(attribute, None))
-
-    def __getattribute__(self, attribute : str) :
-        # go around the native attributes first
-        x_list = ['raw_node', 'attributes', 'get_attribute_dict']
-        x_list = x_list + [
-            method for method in dir(AnimeListNode) if method.startswith("__") and method.endswith("__")
-        ]
-        if attribute in x_list :
-            return super().__getattribute__(attribute)
-        
-        # make a check if the attribute was queried
-        if attribute not in self.attributes :
-            raise AnimeListNodeGetAttributeError(attribute)
-        return super().__getattribute__(attribute)
+    def __post_init__(self, raw_node : dict[str, Any]) :
+        _load_node(self, raw_node, self._lazy)
+
+    def __getattr__(self, attribute : str) :
+        # only reached when no slot or property holds the name, so the attribute was not queried
+        if attribute.startswith('__') :
+            raise AttributeError(attribute)
+        raise AnimeListNodeGetAttributeError(attribute)
 
     def get_attribute_dict(self) -> dict :
         """
@@ -328,10 +803,7 @@ class AnimeListNode :
         dict
             A dictionary object containing only attributes grabbed from query.
         """
-        attr_dict = dict()
-        for attr in self.attributes :
-            attr_dict[attr] = self.__getattribute__(attr)
-        return attr_dict
+        return {attr : getattr(self, attr) for attr in self.attributes}
 
 @dataclass(init=False, frozen=True)
 class AnimeList :
@@ -356,6 +828,10 @@ class AnimeList :
         the default value for that attribute will be what is specified in the
         description.
         By default [].
+    client : MALClient, optional
+        The pooled client used to submit the query. If not provided, the
+        process-wide client is used.
+        By default None.
     
     Attributes
     ----------
@@ -380,6 +856,9 @@ class AnimeList :
     HTTPError
         HTTPError extension for cases where raised response code not being 200.
     """
+    # the client is only used to submit the query and is not kept, see AnimeDetails
+    __slots__ = ('q', 'limit', 'offset', 'attributes', 'raw_data', 'data', 'paging')
+
     # parameters for initialization    
     q                        : str
     limit                    : int
@@ -395,85 +874,478 @@ class AnimeList :
                  q : str,
                  limit : int = 100,
                  offset : int = 0,
-                 attributes : list[str] = []
+                 attributes : list[str] = [],
+                 client : MALClient | None = None
                  ) :
         
         if len(q) <= 0 :
             raise InvalidAnimeListQError()
         object.__setattr__(self, "q", q)
 
-        try :
-            if limit > 100 or limit <= 0 :
-                raise InvalidAnimeListLimitRangeError()
-            object.__setattr__(self, "limit", limit)
-        except InvalidAnimeListLimitRangeError as error :
-            print(error)
-            object.__setattr__(self, "limit", 100)
+        limit, offset = _validate_list_range(limit, offset)
+        object.__setattr__(self, "limit", limit)
+        object.__setattr__(self, "offset", offset)
+        object.__setattr__(self, "attributes", _validate_attributes(
+            attributes, ANIMELISTNODE_OPTIONAL_ATTRIBUTES, InvalidAnimeListAttributeError
+        ))
+        
+        self.__post_init__(client if client is not None else get_default_client())
 
-        try :
-            if offset < 0 :
-                raise InvalidAnimeListOffsetRangeError()
-            object.__setattr__(self, "offset", offset)
-        except InvalidAnimeListOffsetRangeError as error :
-            print(error)
-            object.__setattr__(self, "offset", 0)
+    def __post_init__(self, client : MALClient) :
+        # setup and submit the query through MAL
+        raw_data = _fetch_list_data(self.q, self.limit, self.offset, self.attributes, client)
+        _load_list(self, raw_data)
 
-        fin_attributes = ANIME_DEFAULT_ATTRIBUTES[:]
-        for attribute in attributes :
-            try :
-                if attribute not in ANIMELISTNODE_OPTIONAL_ATTRIBUTES or attribute in ANIME_DEFAULT_ATTRIBUTES:
-                    raise InvalidAnimeListAttributeError(attribute)
-                else :
-                    fin_attributes.append(attribute)
-            except InvalidAnimeListAttributeError as error :
-                print(error)
-            finally :
-                continue
-        object.__setattr__(self, "attributes", fin_attributes)
-        
-        self.__post_init__()
+    def __getstate__(self) -> dict[str, Any] :
+        return {slot : getattr(self, slot) for slot in self.__slots__}
+
+    def __setstate__(self, state : dict[str, Any]) :
+        # frozen, so the slots are restored the way __init__ fills them
+        for slot, value in state.items() :
+            object.__setattr__(self, slot, value)
+
+    @classmethod
+    def iter_all(cls,
+                 q : str,
+                 attributes : list[str] = [],
+                 max_items : int | None = None,
+                 page_size : int = 100,
+                 client : MALClient | None = None
+                 ) -> Iterator[AnimeListNode] :
+        """
+        iter_all (class method)
+
+        Lazily walk every page of a query, yielding AnimeListNode objects page
+        by page. The next page is fetched on a background thread while the
+        current one is being consumed, and at most two pages are held at once
+        so memory stays flat however many results the query has.
+
+        Parameters
+        ----------
+        q : str
+            The query string for searching through the database.
+        attributes : list[str], optional
+            The attributes to be included among the query resultant for each
+            AnimeListNode object.
+            By default [].
+        max_items : int, optional
+            The maximum number of nodes yielded. If not provided, every page is
+            walked.
+            By default None.
+        page_size : int, optional
+            The amount of nodes fetched per page.
+            By default 100.
+        client : MALClient, optional
+            The pooled client used to submit the queries. If not provided, the
+            process-wide client is used.
+            By default None.
+
+        Yields
+        ------
+        AnimeListNode
+            The nodes in query order.
+
+        Raises
+        ------
+        InvalidAnimeListQError
+            The query string is invalid or doesn't meet the minimum requirements.
+        HTTPError
+            HTTPError extension for cases where raised response code not being 200.
+        """
+        if len(q) <= 0 :
+            raise InvalidAnimeListQError()
+        page_size, _ = _validate_list_range(page_size, 0)
+        fin_attributes : list[str] = _validate_attributes(
+            attributes, ANIMELISTNODE_OPTIONAL_ATTRIBUTES, InvalidAnimeListAttributeError
+        )
+        client = client if client is not None else get_default_client()
+        if max_items is not None and max_items <= 0 :
+            return
+
+        # a single worker is enough to keep one page ahead of the consumer
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mal-prefetch')
+
+        def _submit(offset : int) -> Future :
+            limit : int = page_size if max_items is None else min(page_size, max_items - offset)
+            return executor.submit(_fetch_list_data, q, limit, offset, fin_attributes, client)
 
-    def __post_init__(self) :
         try :
-            # setup and submit the query through MAL
-            url : str = ''.join([
-                MAL_ANIME_ENDPOINT,
-                '?',
-                f'q={quote(self.q)}',
-                f'&limit={self.limit}',
-                f'&offset={self.offset}',
-                f'&fields={','.join(self.attributes)}' if len(self.attributes) > 0 else ''
-            ])
-            header = {'X-MAL-CLIENT-ID' : f'{APIKey().getKey()[0]}'}
-            response : Response = get(url, headers=header)
-            object.__setattr__(self, 'raw_data', dict(response.json()))
-            response.raise_for_status()
-        except HTTPError as QueryException:
-            if self.raw_data['message'] == 'invalid q' :
-                raise InvalidAnimeListQError
-            raise QueryException
-
-        # put the paging dictionary with the paging attribute
-        object.__setattr__(self, 'paging', self.raw_data['paging'])
-
-        # populate the data attribute
-        data_array : list[AnimeListNode] = []
-        for raw_node in self.raw_data['data'] :
-            data_array.append(AnimeListNode(raw_node['node'], self.attributes))
-        object.__setattr__(self, 'data', data_array)
-
-    def __getattribute__(self, attribute : str) :
-        # go around the native attributes first
-        x_list = [
-            'q', 'limit', 'offset', 'attributes', 'raw_data', 'data',
-            'paging'
-        ]
-        x_list = x_list + [
-            method for method in dir(AnimeList) if method.startswith("__") and method.endswith("__")
+            offset : int = 0
+            future : Future | None = _submit(offset)
+            while future is not None :
+                raw_data : dict[str, Any] = future.result()
+                offset += len(raw_data['data'])
+
+                # stop on the last page, a short page or once max_items is met
+                more : bool = (
+                    'next' in raw_data.get('paging', dict())
+                    and len(raw_data['data']) > 0
+                    and (max_items is None or offset < max_items)
+                )
+                future = _submit(offset) if more else None
+
+                for raw_node in raw_data['data'] :
+                    yield AnimeListNode(raw_node['node'], fin_attributes)
+        finally :
+            # drop the prefetched page if the caller stops consuming early
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @classmethod
+    def fetch_all(cls,
+                  q : str,
+                  max_items : int,
+                  attributes : list[str] = [],
+                  page_size : int = 100,
+                  max_workers : int = MAL_BATCH_MAX_WORKERS,
+                  client : MALClient | None = None
+                  ) -> list[AnimeListNode] :
+        """
+        fetch_all (class method)
+
+        Fetch the first max_items results of a query by computing every offset
+        window up front and fetching the windows concurrently instead of
+        following paging['next'] one round-trip at a time. Windows are fetched
+        in waves of max_workers so a short page stops the walk without firing
+        the remaining windows, and every query still passes the rate limiter.
+
+        Nodes are reassembled in query order. A node already returned by an
+        earlier window is dropped, since the upstream ordering may shift
+        between pages.
+
+        Parameters
+        ----------
+        q : str
+            The query string for searching through the database.
+        max_items : int
+            The maximum number of nodes returned.
+        attributes : list[str], optional
+            The attributes to be included among the query resultant for each
+            AnimeListNode object.
+            By default [].
+        page_size : int, optional
+            The amount of nodes fetched per window.
+            By default 100.
+        max_workers : int, optional
+            The maximum number of windows in flight.
+            By default MAL_BATCH_MAX_WORKERS.
+        client : MALClient, optional
+            The pooled client used to submit the queries. If not provided, the
+            process-wide client is used. Windows are always submitted at the
+            BACKGROUND limiter priority.
+            By default None.
+
+        Returns
+        -------
+        list[AnimeListNode]
+            The nodes in query order.
+
+        Raises
+        ------
+        InvalidAnimeListQError
+            The query string is invalid or doesn't meet the minimum requirements.
+        HTTPError
+            HTTPError extension for cases where raised response code not being 200.
+        """
+        if len(q) <= 0 :
+            raise InvalidAnimeListQError()
+        page_size, _ = _validate_list_range(page_size, 0)
+        fin_attributes : list[str] = _validate_attributes(
+            attributes, ANIMELISTNODE_OPTIONAL_ATTRIBUTES, InvalidAnimeListAttributeError
+        )
+        client = (client if client is not None else get_default_client()).with_priority(BACKGROUND)
+        max_workers = max(1, max_workers)
+
+        windows : list[tuple[int, int]] = [
+            (min(page_size, max_items - offset), offset) for offset in range(0, max(0, max_items), page_size)
         ]
-        if attribute in x_list :
-            return super().__getattribute__(attribute)
-        
-        # make a check if the attribute was queried
-        if attribute not in self.attributes :
-            raise AnimeListGetAttributeError(attribute)
+
+        nodes : list[AnimeListNode] = []
+        seen : set[int] = set()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='mal-window') as executor :
+            for start in range(0, len(windows), max_workers) :
+                futures : list[Future] = [
+                    executor.submit(_fetch_list_data, q, limit, offset, fin_attributes, client)
+                    for limit, offset in windows[start:start + max_workers]
+                ]
+
+                short : bool = False
+                for (limit, _), future in zip(windows[start:start + max_workers], futures) :
+                    if short :
+                        future.cancel()
+                        continue
+                    raw_data : dict[str, Any] = future.result()
+                    for raw_node in raw_data['data'] :
+                        if raw_node['node']['id'] not in seen :
+                            seen.add(raw_node['node']['id'])
+                            nodes.append(AnimeListNode(raw_node['node'], fin_attributes))
+
+                    # a short page or a missing next page is the end of the results
+                    short = len(raw_data['data']) < limit or 'next' not in raw_data.get('paging', dict())
+                if short :
+                    break
+        return nodes
+
+    @classmethod
+    def stream(cls,
+               q : str,
+               limit : int = 100,
+               offset : int = 0,
+               attributes : list[str] = [],
+               client : MALClient | None = None
+               ) -> 'AnimeListStream' :
+        """
+        stream (class method)
+
+        Query a page of search results and decode the response body as it
+        arrives. See AnimeListStream.
+
+        Returns
+        -------
+        AnimeListStream
+            The iterable page. The query is sent when iteration begins.
+        """
+        return AnimeListStream(q, limit, offset, attributes, client)
+
+    def to_columns(self) -> AnimeListColumns :
+        """
+        to_columns (public method)
+
+        Pack the numeric attributes of the nodes into an AnimeListColumns view
+        for filtering, sorting and top-k selection. Further pages can be added
+        with AnimeListColumns.extend().
+
+        Returns
+        -------
+        AnimeListColumns
+            The columnar view of this page.
+        """
+        return AnimeListColumns(self.data)
+
+    def __getattr__(self, attribute : str) :
+        # only reached for names that are neither slots nor methods
+        if attribute.startswith('__') :
+            raise AttributeError(attribute)
+        raise AnimeListGetAttributeError(attribute)
+
+class AnimeListStream :
+    """
+    (class object)
+
+    A page of search results whose nodes are yielded while the response body
+    is still being received, instead of buffering and decoding the whole body
+    first. This lowers the peak memory and the time to the first node for
+    large pages with heavy optional fields.
+
+    A page already in the response cache is served from it. A streamed page is
+    not written to the cache, since that would mean holding the whole page.
+
+    Parameters
+    ----------
+    q : str
+        The query string for searching through the database.
+    limit : int, optional
+        The amount of nodes matching closest to the query string.
+        By default 100.
+    offset : int, optional
+        The amount of nodes skipped in the query resultant.
+        By default 0.
+    attributes : list[str], optional
+        The attributes to be included among the query resultant for each
+        AnimeListNode object.
+        By default [].
+    client : MALClient, optional
+        The pooled client used to submit the query. If not provided, the
+        process-wide client is used.
+        By default None.
+
+    Attributes
+    ----------
+    paging : dict[str, str] | None
+        The paging of the page, set once every node has been yielded.
+
+    Raises
+    ------
+    InvalidAnimeListQError
+        The query string is invalid or doesn't meet the minimum requirements.
+    HTTPError
+        HTTPError extension for cases where raised response code not being 200.
+    """
+    def __init__(self,
+                 q : str,
+                 limit : int = 100,
+                 offset : int = 0,
+                 attributes : list[str] = [],
+                 client : MALClient | None = None
+                 ) :
+        if len(q) <= 0 :
+            raise InvalidAnimeListQError()
+        self.q : str = q
+        self.limit, self.offset = _validate_list_range(limit, offset)
+        self.attributes : list[str] = _validate_attributes(
+            attributes, ANIMELISTNODE_OPTIONAL_ATTRIBUTES, InvalidAnimeListAttributeError
+        )
+        self.client : MALClient = client if client is not None else get_default_client()
+        self.paging : dict[str, str] | None = None
+
+    def __iter__(self) -> Iterator[AnimeListNode] :
+        cached : dict[str, Any] | None = _cached_list_data(self.q, self.limit, self.offset, self.attributes)
+        if cached is not None :
+            for raw_node in cached['data'] :
+                yield AnimeListNode(raw_node['node'], self.attributes)
+            self.paging = cached['paging']
+            return
+
+        url : str = _anime_list_url(self.q, self.limit, self.offset, self.attributes)
+        response : Response = self.client.get(url, headers=_client_id_header(), stream=True)
+        try :
+            try :
+                response.raise_for_status()
+            except HTTPError as QueryException :
+                _raise_anime_list_error(QueryException)
+
+            decoder : ListStreamDecoder = ListStreamDecoder()
+            text_decoder = getincrementaldecoder('utf-8')()
+            for chunk in response.iter_content(MAL_STREAM_CHUNK_SIZE) :
+                for element in decoder.feed(text_decoder.decode(chunk)) :
+                    yield AnimeListNode(element['node'], self.attributes)
+            for element in decoder.feed(text_decoder.decode(b'', final=True)) :
+                yield AnimeListNode(element['node'], self.attributes)
+            decoder.close()
+        finally :
+            response.close()
+
+        self.paging = decoder.members.get('paging', dict())
+
+# batch helpers
+
+def fetch_many_details(ids : Iterable[int],
+                       attributes : list[str] = [],
+                       max_workers : int = MAL_BATCH_MAX_WORKERS,
+                       client : MALClient | None = None,
+                       cache : bool = True
+                       ) -> Iterator[tuple[int, AnimeDetails | Exception]] :
+    """
+    fetch_many_details (function)
+
+    Run AnimeDetails lookups on a bounded thread pool and stream the results
+    back as they complete. Only a small window of ids is submitted ahead of the
+    workers so arbitrarily large id iterables do not queue up in memory.
+
+    Parameters
+    ----------
+    ids : Iterable[int]
+        The anime ids to be queried.
+    attributes : list[str], optional
+        The attributes to be included among the query resultant.
+        By default [].
+    max_workers : int, optional
+        The maximum number of lookups running at once.
+        By default MAL_BATCH_MAX_WORKERS.
+    client : MALClient, optional
+        The pooled client used to submit the queries. If not provided, the
+        process-wide client is used. Lookups are always submitted at the
+        BACKGROUND limiter priority.
+        By default None.
+    cache : bool, optional
+        Serve and store the lookups through the details cache. Bulk jobs that
+        write the results elsewhere should pass False, so the one-shot nodes
+        neither evict the interactive working set nor fill the disk tier.
+        By default True.
+
+    Yields
+    ------
+    tuple[int, AnimeDetails | Exception]
+        The anime id paired with its AnimeDetails object, or the exception
+        raised while querying it. Results are in completion order.
+    """
+    client = (client if client is not None else get_default_client()).with_priority(BACKGROUND)
+    max_workers = max(1, max_workers)
+    fin_attributes : list[str] = _validate_attributes(
+        attributes, ANIMEDETAILSNODE_OPTIONAL_ATTRIBUTES, InvalidAnimeDetailsAttributeError
+    )
+    id_iter : Iterator[int] = iter(ids)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='mal-batch')
+    pending : dict[Future, int] = dict()
+
+    def _submit_next() -> bool :
+        for anime_id in id_iter :
+            pending[executor.submit(_fetch_anime_details, anime_id, fin_attributes, client, cache)] = anime_id
+            return True
+        return False
+
+    try :
+        # keep twice as many lookups queued as there are workers
+        while len(pending) < max_workers * 2 and _submit_next() :
+            pass
+
+        while pending :
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done :
+                anime_id = pending.pop(future)
+                _submit_next()
+                try :
+                    result = future.result()
+                except Exception as error :
+                    result = error
+                yield (anime_id, result)
+    finally :
+        # drop queued lookups if the caller stops consuming early
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def fetch_anime_ranking(ranking_type : str = 'all',
+                        limit : int = MAL_RANKING_MAX_LIMIT,
+                        offset : int = 0,
+                        attributes : list[str] = [],
+                        client : MALClient | None = None
+                        ) -> dict[str, Any] :
+    """
+    fetch_anime_ranking (function)
+
+    Query one page of an anime ranking, which lists every anime MAL knows
+    about and so is the walk used to mirror the catalog. Ranking pages are
+    much larger than search pages and are only read once per walk, so they
+    bypass the response cache.
+
+    Parameters
+    ----------
+    ranking_type : str, optional
+        The ranking walked, one of MAL_RANKING_TYPES.
+        By default 'all'.
+    limit : int, optional
+        The number of anime on the page, at most MAL_RANKING_MAX_LIMIT.
+        By default MAL_RANKING_MAX_LIMIT.
+    offset : int, optional
+        The position of the first anime on the page.
+        By default 0.
+    attributes : list[str], optional
+        The list node attributes to be included on every anime.
+        By default [].
+    client : MALClient, optional
+        The pooled client used to submit the query. If not provided, the
+        process-wide client is used. The query is always submitted at the
+        BACKGROUND limiter priority.
+        By default None.
+
+    Returns
+    -------
+    dict[str, Any]
+        The json object of the page, with the anime under data as
+        {"node" : {...}, "ranking" : {...}} and the paging links under paging.
+        There are more pages while paging holds a next link.
+
+    Raises
+    ------
+    InvalidAnimeRankingTypeError
+        The ranking type is not one of MAL_RANKING_TYPES.
+    HTTPError
+        HTTPError extension for cases where raised response code not being 200.
+    """
+    if ranking_type not in MAL_RANKING_TYPES :
+        raise InvalidAnimeRankingTypeError(ranking_type)
+    limit = min(max(1, limit), MAL_RANKING_MAX_LIMIT)
+    offset = max(0, offset)
+    attributes = _validate_attributes(attributes, ANIMELISTNODE_OPTIONAL_ATTRIBUTES, InvalidAnimeListAttributeError)
+
+    client = (client if client is not None else get_default_client()).with_priority(BACKGROUND)
+    return _query(client, _anime_ranking_url(ranking_type, limit, offset, attributes))
@@ -46,7 +46,7 @@ def warning(err_msg : str) -> str :
 
 # exceptions
 
-class AnimeDetailsGetAttributeError(Exception) :
+class AnimeDetailsGetAttributeError(AttributeError) :
     """
     AnimeDetailsGetAttributeError (exception)
 
@@ -64,7 +64,7 @@ class AnimeDetailsGetAttributeError(Exception) :
     def __str__(self) :
         return self.message
 
-class AnimeListNodeGetAttributeError(Exception) :
+class AnimeListNodeGetAttributeError(AttributeError) :
     """
     AnimeListNodeGetAttributeError (exception)
 
@@ -82,7 +82,7 @@ class AnimeListNodeGetAttributeError(Exception) :
     def __str__(self) :
         return f'{self.message}'
 
-class AnimeListGetAttributeError(Exception) :
+class AnimeListGetAttributeError(AttributeError) :
     """
     AnimeListGetAttributeError (exception)
 
@@ -185,3 +185,77 @@ class InvalidAnimeListAttributeError(Exception) :
     
     def __str__(self) :
         return f'{self.message}'
+
+class InvalidAnimeListColumnError(Exception) :
+    """
+    InvalidAnimeListColumnError (exception)
+
+    The attribute is not one of the numeric columns of AnimeListColumns.
+
+    Parameters
+    ----------
+    column : str
+        The attribute that was requested as a column.
+    """
+    def __init__(self, column : str) :
+        self.message = danger(f'{column} is not a numeric AnimeList column')
+        super().__init__(self.message)
+
+    def __str__(self) :
+        return f'{self.message}'
+
+class InvalidAnimeRankingTypeError(Exception) :
+    """
+    InvalidAnimeRankingTypeError (exception)
+
+    The ranking type is not one of the rankings MAL provides.
+
+    Parameters
+    ----------
+    ranking_type : str
+        The ranking type that was requested.
+    """
+    def __init__(self, ranking_type : str) :
+        self.message = danger(f'{ranking_type} is not a valid anime ranking type')
+        super().__init__(self.message)
+
+    def __str__(self) :
+        return f'{self.message}'
+
+class RateLimitTimeoutError(Exception) :
+    """
+    RateLimitTimeoutError (exception)
+
+    The rate limiter could not grant a request within the allowed wait time.
+
+    Parameters
+    ----------
+    timeout : float
+        The number of seconds the caller was willing to wait.
+    """
+    def __init__(self, timeout : float) :
+        self.message = danger(f'rate limiter could not grant a request within {timeout} seconds')
+        super().__init__(self.message)
+    
+    def __str__(self) :
+        return f'{self.message}'
+
+class MALCircuitOpenError(Exception) :
+    """
+    MALCircuitOpenError (exception)
+
+    The circuit breaker is open because MAL is unhealthy, so the request was
+    rejected without being sent.
+
+    Parameters
+    ----------
+    retry_in : float
+        The number of seconds until the next recovery probe.
+    """
+    def __init__(self, retry_in : float) :
+        self.retry_in = retry_in
+        self.message = danger(f'MAL is unavailable, circuit is open (next probe in {retry_in:.1f} seconds)')
+        super().__init__(self.message)
+    
+    def __str__(self) :
+        return f'{self.message}'
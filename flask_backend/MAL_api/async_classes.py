@@ -0,0 +1,252 @@
+# native imports
+
+from asyncio import Semaphore, gather, get_running_loop
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from typing import Any, Callable
+
+# local imports
+
+from .client import MALClient, get_default_client
+from .coalesce import AsyncSingleFlight
+from .constants import (
+    ANIMEDETAILSNODE_OPTIONAL_ATTRIBUTES,
+    ANIMELISTNODE_OPTIONAL_ATTRIBUTES,
+    MAL_ASYNC_CONCURRENCY,
+    MAL_ASYNC_MAX_WORKERS
+)
+from .MAL_classes import (
+    AnimeDetails,
+    AnimeList,
+    _build_anime_details,
+    _build_anime_list,
+    _cached_details_node,
+    _cached_list_data,
+    _details_key,
+    _fetch_details_node,
+    _fetch_list_data,
+    _list_key,
+    _validate_anime_id,
+    _validate_attributes,
+    _validate_list_range
+)
+from .MAL_exceptions import (
+    InvalidAnimeDetailsAttributeError,
+    InvalidAnimeListAttributeError,
+    InvalidAnimeListQError
+)
+
+# identical queries awaited on one event loop share one executor job
+_inflight : AsyncSingleFlight = AsyncSingleFlight()
+
+# upstream executor
+
+_executor : ThreadPoolExecutor | None = None
+_executor_lock : Lock = Lock()
+
+def _get_executor() -> ThreadPoolExecutor :
+    """
+    _get_executor (private function)
+
+    Helper for returning the executor that carries the blocking network I/O
+    for every coroutine in this module. The executor is created on first use.
+    """
+    global _executor
+    if _executor is None :
+        with _executor_lock :
+            if _executor is None :
+                _executor = ThreadPoolExecutor(
+                    max_workers=MAL_ASYNC_MAX_WORKERS,
+                    thread_name_prefix='mal-async'
+                )
+    return _executor
+
+async def _fetch(key : tuple, cached : Any, func : Callable, *args : Any) -> Any :
+    """
+    _fetch (private function)
+
+    Return a query result already found in the memory tier of the cache on
+    the event loop, only going to the executor, once per key, on a miss. The
+    disk tier is consulted by func on the executor, so the loop never blocks
+    on disk I/O.
+    """
+    if cached is not None :
+        return cached
+    return await _inflight.do(key, _run, func, *args)
+
+async def _run(func : Callable, *args : Any) -> Any :
+    """
+    _run (private function)
+
+    Await a blocking call on the upstream executor without blocking the event
+    loop.
+    """
+    return await get_running_loop().run_in_executor(_get_executor(), partial(func, *args))
+
+# async counterparts
+
+class AsyncAnimeDetails :
+    """
+    (class object)
+
+    The asyncio counterpart to AnimeDetails. Validation and parsing are shared
+    with the synchronous path and only the round-trip to MAL is awaited, so the
+    result is a regular AnimeDetails object.
+    """
+    @staticmethod
+    async def fetch(anime_id : int,
+                    attributes : list[str] = [],
+                    client : MALClient | None = None
+                    ) -> AnimeDetails :
+        """
+        fetch (public method)
+
+        Query MAL for a single anime without blocking the event loop.
+
+        Parameters
+        ----------
+        anime_id : int
+            The unique identifier of the anime.
+        attributes : list[str], optional
+            The attributes to be included among the query resultant.
+            By default [].
+        client : MALClient, optional
+            The pooled client used to submit the query. If not provided, the
+            process-wide client is used.
+            By default None.
+
+        Returns
+        -------
+        AnimeDetails
+            The queried anime.
+
+        Raises
+        ------
+        HTTPError
+            HTTPError extension for cases where raised response code not being 200.
+        InvalidAnimeDetailsAnimeIdError
+            The anime_id is invalid or not in the correct range.
+        """
+        _validate_anime_id(anime_id)
+        fin_attributes : list[str] = _validate_attributes(
+            attributes, ANIMEDETAILSNODE_OPTIONAL_ATTRIBUTES, InvalidAnimeDetailsAttributeError
+        )
+        client = client if client is not None else get_default_client()
+
+        raw_node = await _fetch(
+            _details_key(anime_id, fin_attributes),
+            _cached_details_node(anime_id, fin_attributes, memory_only=True),
+            _fetch_details_node, anime_id, fin_attributes, client
+        )
+        return _build_anime_details(anime_id, fin_attributes, raw_node)
+
+class AsyncAnimeList :
+    """
+    (class object)
+
+    The asyncio counterpart to AnimeList. Validation and parsing are shared
+    with the synchronous path and only the round-trip to MAL is awaited, so the
+    result is a regular AnimeList object.
+    """
+    @staticmethod
+    async def fetch(q : str,
+                    limit : int = 100,
+                    offset : int = 0,
+                    attributes : list[str] = [],
+                    client : MALClient | None = None
+                    ) -> AnimeList :
+        """
+        fetch (public method)
+
+        Query MAL for a page of search results without blocking the event
+        loop.
+
+        Parameters
+        ----------
+        q : str
+            The query string for searching through the database.
+        limit : int, optional
+            The amount of nodes matching closest to the query string.
+            By default 100.
+        offset : int, optional
+            The amount of nodes skipped in the query resultant.
+            By default 0.
+        attributes : list[str], optional
+            The attributes to be included among the query resultant for each
+            AnimeListNode object.
+            By default [].
+        client : MALClient, optional
+            The pooled client used to submit the query. If not provided, the
+            process-wide client is used.
+            By default None.
+
+        Returns
+        -------
+        AnimeList
+            The queried page.
+
+        Raises
+        ------
+        InvalidAnimeListQError
+            The query string is invalid or doesn't meet the minimum requirements.
+        HTTPError
+            HTTPError extension for cases where raised response code not being 200.
+        """
+        if len(q) <= 0 :
+            raise InvalidAnimeListQError()
+        limit, offset = _validate_list_range(limit, offset)
+        fin_attributes : list[str] = _validate_attributes(
+            attributes, ANIMELISTNODE_OPTIONAL_ATTRIBUTES, InvalidAnimeListAttributeError
+        )
+        client = client if client is not None else get_default_client()
+
+        raw_data = await _fetch(
+            _list_key(q, limit, offset, fin_attributes),
+            _cached_list_data(q, limit, offset, fin_attributes, memory_only=True),
+            _fetch_list_data, q, limit, offset, fin_attributes, client
+        )
+        return _build_anime_list(q, limit, offset, fin_attributes, raw_data)
+
+async def gather_details(ids : list[int],
+                         attributes : list[str] = [],
+                         concurrency : int = MAL_ASYNC_CONCURRENCY,
+                         client : MALClient | None = None
+                         ) -> list[AnimeDetails | Exception] :
+    """
+    gather_details (function)
+
+    Fetch many anime concurrently on one event loop with at most concurrency
+    queries in flight at a time.
+
+    Parameters
+    ----------
+    ids : list[int]
+        The anime ids to be queried.
+    attributes : list[str], optional
+        The attributes to be included among the query resultant.
+        By default [].
+    concurrency : int, optional
+        The maximum number of queries in flight. Values above
+        MAL_ASYNC_MAX_WORKERS are bounded by the executor size.
+        By default MAL_ASYNC_CONCURRENCY.
+    client : MALClient, optional
+        The pooled client used to submit the queries.
+        By default None.
+
+    Returns
+    -------
+    list[AnimeDetails | Exception]
+        The results in the same order as ids. A failed query is returned as
+        its exception instead of cancelling the rest of the batch.
+    """
+    semaphore : Semaphore = Semaphore(max(1, concurrency))
+
+    async def _bounded_fetch(anime_id : int) -> AnimeDetails :
+        async with semaphore :
+            return await AsyncAnimeDetails.fetch(anime_id, attributes, client)
+
+    return await gather(
+        *(_bounded_fetch(anime_id) for anime_id in ids),
+        return_exceptions=True
+    )
@@ -0,0 +1,430 @@
+# native imports
+
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic, time
+from typing import Any, Hashable
+
+# local imports
+
+from .codec import dumps
+from .constants import (
+    MAL_CACHE_DEFAULT_TTL,
+    MAL_CACHE_MAX_BYTES,
+    MAL_CACHE_TTLS,
+    MAL_DETAILS_CACHE_LOCK_STRIPES,
+    MAL_DISK_CACHE_ENABLED
+)
+from .disk_cache import DiskCache
+
+class ResponseCache :
+    """
+    (class object)
+
+    A thread-safe in-process cache for decoded MAL responses. Entries expire
+    after a per-endpoint time to live and the least recently used entries are
+    evicted once the total size of the cached payloads exceeds max_bytes.
+
+    Keys are the canonical query tuples built by MAL_classes, where the first
+    element names the endpoint used to look up the time to live.
+
+    When a DiskCache is attached, a memory miss falls back to the disk tier
+    before going upstream, a disk hit is promoted back into memory, and every
+    write goes to both tiers.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        The byte budget for every cached payload combined.
+        By default MAL_CACHE_MAX_BYTES.
+    ttls : dict[str, float], optional
+        Seconds an entry lives for, keyed by endpoint.
+        By default MAL_CACHE_TTLS.
+    default_ttl : float, optional
+        Seconds an entry lives for when its endpoint is not in ttls.
+        By default MAL_CACHE_DEFAULT_TTL.
+    disk : DiskCache, optional
+        A persistent tier consulted on memory misses.
+        By default None.
+    """
+    def __init__(self,
+                 max_bytes : int = MAL_CACHE_MAX_BYTES,
+                 ttls : dict[str, float] = MAL_CACHE_TTLS,
+                 default_ttl : float = MAL_CACHE_DEFAULT_TTL,
+                 disk : DiskCache | None = None
+                 ) :
+        self.max_bytes : int = max_bytes
+        self.ttls : dict[str, float] = dict(ttls)
+        self.default_ttl : float = default_ttl
+        self.disk : DiskCache | None = disk
+
+        self._lock : Lock = Lock()
+        self._entries : OrderedDict[Hashable, tuple[Any, float, int]] = OrderedDict()
+        self._bytes : int = 0
+
+        # observability
+        self._hits : int = 0
+        self._misses : int = 0
+        self._evictions : int = 0
+        self._expirations : int = 0
+
+    def ttl_for(self, key : Hashable) -> float :
+        """
+        ttl_for (public method)
+
+        Helper for returning the time to live of a key based on its endpoint.
+        """
+        endpoint = key[0] if isinstance(key, tuple) and key else key
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, key : Hashable, memory_only : bool = False) -> Any | None :
+        """
+        get (public method)
+
+        Look up a cached payload and mark it as recently used.
+
+        Parameters
+        ----------
+        key : Hashable
+            The canonical query key.
+        memory_only : bool, optional
+            Skip the disk tier, for callers such as an event loop that must
+            not block on disk I/O. A miss is not counted, since such callers
+            look the key up again off the loop.
+            By default False.
+
+        Returns
+        -------
+        Any | None
+            The cached payload, or None on a miss or expired entry.
+        """
+        with self._lock :
+            entry = self._entries.get(key)
+            if entry is not None :
+                value, expires_at, size = entry
+                if expires_at > monotonic() :
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+
+                del self._entries[key]
+                self._bytes -= size
+                self._expirations += 1
+            if memory_only :
+                return None
+            self._misses += 1
+
+        if self.disk is None :
+            return None
+        stored = self.disk.get(key)
+        if stored is None :
+            return None
+
+        # promote the entry for the rest of its life
+        value, remaining = stored
+        self._store(key, value, remaining)
+        return value
+
+    def put(self, key : Hashable, value : Any, ttl : float | None = None) -> None :
+        """
+        put (public method)
+
+        Store a payload, evicting the least recently used entries until the
+        cache fits its byte budget. Payloads larger than the whole budget are
+        not stored.
+
+        Parameters
+        ----------
+        key : Hashable
+            The canonical query key.
+        value : Any
+            The json serializable payload.
+        ttl : float, optional
+            Seconds the entry lives for. If not provided, the endpoint time to
+            live is used.
+            By default None.
+        """
+        ttl = ttl if ttl is not None else self.ttl_for(key)
+        self._store(key, value, ttl)
+        if self.disk is not None :
+            self.disk.put(key, value, ttl)
+
+    def _store(self, key : Hashable, value : Any, ttl : float) -> None :
+        """
+        _store (private method)
+
+        Store a payload in memory only, evicting the least recently used
+        entries until the cache fits its byte budget.
+        """
+        size : int = self._size(value)
+        expires_at : float = monotonic() + ttl
+
+        with self._lock :
+            old = self._entries.pop(key, None)
+            if old is not None :
+                self._bytes -= old[2]
+            if size > self.max_bytes :
+                return
+
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes :
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def invalidate(self, key : Hashable) -> None :
+        """
+        invalidate (public method)
+
+        Drop a single entry if it is cached.
+        """
+        with self._lock :
+            old = self._entries.pop(key, None)
+            if old is not None :
+                self._bytes -= old[2]
+        if self.disk is not None :
+            self.disk.invalidate(key)
+
+    def clear(self) -> None :
+        """
+        clear (public method)
+
+        Drop every entry held in memory.
+        """
+        with self._lock :
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict :
+        """
+        stats (public method)
+
+        Helper for returning the cache counters.
+
+        Returns
+        -------
+        dict
+            A dictionary object containing the entry count, bytes used, and
+            the hit, miss, eviction and expiration counters of the memory tier
+            along with the stats of the disk tier under 'disk'.
+        """
+        disk_stats : dict | None = self.disk.stats() if self.disk is not None else None
+        with self._lock :
+            lookups : int = self._hits + self._misses
+            return {
+                'entries' : len(self._entries),
+                'bytes' : self._bytes,
+                'max_bytes' : self.max_bytes,
+                'hits' : self._hits,
+                'misses' : self._misses,
+                'hit_rate' : self._hits / lookups if lookups else 0.0,
+                'evictions' : self._evictions,
+                'expirations' : self._expirations,
+                'disk' : disk_stats
+            }
+
+    @staticmethod
+    def _size(value : Any) -> int :
+        """
+        _size (private method)
+
+        Helper for estimating the size of a payload by its compact json
+        encoding, which tracks the memory held by the decoded object closely
+        enough for budgeting.
+        """
+        return len(dumps(value))
+
+class DetailsFieldCache :
+    """
+    (class object)
+
+    A field-aware layer over ResponseCache for AnimeDetails nodes. One entry
+    is stored per anime holding every field fetched so far along with the
+    time each field was fetched. A query whose fields are all cached and fresh
+    is answered from the entry, and a query needing more fields only fetches
+    the missing ones and merges them into the entry, so the many projections
+    asked for by the frontend share one cached node.
+
+    Entries are plain dictionaries of the form
+    {'node' : dict, 'fields' : dict[str, float]} so they stay json
+    serializable.
+
+    Parameters
+    ----------
+    cache : ResponseCache, optional
+        The cache the entries are stored in. If not provided, the process-wide
+        cache is used.
+        By default None.
+    """
+    def __init__(self, cache : ResponseCache | None = None) :
+        self._cache : ResponseCache | None = cache
+        # merges of one anime are serialized, merges of different anime only
+        # share a lock when their ids land on the same stripe
+        self._locks : list[Lock] = [Lock() for _ in range(MAL_DETAILS_CACHE_LOCK_STRIPES)]
+
+    @property
+    def cache(self) -> ResponseCache :
+        return self._cache if self._cache is not None else get_default_cache()
+
+    @staticmethod
+    def key(anime_id : int) -> tuple :
+        """
+        key (public method)
+
+        Helper for returning the cache key of an anime entry.
+        """
+        return ('anime', anime_id)
+
+    def lookup(self,
+               anime_id : int,
+               attributes : list[str],
+               memory_only : bool = False
+               ) -> tuple[dict[str, Any] | None, list[str]] :
+        """
+        lookup (public method)
+
+        Look up the requested fields of an anime.
+
+        Parameters
+        ----------
+        anime_id : int
+            The anime id.
+        attributes : list[str]
+            The requested fields.
+        memory_only : bool, optional
+            Skip the disk tier, see ResponseCache.get().
+            By default False.
+
+        Returns
+        -------
+        tuple[dict[str, Any] | None, list[str]]
+            The node projected onto the requested fields, or None if any field
+            is missing or stale, paired with the missing or stale fields.
+        """
+        cache : ResponseCache = self.cache
+        entry : dict | None = cache.get(self.key(anime_id), memory_only)
+        if entry is None :
+            return (None, list(attributes))
+
+        oldest : float = time() - cache.ttl_for(self.key(anime_id))
+        fields : dict[str, float] = entry['fields']
+        missing : list[str] = [attr for attr in attributes if fields.get(attr, 0.0) <= oldest]
+        if missing :
+            return (None, missing)
+        return (self.project(entry['node'], attributes), [])
+
+    def merge(self, anime_id : int, attributes : list[str], raw_node : dict[str, Any]) -> dict[str, Any] :
+        """
+        merge (public method)
+
+        Merge freshly fetched fields into the entry of an anime. A requested
+        field absent from raw_node is recorded as fetched with no value, since
+        MAL leaves out fields that have no value. The read, merge and write,
+        including the write to the disk tier, only hold the lock of this
+        anime, so merges of other anime are not queued behind disk I/O.
+
+        Parameters
+        ----------
+        anime_id : int
+            The anime id.
+        attributes : list[str]
+            The fields that were requested upstream.
+        raw_node : dict[str, Any]
+            The node returned by MAL.
+
+        Returns
+        -------
+        dict[str, Any]
+            The merged node.
+        """
+        fetched_at : float = time()
+        with self._locks[hash(anime_id) % len(self._locks)] :
+            cache : ResponseCache = self.cache
+            entry : dict | None = cache.get(self.key(anime_id))
+
+            # never mutate a node another caller may be holding
+            node : dict[str, Any] = dict(entry['node']) if entry is not None else dict()
+            fields : dict[str, float] = dict(entry['fields']) if entry is not None else dict()
+            for attr in attributes :
+                if attr in raw_node :
+                    node[attr] = raw_node[attr]
+                else :
+                    node.pop(attr, None)
+                fields[attr] = fetched_at
+
+            cache.put(self.key(anime_id), {'node' : node, 'fields' : fields})
+        return node
+
+    def invalidate(self, anime_id : int) -> None :
+        """
+        invalidate (public method)
+
+        Drop the entry of an anime.
+        """
+        self.cache.invalidate(self.key(anime_id))
+
+    @staticmethod
+    def project(node : dict[str, Any], attributes : list[str]) -> dict[str, Any] :
+        """
+        project (public method)
+
+        Helper for returning only the requested fields of a node.
+        """
+        return {attr : node[attr] for attr in attributes if attr in node}
+
+# shared cache
+
+_default_cache : ResponseCache | None = None
+_default_cache_lock : Lock = Lock()
+
+def get_default_cache() -> ResponseCache :
+    """
+    get_default_cache (function)
+
+    Helper for returning the process-wide response cache. The cache is created
+    on first use, backed by a DiskCache when MAL_DISK_CACHE_ENABLED is set.
+
+    Returns
+    -------
+    ResponseCache
+        The shared cache.
+    """
+    global _default_cache
+    if _default_cache is None :
+        with _default_cache_lock :
+            if _default_cache is None :
+                _default_cache = ResponseCache(disk=DiskCache() if MAL_DISK_CACHE_ENABLED else None)
+    return _default_cache
+
+def set_default_cache(cache : ResponseCache) -> None :
+    """
+    set_default_cache (function)
+
+    Replace the process-wide response cache, for example with a different
+    byte budget or time to live.
+
+    Parameters
+    ----------
+    cache : ResponseCache
+        The cache every MAL_api query will use.
+    """
+    global _default_cache
+    with _default_cache_lock :
+        _default_cache = cache
+
+_default_details_cache : DetailsFieldCache = DetailsFieldCache()
+
+def get_default_details_cache() -> DetailsFieldCache :
+    """
+    get_default_details_cache (function)
+
+    Helper for returning the process-wide DetailsFieldCache, which stores its
+    entries in the process-wide response cache.
+
+    Returns
+    -------
+    DetailsFieldCache
+        The shared details cache.
+    """
+    return _default_details_cache
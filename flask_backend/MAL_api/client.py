@@ -0,0 +1,352 @@
+# native imports
+
+from copy import copy
+from requests import RequestException, Response, Session
+from requests.adapters import HTTPAdapter
+from threading import Lock
+from time import sleep
+from typing import Any
+
+# local imports
+
+from .constants import (
+    MAL_BREAKER_PROBE_URL,
+    MAL_CLIENT_CONNECT_TIMEOUT,
+    MAL_CLIENT_POOL_BLOCK,
+    MAL_CLIENT_POOL_CONNECTIONS,
+    MAL_CLIENT_POOL_MAXSIZE,
+    MAL_CLIENT_READ_TIMEOUT,
+    MAL_RATE_LIMIT_DEFAULT_PENALTY
+)
+from .rate_limit import (
+    INTERACTIVE,
+    TokenBucket,
+    get_default_limiter,
+    parse_retry_after
+)
+from .resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    get_default_breaker,
+    get_default_retry_policy
+)
+
+# methods that are safe to replay after a failure
+IDEMPOTENT_METHODS : frozenset[str] = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+class MALClient :
+    """
+    (class object)
+
+    A long-lived HTTP client for every upstream call made to MAL. The client
+    owns a keep-alive connection pool so that repeated queries reuse warm
+    TCP/TLS connections instead of performing a new handshake per request.
+    A single client is meant to be shared across threads and injected into
+    AnimeDetails, AnimeList and APIToken.
+
+    Parameters
+    ----------
+    pool_connections : int, optional
+        The number of per-host connection pools to keep cached.
+        By default MAL_CLIENT_POOL_CONNECTIONS.
+    pool_maxsize : int, optional
+        The maximum number of connections kept open per host.
+        By default MAL_CLIENT_POOL_MAXSIZE.
+    pool_block : bool, optional
+        When True, callers wait for a free connection once pool_maxsize is
+        reached instead of opening throwaway connections. This is what makes
+        pool_maxsize a hard per-host limit.
+        By default MAL_CLIENT_POOL_BLOCK.
+    connect_timeout : float, optional
+        Seconds to wait for a connection to be established.
+        By default MAL_CLIENT_CONNECT_TIMEOUT.
+    read_timeout : float, optional
+        Seconds to wait for the server to send a response.
+        By default MAL_CLIENT_READ_TIMEOUT.
+    limiter : TokenBucket, optional
+        The rate limiter every request passes through. If not provided, the
+        process-wide limiter is used.
+        By default None.
+    priority : str, optional
+        The limiter priority of requests sent by this client, either
+        INTERACTIVE or BACKGROUND.
+        By default INTERACTIVE.
+    retry_policy : RetryPolicy, optional
+        Decides which failed requests are retried and the backoff between
+        attempts. If not provided, the process-wide policy is used.
+        By default None.
+    breaker : CircuitBreaker, optional
+        Rejects requests while MAL is unhealthy. If not provided, the
+        process-wide breaker is used.
+        By default None.
+    probe_url : str, optional
+        A lightweight url requested in the background to detect recovery
+        while the breaker is open.
+        By default MAL_BREAKER_PROBE_URL.
+    """
+    def __init__(self,
+                 pool_connections : int = MAL_CLIENT_POOL_CONNECTIONS,
+                 pool_maxsize : int = MAL_CLIENT_POOL_MAXSIZE,
+                 pool_block : bool = MAL_CLIENT_POOL_BLOCK,
+                 connect_timeout : float = MAL_CLIENT_CONNECT_TIMEOUT,
+                 read_timeout : float = MAL_CLIENT_READ_TIMEOUT,
+                 limiter : TokenBucket | None = None,
+                 priority : str = INTERACTIVE,
+                 retry_policy : RetryPolicy | None = None,
+                 breaker : CircuitBreaker | None = None,
+                 probe_url : str = MAL_BREAKER_PROBE_URL
+                 ) :
+        self.timeout : tuple[float, float] = (connect_timeout, read_timeout)
+        self.limiter : TokenBucket = limiter if limiter is not None else get_default_limiter()
+        self.priority : str = priority
+        self.retry_policy : RetryPolicy = retry_policy if retry_policy is not None else get_default_retry_policy()
+        self.breaker : CircuitBreaker = breaker if breaker is not None else get_default_breaker()
+        self.probe_url : str = probe_url
+
+        # retries happen in request() so the breaker and limiter see every attempt
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=0
+        )
+        self._session : Session = Session()
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def request(self, method : str, url : str, **kwargs : Any) -> Response :
+        """
+        request (public method)
+
+        Submit a request through the pooled session once the circuit breaker
+        and the rate limiter allow it. A 429, or a 403 carrying Retry-After,
+        pauses the limiter so every other caller backs off as well. Idempotent
+        requests that fail with a retryable status or transport error are
+        retried according to the retry policy.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        url : str
+            The full url of the request.
+        **kwargs : Any
+            Extra arguments forwarded to requests.Session.request.
+
+        Returns
+        -------
+        Response
+            The response returned by the server. This may be a failed response
+            once every attempt has been used.
+
+        Raises
+        ------
+        MALCircuitOpenError
+            MAL is currently marked unhealthy.
+        RequestException
+            A transport error occured on the final attempt.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        max_attempts : int = self.retry_policy.max_attempts if method.upper() in IDEMPOTENT_METHODS else 1
+
+        attempt : int = 0
+        while True :
+            attempt += 1
+            self.breaker.before_request()
+            self.limiter.acquire(self.priority)
+
+            try :
+                response : Response = self._session.request(method, url, **kwargs)
+            except RequestException as error :
+                if not self.retry_policy.is_retryable_error(error) :
+                    raise
+                self.breaker.record_failure(self._probe)
+                if attempt >= max_attempts :
+                    self.retry_policy.record_exhausted()
+                    raise
+                self._backoff(attempt)
+                continue
+
+            self._throttle(response)
+            if response.status_code >= 500 :
+                self.breaker.record_failure(self._probe)
+            else :
+                self.breaker.record_success()
+
+            if not self.retry_policy.is_retryable_status(response.status_code) :
+                return response
+            if attempt >= max_attempts :
+                self.retry_policy.record_exhausted()
+                return response
+            response.close()
+            self._backoff(attempt)
+
+    def _throttle(self, response : Response) -> None :
+        """
+        _throttle (private method)
+
+        Honor upstream throttling for the whole process.
+        """
+        if response.status_code in (403, 429) :
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is None and response.status_code == 429 :
+                retry_after = MAL_RATE_LIMIT_DEFAULT_PENALTY
+            if retry_after is not None :
+                self.limiter.pause(retry_after)
+
+    def _backoff(self, attempt : int) -> None :
+        """
+        _backoff (private method)
+
+        Count a retry and sleep for the jittered backoff.
+        """
+        self.retry_policy.record_retry(attempt)
+        sleep(self.retry_policy.backoff(attempt))
+
+    def _probe(self) -> bool :
+        """
+        _probe (private method)
+
+        Recovery probe used by the circuit breaker. Any answer that is not a
+        server error or throttling means MAL is reachable again.
+        """
+        self.limiter.acquire(self.priority)
+        response : Response = self._session.get(self.probe_url, timeout=self.timeout)
+        response.close()
+        return response.status_code < 500 and response.status_code != 429
+
+    def stats(self) -> dict :
+        """
+        stats (public method)
+
+        Helper for returning the limiter, retry and breaker state of this
+        client.
+
+        Returns
+        -------
+        dict
+            A dictionary object keyed by 'rate_limit', 'retry' and 'breaker'.
+        """
+        return {
+            'rate_limit' : self.limiter.stats(),
+            'retry' : self.retry_policy.stats(),
+            'breaker' : self.breaker.stats()
+        }
+
+    def with_priority(self, priority : str) -> 'MALClient' :
+        """
+        with_priority (public method)
+
+        Helper for returning a view of this client that shares its connection
+        pool and limiter but submits requests at a different priority.
+
+        Parameters
+        ----------
+        priority : str
+            Either INTERACTIVE or BACKGROUND.
+
+        Returns
+        -------
+        MALClient
+            The client view.
+        """
+        view : MALClient = copy(self)
+        view.priority = priority
+        return view
+
+    def get(self, url : str, **kwargs : Any) -> Response :
+        """
+        get (public method)
+
+        Submit a GET request through the pooled session.
+
+        Parameters
+        ----------
+        url : str
+            The full url of the request.
+        **kwargs : Any
+            Extra arguments forwarded to requests.Session.request.
+
+        Returns
+        -------
+        Response
+            The response returned by the server.
+        """
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url : str, data : Any = None, **kwargs : Any) -> Response :
+        """
+        post (public method)
+
+        Submit a POST request through the pooled session.
+
+        Parameters
+        ----------
+        url : str
+            The full url of the request.
+        data : Any, optional
+            The body of the request.
+            By default None.
+        **kwargs : Any
+            Extra arguments forwarded to requests.Session.request.
+
+        Returns
+        -------
+        Response
+            The response returned by the server.
+        """
+        return self.request('POST', url, data=data, **kwargs)
+
+    def close(self) -> None :
+        """
+        close (public method)
+
+        Close every pooled connection held by the client.
+        """
+        self._session.close()
+
+    def __enter__(self) :
+        return self
+
+    def __exit__(self, *args) :
+        self.close()
+
+# shared client
+
+_default_client : MALClient | None = None
+_default_client_lock : Lock = Lock()
+
+def get_default_client() -> MALClient :
+    """
+    get_default_client (function)
+
+    Helper for returning the process-wide MALClient. The client is created on
+    first use.
+
+    Returns
+    -------
+    MALClient
+        The shared client.
+    """
+    global _default_client
+    if _default_client is None :
+        with _default_client_lock :
+            if _default_client is None :
+                _default_client = MALClient()
+    return _default_client
+
+def set_default_client(client : MALClient) -> None :
+    """
+    set_default_client (function)
+
+    Replace the process-wide MALClient, for example with one configured with a
+    different pool size or timeouts.
+
+    Parameters
+    ----------
+    client : MALClient
+        The client every MAL_api class will use by default.
+    """
+    global _default_client
+    with _default_client_lock :
+        _default_client = client
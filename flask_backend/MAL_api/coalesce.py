@@ -0,0 +1,166 @@
+# native imports
+
+from asyncio import AbstractEventLoop, Task, ensure_future, get_running_loop, shield
+from threading import Event, Lock
+from typing import Any, Awaitable, Callable, Hashable
+
+class _Call :
+    """
+    (class object)
+
+    A single in-flight call shared by every waiter with the same key.
+    """
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self) :
+        self.event : Event = Event()
+        self.result : Any = None
+        self.error : BaseException | None = None
+
+class SingleFlight :
+    """
+    (class object)
+
+    Coalesces identical concurrent calls across threads. The first caller for
+    a key runs the call and every caller that arrives while it is in flight
+    waits for, and shares, the same result or exception. Nothing is kept once
+    the call finishes, so this is not a cache.
+    """
+    def __init__(self) :
+        self._lock : Lock = Lock()
+        self._calls : dict[Hashable, _Call] = dict()
+
+        # observability
+        self._leaders : int = 0
+        self._coalesced : int = 0
+
+    def do(self, key : Hashable, func : Callable, *args : Any) -> Any :
+        """
+        do (public method)
+
+        Run func(*args) unless a call with the same key is already in flight,
+        in which case wait for that call instead.
+
+        Parameters
+        ----------
+        key : Hashable
+            The canonical key of the call.
+        func : Callable
+            The call to run.
+        *args : Any
+            The arguments for func.
+
+        Returns
+        -------
+        Any
+            The result of the shared call.
+        """
+        with self._lock :
+            call : _Call | None = self._calls.get(key)
+            leader : bool = call is None
+            if leader :
+                call = _Call()
+                self._calls[key] = call
+                self._leaders += 1
+            else :
+                self._coalesced += 1
+
+        if not leader :
+            call.event.wait()
+            if call.error is not None :
+                raise call.error
+            return call.result
+
+        try :
+            call.result = func(*args)
+            return call.result
+        except BaseException as error :
+            call.error = error
+            raise
+        finally :
+            with self._lock :
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self) -> dict :
+        """
+        stats (public method)
+
+        Helper for returning the coalescing counters.
+
+        Returns
+        -------
+        dict
+            A dictionary object containing the calls in flight, the calls that
+            went upstream and the calls served by another caller.
+        """
+        with self._lock :
+            return {
+                'in_flight' : len(self._calls),
+                'leaders' : self._leaders,
+                'coalesced' : self._coalesced
+            }
+
+class AsyncSingleFlight :
+    """
+    (class object)
+
+    The asyncio counterpart to SingleFlight. The shared call runs as a task so
+    a waiter being cancelled never cancels the call for the other waiters.
+    """
+    def __init__(self) :
+        self._tasks : dict[tuple[AbstractEventLoop, Hashable], Task] = dict()
+
+        # observability
+        self._leaders : int = 0
+        self._coalesced : int = 0
+
+    async def do(self, key : Hashable, func : Callable[..., Awaitable], *args : Any) -> Any :
+        """
+        do (public method)
+
+        Await func(*args) unless a call with the same key is already in flight
+        on this event loop, in which case await that call instead.
+
+        Parameters
+        ----------
+        key : Hashable
+            The canonical key of the call.
+        func : Callable[..., Awaitable]
+            The coroutine function to run.
+        *args : Any
+            The arguments for func.
+
+        Returns
+        -------
+        Any
+            The result of the shared call.
+        """
+        task_key = (get_running_loop(), key)
+        task : Task | None = self._tasks.get(task_key)
+        if task is None :
+            self._leaders += 1
+            task = ensure_future(func(*args))
+            self._tasks[task_key] = task
+            task.add_done_callback(lambda _ : self._tasks.pop(task_key, None))
+        else :
+            self._coalesced += 1
+        return await shield(task)
+
+    def stats(self) -> dict :
+        """
+        stats (public method)
+
+        Helper for returning the coalescing counters.
+
+        Returns
+        -------
+        dict
+            A dictionary object containing the calls in flight, the calls that
+            went upstream and the calls served by another caller.
+        """
+        return {
+            'in_flight' : len(self._tasks),
+            'leaders' : self._leaders,
+            'coalesced' : self._coalesced
+        }
@@ -0,0 +1,96 @@
+# native imports
+
+import json
+from typing import Any, Callable
+
+# optional fast backend
+try :
+    import orjson
+except ImportError :
+    orjson = None
+
+# the backend in use, either 'orjson' or 'json'
+BACKEND : str = 'orjson' if orjson is not None else 'json'
+
+def loads(data : bytes | str) -> Any :
+    """
+    loads (function)
+
+    Decode a json document with the fastest installed backend.
+
+    Parameters
+    ----------
+    data : bytes | str
+        The json document, as UTF-8 bytes or text.
+
+    Returns
+    -------
+    Any
+        The decoded object.
+
+    Raises
+    ------
+    ValueError
+        The document is not valid json.
+    """
+    if orjson is not None :
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj : Any,
+          default : Callable[[Any], Any] | None = None,
+          sort_keys : bool = False,
+          indent : bool = False,
+          ensure_ascii : bool = False
+          ) -> bytes :
+    """
+    dumps (function)
+
+    Encode an object as compact UTF-8 json with the fastest installed
+    backend. With either backend, datetime, date and time objects are handed
+    to default, so they are encoded the same way whichever backend is used.
+
+    Parameters
+    ----------
+    obj : Any
+        The object to be encoded.
+    default : Callable[[Any], Any], optional
+        Called for objects the backend cannot encode, returning an encodable
+        replacement.
+        By default None.
+    sort_keys : bool, optional
+        Sort the keys of every dictionary.
+        By default False.
+    indent : bool, optional
+        Indent nested values by two spaces for readability.
+        By default False.
+    ensure_ascii : bool, optional
+        Escape non-ASCII characters. Only the json backend honors it, orjson
+        always writes UTF-8.
+        By default False.
+
+    Returns
+    -------
+    bytes
+        The encoded document.
+
+    Raises
+    ------
+    TypeError
+        An object could not be encoded.
+    """
+    if orjson is not None :
+        option : int = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if sort_keys :
+            option |= orjson.OPT_SORT_KEYS
+        if indent :
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(
+        obj,
+        default=default,
+        sort_keys=sort_keys,
+        indent=2 if indent else None,
+        separators=None if indent else (',', ':'),
+        ensure_ascii=ensure_ascii
+    ).encode()
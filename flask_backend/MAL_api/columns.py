@@ -0,0 +1,281 @@
+# native imports
+
+from array import array
+from heapq import nlargest, nsmallest
+from itertools import compress
+from typing import Any, Iterable, Sequence
+
+# optional vectorized backend
+try :
+    import numpy
+except ImportError :
+    numpy = None
+
+# local imports
+
+from .constants import ANIMELISTNODE_NUMERIC_ATTRIBUTES
+from .MAL_exceptions import InvalidAnimeListColumnError
+
+class AnimeListColumns :
+    """
+    (class object)
+
+    A columnar view over the nodes of one or more AnimeList pages. Every
+    numeric attribute is packed into a typed array alongside a mask marking
+    which nodes have a value, so filters, sorts and top-k selections read
+    contiguous arrays instead of attributes on each AnimeListNode object.
+    When NumPy is installed the operations are vectorized over zero-copy
+    views of the arrays. Otherwise they fall back to Python loops over the
+    arrays, with top-k still avoiding a full sort.
+
+    Every operation returns node indices, which can be passed back in as
+    indices to chain operations, or to take() for the nodes themselves. Nodes
+    without a value for a column never pass a filter and are sorted last.
+
+    Parameters
+    ----------
+    nodes : Iterable[AnimeListNode], optional
+        The nodes to be packed. Pages can be added later through extend().
+        By default ().
+
+    Attributes
+    ----------
+    nodes : list[AnimeListNode]
+        The packed nodes in the order they were added.
+    ids : array
+        The anime id of every node.
+    values : dict[str, array]
+        The typed array of every numeric attribute. Missing values are stored
+        as 0.
+    present : dict[str, bytearray]
+        The mask of every numeric attribute, 1 where the node has a value.
+    """
+    def __init__(self, nodes : Iterable[Any] = ()) :
+        self.nodes : list[Any] = []
+        self.ids : array = array('q')
+        self.values : dict[str, array] = {
+            attr : array(code) for attr, code in ANIMELISTNODE_NUMERIC_ATTRIBUTES.items()
+        }
+        self.present : dict[str, bytearray] = {
+            attr : bytearray() for attr in ANIMELISTNODE_NUMERIC_ATTRIBUTES
+        }
+        self.extend(nodes)
+
+    def __len__(self) -> int :
+        return len(self.nodes)
+
+    def extend(self, nodes : Iterable[Any]) -> None :
+        """
+        extend (public method)
+
+        Pack more nodes, for example the next page of a multi-page query.
+
+        Parameters
+        ----------
+        nodes : Iterable[AnimeListNode]
+            The nodes to be appended.
+        """
+        for node in nodes :
+            raw_node : dict[str, Any] = node.raw_node
+            self.nodes.append(node)
+            self.ids.append(raw_node['id'])
+            for attr, column in self.values.items() :
+                value = raw_node.get(attr)
+                if value is None :
+                    column.append(0)
+                    self.present[attr].append(0)
+                else :
+                    column.append(value)
+                    self.present[attr].append(1)
+
+    def column(self, attr : str) -> tuple[array, bytearray] :
+        """
+        column (public method)
+
+        Helper for returning the values and mask of a numeric attribute.
+
+        Raises
+        ------
+        InvalidAnimeListColumnError
+            The attribute is not a numeric column.
+        """
+        if attr not in self.values :
+            raise InvalidAnimeListColumnError(attr)
+        return (self.values[attr], self.present[attr])
+
+    def _candidates(self, attr : str, indices : Sequence[int] | None) -> list[int] :
+        """
+        _candidates (private method)
+
+        Helper for returning the indices that have a value for attr, limited
+        to indices when provided.
+        """
+        _, mask = self.column(attr)
+        if indices is None :
+            return list(compress(range(len(mask)), mask))
+        return [i for i in indices if mask[i]]
+
+    def _vectors(self, attr : str, indices : Sequence[int] | None) -> tuple[Any, Any] :
+        """
+        _vectors (private method)
+
+        Helper for returning, as NumPy arrays, the indices that have a value
+        for attr, limited to indices when provided, along with their values.
+        The arrays are copies, so the columns can still be extended.
+        """
+        values, mask = self.column(attr)
+        column = numpy.frombuffer(values, dtype=values.typecode)
+        present = numpy.frombuffer(mask, dtype=numpy.uint8).astype(bool)
+        if indices is None :
+            candidates = numpy.flatnonzero(present)
+        else :
+            candidates = numpy.asarray(indices, dtype=numpy.intp)
+            candidates = candidates[present[candidates]]
+        return (candidates, column[candidates])
+
+    def filter(self,
+               attr : str,
+               low : float | None = None,
+               high : float | None = None,
+               indices : Sequence[int] | None = None
+               ) -> list[int] :
+        """
+        filter (public method)
+
+        Select the nodes whose value for attr lies within [low, high].
+
+        Parameters
+        ----------
+        attr : str
+            The numeric attribute filtered on.
+        low : float, optional
+            The inclusive lower bound. If not provided, there is no lower
+            bound.
+            By default None.
+        high : float, optional
+            The inclusive upper bound. If not provided, there is no upper
+            bound.
+            By default None.
+        indices : Sequence[int], optional
+            Only consider these nodes, for example the result of another
+            operation.
+            By default None.
+
+        Returns
+        -------
+        list[int]
+            The matching node indices in their original order.
+        """
+        if numpy is not None :
+            candidates, vector = self._vectors(attr, indices)
+            keep = numpy.ones(len(candidates), dtype=bool)
+            if low is not None :
+                keep &= vector >= low
+            if high is not None :
+                keep &= vector <= high
+            return candidates[keep].tolist()
+
+        values, _ = self.column(attr)
+        candidates : list[int] = self._candidates(attr, indices)
+        if low is not None and high is not None :
+            return [i for i in candidates if low <= values[i] <= high]
+        if low is not None :
+            return [i for i in candidates if values[i] >= low]
+        if high is not None :
+            return [i for i in candidates if values[i] <= high]
+        return candidates
+
+    def sort(self,
+             attr : str,
+             descending : bool = False,
+             indices : Sequence[int] | None = None
+             ) -> list[int] :
+        """
+        sort (public method)
+
+        Order the nodes by their value for attr. The sort is stable and nodes
+        without a value are placed last in their original order.
+
+        Parameters
+        ----------
+        attr : str
+            The numeric attribute sorted on.
+        descending : bool, optional
+            Sort from the largest value to the smallest.
+            By default False.
+        indices : Sequence[int], optional
+            Only sort these nodes.
+            By default None.
+
+        Returns
+        -------
+        list[int]
+            The node indices in sorted order.
+        """
+        values, mask = self.column(attr)
+        missing : list[int] = [
+            i for i in (range(len(mask)) if indices is None else indices) if not mask[i]
+        ]
+        if numpy is not None :
+            candidates, vector = self._vectors(attr, indices)
+            # negating keeps ties in their original order when descending
+            order = numpy.argsort(-vector if descending else vector, kind='stable')
+            return candidates[order].tolist() + missing
+
+        candidates : list[int] = self._candidates(attr, indices)
+        return sorted(candidates, key=values.__getitem__, reverse=descending) + missing
+
+    def top_k(self,
+              attr : str,
+              k : int,
+              largest : bool = True,
+              indices : Sequence[int] | None = None
+              ) -> list[int] :
+        """
+        top_k (public method)
+
+        Select the k nodes with the largest, or smallest, values for attr
+        without sorting every node.
+
+        Parameters
+        ----------
+        attr : str
+            The numeric attribute ranked on.
+        k : int
+            The number of nodes selected.
+        largest : bool, optional
+            Select the largest values, otherwise the smallest.
+            By default True.
+        indices : Sequence[int], optional
+            Only consider these nodes.
+            By default None.
+
+        Returns
+        -------
+        list[int]
+            At most k node indices ordered from the best value. Nodes without
+            a value are never selected.
+        """
+        k = max(0, k)
+        if numpy is not None and k > 0 :
+            candidates, vector = self._vectors(attr, indices)
+            key = -vector if largest else vector
+            if k < len(key) :
+                # keep everything up to the k-th value, so ties resolve as in a full sort
+                chosen = numpy.flatnonzero(key <= numpy.partition(key, k - 1)[k - 1])
+            else :
+                chosen = numpy.arange(len(key))
+            order = chosen[numpy.argsort(key[chosen], kind='stable')][:k]
+            return candidates[order].tolist()
+
+        values, _ = self.column(attr)
+        select = nlargest if largest else nsmallest
+        return select(k, self._candidates(attr, indices), key=values.__getitem__)
+
+    def take(self, indices : Iterable[int]) -> list[Any] :
+        """
+        take (public method)
+
+        Helper for returning the nodes at the given indices.
+        """
+        return [self.nodes[i] for i in indices]
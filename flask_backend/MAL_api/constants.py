@@ -12,6 +12,8 @@ METADATA_PATH : str = '_api/'
 TOKEN_PATH : str = METADATA_PATH + 'token.json'
 KEY_PATH : str = METADATA_PATH + 'key.json'
 DB_CRED_PATH : str = METADATA_PATH + 'dbcred.json'
+CACHE_DB_PATH : str = METADATA_PATH + 'cache.sqlite3'
+CRAWL_CHECKPOINT_PATH : str = METADATA_PATH + 'crawl_anime.json'
 
 # DB default credential name
 
@@ -26,6 +28,12 @@ WARNING = 'purple'
 
 API_CLIENT_ID_LEN : int = 32
 API_CLIENT_SECRET_LEN : int = 64
+API_KEY_CHECK_INTERVAL : float = 5.0
+
+# Token constants
+
+MAL_TOKEN_REFRESH_MARGIN : float = 60 * 60
+MAL_TOKEN_RETRY_DELAY : float = 60.0
 
 # MAL_classes constants
 
@@ -51,4 +59,77 @@ ANIMEDETAILSNODE_OPTIONAL_ATTRIBUTES = [
     'related_manga', 'recommendations', 'statistics'
 ]
 
-ANIMEDETAILSNODE_ATTRIBUTES = ANIME_DEFAULT_ATTRIBUTES + ANIMEDETAILSNODE_OPTIONAL_ATTRIBUTES
\ No newline at end of file
+ANIMEDETAILSNODE_ATTRIBUTES = ANIME_DEFAULT_ATTRIBUTES + ANIMEDETAILSNODE_OPTIONAL_ATTRIBUTES
+
+# nodes resolve their attributes from the raw payload on first access
+MAL_LAZY_NODES : bool = True
+
+# numeric AnimeListNode attributes packed by AnimeListColumns with their array typecodes
+ANIMELISTNODE_NUMERIC_ATTRIBUTES : dict[str, str] = {
+    'mean' : 'd',
+    'rank' : 'q',
+    'popularity' : 'q',
+    'num_list_users' : 'q',
+    'num_scoring_users' : 'q',
+    'num_episodes' : 'q',
+    'average_episode_duration' : 'q'
+}
+
+# MALClient constants
+
+MAL_CLIENT_POOL_CONNECTIONS : int = 4
+MAL_CLIENT_POOL_MAXSIZE : int = 32
+MAL_CLIENT_POOL_BLOCK : bool = True
+MAL_CLIENT_CONNECT_TIMEOUT : float = 3.05
+MAL_CLIENT_READ_TIMEOUT : float = 15.0
+
+# async_classes constants
+
+MAL_ASYNC_MAX_WORKERS : int = 64
+MAL_ASYNC_CONCURRENCY : int = 16
+
+# streaming constants
+
+MAL_STREAM_CHUNK_SIZE : int = 16 * 1024
+
+# batch constants
+
+MAL_BATCH_MAX_WORKERS : int = 8
+
+# ranking constants
+
+MAL_RANKING_MAX_LIMIT : int = 500
+MAL_RANKING_TYPES : list[str] = [
+    'all', 'airing', 'upcoming', 'tv', 'ova', 'movie', 'special', 'bypopularity',
+    'favorite'
+]
+
+# Rate limit constants
+
+MAL_RATE_LIMIT_RATE : float = 2.0
+MAL_RATE_LIMIT_BURST : int = 10
+MAL_RATE_LIMIT_INTERACTIVE_RESERVE : float = 0.3
+MAL_RATE_LIMIT_DEFAULT_PENALTY : float = 5.0
+
+# Resilience constants
+
+MAL_RETRY_MAX_ATTEMPTS : int = 4
+MAL_RETRY_BASE_DELAY : float = 0.5
+MAL_RETRY_MAX_DELAY : float = 8.0
+MAL_RETRY_STATUSES : frozenset[int] = frozenset({429, 500, 502, 503, 504})
+MAL_BREAKER_FAILURE_THRESHOLD : int = 5
+MAL_BREAKER_RECOVERY_TIMEOUT : float = 30.0
+MAL_BREAKER_PROBE_URL : str = MAL_ANIME_ENDPOINT + '/1?fields=id'
+
+# Response cache constants
+
+MAL_CACHE_MAX_BYTES : int = 64 * 1024 * 1024
+MAL_CACHE_TTLS : dict[str, float] = {
+    'anime' : 6 * 60 * 60,
+    'anime_list' : 15 * 60
+}
+MAL_CACHE_DEFAULT_TTL : float = 15 * 60
+MAL_DETAILS_CACHE_LOCK_STRIPES : int = 64
+MAL_DISK_CACHE_ENABLED : bool = False
+MAL_DISK_CACHE_MAX_BYTES : int = 512 * 1024 * 1024
+MAL_DISK_CACHE_COMPACT_EVERY : int = 1000
@@ -0,0 +1,251 @@
+# native imports
+
+from json import dumps as dumps_key
+from os import makedirs
+from os.path import dirname
+from sqlite3 import Connection, Error as SQLiteError, connect
+from threading import Lock, local
+from time import time
+from typing import Any, Hashable
+
+# local imports
+
+from .codec import dumps, loads
+from .constants import (
+    CACHE_DB_PATH,
+    MAL_DISK_CACHE_COMPACT_EVERY,
+    MAL_DISK_CACHE_MAX_BYTES
+)
+
+class DiskCache :
+    """
+    (class object)
+
+    A persistent cache tier for decoded MAL responses backed by SQLite, so a
+    restarted worker starts warm instead of sending a burst of queries to MAL.
+    The database runs in WAL mode with a busy timeout, which lets several
+    worker processes read and write the same file safely. Every entry carries
+    its expiry time, and the file is compacted every compact_every writes by
+    dropping expired entries and then the least recently used ones until the
+    payloads fit max_bytes.
+
+    Errors from SQLite are never raised to the caller. A failed read is a miss
+    and a failed write is skipped, because this tier is only an optimization.
+
+    Parameters
+    ----------
+    path : str, optional
+        The SQLite database file.
+        By default CACHE_DB_PATH.
+    max_bytes : int, optional
+        The byte budget for every stored payload combined.
+        By default MAL_DISK_CACHE_MAX_BYTES.
+    compact_every : int, optional
+        The number of writes from this process between compactions.
+        By default MAL_DISK_CACHE_COMPACT_EVERY.
+    """
+    def __init__(self,
+                 path : str = CACHE_DB_PATH,
+                 max_bytes : int = MAL_DISK_CACHE_MAX_BYTES,
+                 compact_every : int = MAL_DISK_CACHE_COMPACT_EVERY
+                 ) :
+        self.path : str = path
+        self.max_bytes : int = max_bytes
+        self.compact_every : int = max(1, compact_every)
+
+        # sqlite connections may not be shared between threads
+        self._local : local = local()
+
+        # guards the write count and the counters, updated from many threads
+        self._lock : Lock = Lock()
+        self._writes : int = 0
+
+        # observability
+        self._hits : int = 0
+        self._misses : int = 0
+        self._errors : int = 0
+        self._compactions : int = 0
+
+    def _connection(self) -> Connection :
+        """
+        _connection (private method)
+
+        Helper for returning the connection of the calling thread, creating
+        the database and its schema on first use.
+        """
+        conn : Connection | None = getattr(self._local, 'conn', None)
+        if conn is None :
+            if dirname(self.path) :
+                makedirs(dirname(self.path), exist_ok=True)
+            conn = connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, '
+                'value TEXT NOT NULL, '
+                'size INTEGER NOT NULL, '
+                'expires_at REAL NOT NULL, '
+                'accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(key : Hashable) -> str :
+        """
+        _key (private method)
+
+        Helper for turning a canonical query key into its stored form. The
+        standard library encoder is always used so keys stay identical
+        whichever codec backend is installed.
+        """
+        return dumps_key(key, separators=(',', ':'))
+
+    def get(self, key : Hashable) -> tuple[Any, float] | None :
+        """
+        get (public method)
+
+        Look up a stored payload and mark it as recently used.
+
+        Parameters
+        ----------
+        key : Hashable
+            The canonical query key.
+
+        Returns
+        -------
+        tuple[Any, float] | None
+            The payload paired with its remaining seconds to live, or None on
+            a miss or expired entry.
+        """
+        now : float = time()
+        try :
+            conn : Connection = self._connection()
+            row = conn.execute(
+                'SELECT value, expires_at FROM responses WHERE key = ?', (self._key(key),)
+            ).fetchone()
+            if row is None or row[1] <= now :
+                with self._lock :
+                    self._misses += 1
+                return None
+            conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, self._key(key)))
+        except SQLiteError :
+            with self._lock :
+                self._errors += 1
+            return None
+
+        with self._lock :
+            self._hits += 1
+        return (loads(row[0]), row[1] - now)
+
+    def put(self, key : Hashable, value : Any, ttl : float) -> None :
+        """
+        put (public method)
+
+        Store a payload, compacting the database every compact_every writes.
+
+        Parameters
+        ----------
+        key : Hashable
+            The canonical query key.
+        value : Any
+            The json serializable payload.
+        ttl : float
+            Seconds the entry lives for.
+        """
+        now : float = time()
+        payload : bytes = dumps(value)
+        try :
+            self._connection().execute(
+                'INSERT OR REPLACE INTO responses (key, value, size, expires_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (self._key(key), payload, len(payload), now + ttl, now)
+            )
+        except SQLiteError :
+            with self._lock :
+                self._errors += 1
+            return
+
+        with self._lock :
+            self._writes += 1
+            due : bool = self._writes % self.compact_every == 0
+        if due :
+            self.compact()
+
+    def invalidate(self, key : Hashable) -> None :
+        """
+        invalidate (public method)
+
+        Drop a single entry if it is stored.
+        """
+        try :
+            self._connection().execute('DELETE FROM responses WHERE key = ?', (self._key(key),))
+        except SQLiteError :
+            with self._lock :
+                self._errors += 1
+
+    def compact(self) -> None :
+        """
+        compact (public method)
+
+        Drop expired entries, then the least recently used entries until the
+        stored payloads fit max_bytes. The work runs in one write transaction
+        so concurrent processes compacting at once do not both delete.
+        """
+        try :
+            conn : Connection = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try :
+                conn.execute('DELETE FROM responses WHERE expires_at <= ?', (time(),))
+                total : int = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+                if total > self.max_bytes :
+                    # free down to 90% of the budget so compaction is not triggered every write
+                    excess : int = total - int(self.max_bytes * 0.9)
+                    conn.execute(
+                        'DELETE FROM responses WHERE key IN ('
+                        'SELECT key FROM ('
+                        'SELECT key, SUM(size) OVER (ORDER BY accessed_at, key) - size AS freed_before '
+                        'FROM responses) WHERE freed_before < ?)',
+                        (excess,)
+                    )
+                conn.execute('COMMIT')
+            except SQLiteError :
+                conn.execute('ROLLBACK')
+                raise
+        except SQLiteError :
+            with self._lock :
+                self._errors += 1
+            return
+        with self._lock :
+            self._compactions += 1
+
+    def stats(self) -> dict :
+        """
+        stats (public method)
+
+        Helper for returning the disk tier counters.
+
+        Returns
+        -------
+        dict
+            A dictionary object containing the entry count, bytes stored, and
+            the hit, miss, error and compaction counters of this process.
+        """
+        try :
+            entries, stored = self._connection().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+            ).fetchone()
+        except SQLiteError :
+            entries, stored = (None, None)
+        with self._lock :
+            return {
+                'entries' : entries,
+                'bytes' : stored,
+                'max_bytes' : self.max_bytes,
+                'hits' : self._hits,
+                'misses' : self._misses,
+                'errors' : self._errors,
+                'compactions' : self._compactions
+            }
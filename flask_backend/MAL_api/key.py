@@ -2,15 +2,19 @@
 
 from dataclasses import dataclass
 from json import dump, load
-from os import makedirs
+from os import makedirs, stat
 from os.path import exists
 from termcolor import colored
+from threading import Lock
+from time import monotonic
+import signal
 
 # local imports
 
 from .constants import (
     API_CLIENT_ID_LEN,
     API_CLIENT_SECRET_LEN,
+    API_KEY_CHECK_INTERVAL,
     DANGER,
     METADATA_PATH,
     KEY_PATH
@@ -89,14 +93,24 @@ class APIKey :
         invalid length or was not present correctly in the document. The API
         key will need to be reset upon runtime if this is thrown or the file
         needs to be modified to fit the API credentials.
+    KeyFileNotFoundError
+        The key file is missing and interactive is False.
+
+    Parameters
+    ----------
+    interactive : bool, optional
+        Whether to prompt for the credentials on the terminal when the key
+        file is missing. Server code must pass False.
+        By default True.
     """
     
     _id : str
     _secret : str
 
-    def __init__(self) :
+    def __init__(self, interactive : bool = True) :
         # probe the user for API credentials if there have been none provided before runtime
-        self._makeKeyFile()
+        if interactive :
+            self._makeKeyFile()
 
         # grab API information
         
@@ -105,6 +119,8 @@ class APIKey :
         except (InvalidClientIdError, InvalidClientSecretError) :
             raise APIKeyInvalidArgumentError
         except KeyFileNotFoundError :
+            if not interactive :
+                raise
             self._makeKeyFile()
             data_pair : dict = self._grabAPIInfo()
         
@@ -199,3 +215,114 @@ class APIKey :
             with open(KEY_PATH, 'w') as file :
                 dump(key_data, file, indent=4)
             print("key was successfully written to the parent directory!\n")
+
+class CredentialProvider :
+    """
+    (class object)
+
+    A process-wide holder for the API key so building a request header never
+    touches the filesystem. The key file is loaded once and reloaded only when
+    its modification time changes, which is checked at most every
+    check_interval seconds, or after invalidate() is called, for example from
+    the handler of install_sighup_handler(). The key file is never prompted
+    for, so a missing file raises KeyFileNotFoundError instead of blocking a
+    server thread on input().
+
+    Parameters
+    ----------
+    check_interval : float, optional
+        Seconds between modification time checks of the key file.
+        By default API_KEY_CHECK_INTERVAL.
+    """
+    def __init__(self, check_interval : float = API_KEY_CHECK_INTERVAL) :
+        self.check_interval : float = check_interval
+
+        self._lock : Lock = Lock()
+        self._key : tuple[str, str] | None = None
+        self._mtime : float | None = None
+        self._next_check : float = 0.0
+
+    def getKey(self) -> tuple[str, str] :
+        """
+        getKey (public method)
+
+        Helper for returning the cached key, reloading it first if the key
+        file changed or the provider was invalidated.
+
+        Returns
+        -------
+        tuple[str, str]
+            A tuple containing strings for the id and secret respectfully.
+
+        Raises
+        ------
+        KeyFileNotFoundError
+            The key file was not found and no key was loaded before.
+        """
+        key : tuple[str, str] | None = self._key
+        if key is not None and monotonic() < self._next_check :
+            return key
+
+        with self._lock :
+            if self._key is not None and monotonic() < self._next_check :
+                return self._key
+            try :
+                mtime : float | None = stat(KEY_PATH).st_mtime
+            except FileNotFoundError :
+                mtime = None
+
+            # keep serving the loaded key if the file disappears
+            if self._key is None or (mtime is not None and mtime != self._mtime) :
+                self._key = APIKey(interactive=False).getKey()
+                self._mtime = mtime
+            self._next_check = monotonic() + self.check_interval
+            return self._key
+
+    def invalidate(self) -> None :
+        """
+        invalidate (public method)
+
+        Force the key file to be reloaded on the next call to getKey.
+        """
+        with self._lock :
+            self._mtime = None
+            self._next_check = 0.0
+
+# shared credentials
+
+_default_credentials : CredentialProvider = CredentialProvider()
+
+def get_default_credentials() -> CredentialProvider :
+    """
+    get_default_credentials (function)
+
+    Helper for returning the process-wide credential provider.
+
+    Returns
+    -------
+    CredentialProvider
+        The shared provider.
+    """
+    return _default_credentials
+
+def install_sighup_handler() -> None :
+    """
+    install_sighup_handler (function)
+
+    Reload the key file on SIGHUP instead of terminating, chaining any handler
+    already installed. It replaces the process-wide handler, so it is only
+    called by the application that opts into it, see create_app(). Signal
+    handlers can only be installed from the main thread and SIGHUP does not
+    exist on every platform, so either case is skipped quietly.
+    """
+    try :
+        previous = signal.getsignal(signal.SIGHUP)
+
+        def _on_sighup(signum, frame) :
+            _default_credentials.invalidate()
+            if callable(previous) :
+                previous(signum, frame)
+
+        signal.signal(signal.SIGHUP, _on_sighup)
+    except (AttributeError, ValueError) :
+        pass
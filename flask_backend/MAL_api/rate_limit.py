@@ -0,0 +1,261 @@
+# native imports
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Condition, Lock
+from time import monotonic
+
+# local imports
+
+from .constants import (
+    MAL_RATE_LIMIT_BURST,
+    MAL_RATE_LIMIT_INTERACTIVE_RESERVE,
+    MAL_RATE_LIMIT_RATE
+)
+from .MAL_exceptions import RateLimitTimeoutError
+
+# request priorities
+
+INTERACTIVE : str = 'interactive'
+BACKGROUND : str = 'background'
+
+class TokenBucket :
+    """
+    (class object)
+
+    A thread-safe token bucket that paces every upstream call to MAL. Tokens
+    refill continuously at rate per second up to capacity. A share of the
+    bucket is reserved for interactive callers, meaning background callers
+    may only take a token while more than the reserve remains, so batch jobs
+    can never starve requests made on behalf of a user.
+
+    Parameters
+    ----------
+    rate : float, optional
+        Tokens added to the bucket per second.
+        By default MAL_RATE_LIMIT_RATE.
+    capacity : int, optional
+        The maximum number of tokens, which is also the largest burst.
+        By default MAL_RATE_LIMIT_BURST.
+    interactive_reserve : float, optional
+        The fraction of capacity that only interactive callers may use. It is
+        clamped so that at least one token is left for background callers.
+        By default MAL_RATE_LIMIT_INTERACTIVE_RESERVE.
+
+    Raises
+    ------
+    ValueError
+        The rate is not positive or the capacity is below one token.
+    """
+    def __init__(self,
+                 rate : float = MAL_RATE_LIMIT_RATE,
+                 capacity : int = MAL_RATE_LIMIT_BURST,
+                 interactive_reserve : float = MAL_RATE_LIMIT_INTERACTIVE_RESERVE
+                 ) :
+        if rate <= 0 :
+            raise ValueError(f'rate must be positive, got {rate}')
+        if capacity < 1 :
+            raise ValueError(f'capacity must hold at least one token, got {capacity}')
+        self.rate : float = rate
+        self.capacity : float = float(capacity)
+        # background callers need one token above the reserve
+        self.reserve : float = min(
+            self.capacity * min(max(interactive_reserve, 0.0), 1.0), self.capacity - 1.0
+        )
+
+        self._cond : Condition = Condition(Lock())
+        self._tokens : float = self.capacity
+        self._updated : float = monotonic()
+        self._paused_until : float = 0.0
+
+        # observability
+        self._waiting : dict[str, int] = {INTERACTIVE : 0, BACKGROUND : 0}
+        self._acquired : int = 0
+        self._total_wait : float = 0.0
+        self._max_wait : float = 0.0
+        self._last_wait : float = 0.0
+
+    def _refill(self, now : float) -> None :
+        """
+        _refill (private method)
+
+        Add the tokens earned since the last update. Must hold the lock.
+        """
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority : str = INTERACTIVE, timeout : float | None = None) -> float :
+        """
+        acquire (public method)
+
+        Block until a token is available for the given priority and take it.
+
+        Parameters
+        ----------
+        priority : str, optional
+            Either INTERACTIVE or BACKGROUND.
+            By default INTERACTIVE.
+        timeout : float, optional
+            The maximum number of seconds to wait. None waits indefinitely.
+            By default None.
+
+        Returns
+        -------
+        float
+            The number of seconds the caller waited.
+
+        Raises
+        ------
+        RateLimitTimeoutError
+            A token could not be granted within timeout seconds.
+        """
+        floor : float = self.reserve if priority == BACKGROUND else 0.0
+        start : float = monotonic()
+
+        with self._cond :
+            self._waiting[priority] = self._waiting.get(priority, 0) + 1
+            try :
+                while True :
+                    now : float = monotonic()
+                    self._refill(now)
+                    if now >= self._paused_until and self._tokens - 1.0 >= floor :
+                        self._tokens -= 1.0
+                        break
+
+                    # sleep until either the pause ends or enough tokens have been earned
+                    delay : float = max(
+                        self._paused_until - now,
+                        (floor + 1.0 - self._tokens) / self.rate
+                    )
+                    if timeout is not None :
+                        remaining : float = timeout - (now - start)
+                        if remaining <= 0 or delay > remaining :
+                            raise RateLimitTimeoutError(timeout)
+                    self._cond.wait(delay)
+            finally :
+                self._waiting[priority] -= 1
+
+            waited : float = monotonic() - start
+            self._acquired += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            self._last_wait = waited
+            return waited
+
+    def pause(self, seconds : float) -> None :
+        """
+        pause (public method)
+
+        Stop granting tokens for the given number of seconds, e.g. when MAL
+        answers with a Retry-After header. Overlapping pauses keep the later
+        deadline.
+
+        Parameters
+        ----------
+        seconds : float
+            The number of seconds to hold every caller.
+        """
+        with self._cond :
+            self._paused_until = max(self._paused_until, monotonic() + max(seconds, 0.0))
+            self._tokens = 0.0
+            self._updated = monotonic()
+            self._cond.notify_all()
+
+    def stats(self) -> dict :
+        """
+        stats (public method)
+
+        Helper for returning a snapshot of the limiter state.
+
+        Returns
+        -------
+        dict
+            A dictionary object containing the queue depth per priority, the
+            tokens available, the remaining pause and wait time totals.
+        """
+        with self._cond :
+            now : float = monotonic()
+            self._refill(now)
+            return {
+                'queue_depth' : sum(self._waiting.values()),
+                'queue_depth_interactive' : self._waiting[INTERACTIVE],
+                'queue_depth_background' : self._waiting[BACKGROUND],
+                'tokens' : self._tokens,
+                'paused_for' : max(0.0, self._paused_until - now),
+                'acquired' : self._acquired,
+                'total_wait' : self._total_wait,
+                'max_wait' : self._max_wait,
+                'last_wait' : self._last_wait,
+                'mean_wait' : self._total_wait / self._acquired if self._acquired else 0.0
+            }
+
+def parse_retry_after(value : str | None) -> float | None :
+    """
+    parse_retry_after (function)
+
+    Helper for converting a Retry-After header into seconds. Both the
+    delay-seconds and HTTP-date forms are supported.
+
+    Parameters
+    ----------
+    value : str | None
+        The raw header value.
+
+    Returns
+    -------
+    float | None
+        The number of seconds to wait, or None if the header is missing or
+        malformed.
+    """
+    if not value :
+        return None
+    try :
+        return max(0.0, float(value))
+    except ValueError :
+        pass
+    try :
+        retry_at : datetime = parsedate_to_datetime(value)
+    except (TypeError, ValueError) :
+        return None
+    if retry_at.tzinfo is None :
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+# shared limiter
+
+_default_limiter : TokenBucket | None = None
+_default_limiter_lock : Lock = Lock()
+
+def get_default_limiter() -> TokenBucket :
+    """
+    get_default_limiter (function)
+
+    Helper for returning the process-wide limiter shared by every MALClient.
+    The limiter is created on first use.
+
+    Returns
+    -------
+    TokenBucket
+        The shared limiter.
+    """
+    global _default_limiter
+    if _default_limiter is None :
+        with _default_limiter_lock :
+            if _default_limiter is None :
+                _default_limiter = TokenBucket()
+    return _default_limiter
+
+def set_default_limiter(limiter : TokenBucket) -> None :
+    """
+    set_default_limiter (function)
+
+    Replace the process-wide limiter, for example with a different rate.
+
+    Parameters
+    ----------
+    limiter : TokenBucket
+        The limiter every new MALClient will use by default.
+    """
+    global _default_limiter
+    with _default_limiter_lock :
+        _default_limiter = limiter
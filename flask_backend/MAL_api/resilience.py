@@ -0,0 +1,330 @@
+# native imports
+
+from random import uniform
+from requests.exceptions import ChunkedEncodingError, ConnectionError, Timeout
+from threading import Lock, Thread
+from time import monotonic, sleep
+from typing import Callable
+
+# local imports
+
+from .constants import (
+    MAL_BREAKER_FAILURE_THRESHOLD,
+    MAL_BREAKER_RECOVERY_TIMEOUT,
+    MAL_RETRY_BASE_DELAY,
+    MAL_RETRY_MAX_ATTEMPTS,
+    MAL_RETRY_MAX_DELAY,
+    MAL_RETRY_STATUSES
+)
+from .MAL_exceptions import MALCircuitOpenError
+
+# breaker states
+
+CLOSED : str = 'closed'
+OPEN : str = 'open'
+HALF_OPEN : str = 'half_open'
+
+class RetryPolicy :
+    """
+    (class object)
+
+    Decides which upstream failures are retried and how long to wait between
+    attempts. Delays grow exponentially from base_delay, are capped at
+    max_delay and use full jitter so that callers failing together do not
+    retry together.
+
+    Parameters
+    ----------
+    max_attempts : int, optional
+        The total number of attempts, including the first one.
+        By default MAL_RETRY_MAX_ATTEMPTS.
+    base_delay : float, optional
+        The delay ceiling in seconds before the first retry.
+        By default MAL_RETRY_BASE_DELAY.
+    max_delay : float, optional
+        The largest delay ceiling in seconds.
+        By default MAL_RETRY_MAX_DELAY.
+    retry_statuses : frozenset[int], optional
+        The response codes that are retried.
+        By default MAL_RETRY_STATUSES.
+    """
+    def __init__(self,
+                 max_attempts : int = MAL_RETRY_MAX_ATTEMPTS,
+                 base_delay : float = MAL_RETRY_BASE_DELAY,
+                 max_delay : float = MAL_RETRY_MAX_DELAY,
+                 retry_statuses : frozenset[int] = MAL_RETRY_STATUSES
+                 ) :
+        self.max_attempts : int = max(1, max_attempts)
+        self.base_delay : float = base_delay
+        self.max_delay : float = max_delay
+        self.retry_statuses : frozenset[int] = retry_statuses
+
+        # observability
+        self._lock : Lock = Lock()
+        self._retries : int = 0
+        self._retried_requests : int = 0
+        self._exhausted : int = 0
+
+    def is_retryable_status(self, status_code : int) -> bool :
+        """
+        is_retryable_status (public method)
+
+        Helper for checking if a response code should be retried.
+        """
+        return status_code in self.retry_statuses
+
+    def is_retryable_error(self, error : Exception) -> bool :
+        """
+        is_retryable_error (public method)
+
+        Helper for checking if a transport error should be retried. Connection
+        resets, timeouts and truncated bodies are retried.
+        """
+        return isinstance(error, (ConnectionError, Timeout, ChunkedEncodingError))
+
+    def backoff(self, attempt : int) -> float :
+        """
+        backoff (public method)
+
+        Helper for returning the delay before the given retry.
+
+        Parameters
+        ----------
+        attempt : int
+            The number of attempts already made.
+
+        Returns
+        -------
+        float
+            The number of seconds to sleep.
+        """
+        return uniform(0.0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def record_retry(self, attempt : int) -> None :
+        """
+        record_retry (public method)
+
+        Count a retry. The first retry of a request also counts the request.
+        """
+        with self._lock :
+            self._retries += 1
+            if attempt == 1 :
+                self._retried_requests += 1
+
+    def record_exhausted(self) -> None :
+        """
+        record_exhausted (public method)
+
+        Count a request that failed on every attempt.
+        """
+        with self._lock :
+            self._exhausted += 1
+
+    def stats(self) -> dict :
+        """
+        stats (public method)
+
+        Helper for returning the retry counters.
+
+        Returns
+        -------
+        dict
+            A dictionary object containing the number of retries, the number
+            of requests retried at least once and the number of requests that
+            ran out of attempts.
+        """
+        with self._lock :
+            return {
+                'retries' : self._retries,
+                'retried_requests' : self._retried_requests,
+                'exhausted' : self._exhausted
+            }
+
+class CircuitBreaker :
+    """
+    (class object)
+
+    Fails upstream calls fast while MAL is unhealthy. After failure_threshold
+    consecutive failures the breaker opens and every request is rejected with
+    MALCircuitOpenError. While open, a background thread probes MAL every
+    recovery_timeout seconds and closes the breaker once a probe succeeds, so
+    no request on the request path ever pays for a doomed call.
+
+    Parameters
+    ----------
+    failure_threshold : int, optional
+        Consecutive failures before the breaker opens.
+        By default MAL_BREAKER_FAILURE_THRESHOLD.
+    recovery_timeout : float, optional
+        Seconds between recovery probes while the breaker is open.
+        By default MAL_BREAKER_RECOVERY_TIMEOUT.
+    """
+    def __init__(self,
+                 failure_threshold : int = MAL_BREAKER_FAILURE_THRESHOLD,
+                 recovery_timeout : float = MAL_BREAKER_RECOVERY_TIMEOUT
+                 ) :
+        self.failure_threshold : int = max(1, failure_threshold)
+        self.recovery_timeout : float = recovery_timeout
+
+        self._lock : Lock = Lock()
+        self._state : str = CLOSED
+        self._consecutive_failures : int = 0
+        self._next_probe : float = 0.0
+        self._probe : Callable[[], bool] | None = None
+
+        # observability
+        self._opened : int = 0
+        self._rejected : int = 0
+        self._probes : int = 0
+
+    @property
+    def state(self) -> str :
+        return self._state
+
+    def before_request(self) -> None :
+        """
+        before_request (public method)
+
+        Gate a request on the breaker state.
+
+        Raises
+        ------
+        MALCircuitOpenError
+            The breaker is not closed.
+        """
+        if self._state == CLOSED :
+            return
+        with self._lock :
+            if self._state != CLOSED :
+                self._rejected += 1
+                raise MALCircuitOpenError(max(0.0, self._next_probe - monotonic()))
+
+    def record_success(self) -> None :
+        """
+        record_success (public method)
+
+        Reset the failure count after a healthy response.
+        """
+        if self._consecutive_failures :
+            with self._lock :
+                self._consecutive_failures = 0
+
+    def record_failure(self, probe : Callable[[], bool] | None = None) -> None :
+        """
+        record_failure (public method)
+
+        Count an unhealthy response and open the breaker once the threshold is
+        reached.
+
+        Parameters
+        ----------
+        probe : Callable[[], bool], optional
+            A callable returning True if MAL is healthy again. It is used by
+            the background recovery thread when this failure opens the breaker.
+            By default None.
+        """
+        with self._lock :
+            if probe is not None :
+                self._probe = probe
+            self._consecutive_failures += 1
+            if self._state != CLOSED or self._consecutive_failures < self.failure_threshold :
+                return
+
+            self._state = OPEN
+            self._opened += 1
+            self._next_probe = monotonic() + self.recovery_timeout
+        Thread(target=self._recover, name='mal-breaker-probe', daemon=True).start()
+
+    def _recover(self) -> None :
+        """
+        _recover (private method)
+
+        Probe MAL in the background until it is healthy, then close the breaker.
+        """
+        while True :
+            sleep(max(0.0, self._next_probe - monotonic()))
+
+            with self._lock :
+                self._state = HALF_OPEN
+                self._probes += 1
+                probe = self._probe
+
+            try :
+                healthy : bool = probe is None or bool(probe())
+            except Exception :
+                healthy = False
+
+            with self._lock :
+                if healthy :
+                    self._state = CLOSED
+                    self._consecutive_failures = 0
+                    return
+                self._state = OPEN
+                self._next_probe = monotonic() + self.recovery_timeout
+
+    def stats(self) -> dict :
+        """
+        stats (public method)
+
+        Helper for returning a snapshot of the breaker state.
+
+        Returns
+        -------
+        dict
+            A dictionary object containing the state, the consecutive failure
+            count and how many times the breaker opened, rejected a request
+            and probed MAL.
+        """
+        with self._lock :
+            return {
+                'state' : self._state,
+                'consecutive_failures' : self._consecutive_failures,
+                'next_probe_in' : max(0.0, self._next_probe - monotonic()) if self._state != CLOSED else 0.0,
+                'opened' : self._opened,
+                'rejected' : self._rejected,
+                'probes' : self._probes
+            }
+
+# shared resilience layer
+
+_default_retry_policy : RetryPolicy | None = None
+_default_breaker : CircuitBreaker | None = None
+_default_lock : Lock = Lock()
+
+def get_default_retry_policy() -> RetryPolicy :
+    """
+    get_default_retry_policy (function)
+
+    Helper for returning the process-wide RetryPolicy shared by every
+    MALClient. The policy is created on first use.
+
+    Returns
+    -------
+    RetryPolicy
+        The shared retry policy.
+    """
+    global _default_retry_policy
+    if _default_retry_policy is None :
+        with _default_lock :
+            if _default_retry_policy is None :
+                _default_retry_policy = RetryPolicy()
+    return _default_retry_policy
+
+def get_default_breaker() -> CircuitBreaker :
+    """
+    get_default_breaker (function)
+
+    Helper for returning the process-wide CircuitBreaker shared by every
+    MALClient. The breaker is created on first use.
+
+    Returns
+    -------
+    CircuitBreaker
+        The shared circuit breaker.
+    """
+    global _default_breaker
+    if _default_breaker is None :
+        with _default_lock :
+            if _default_breaker is None :
+                _default_breaker = CircuitBreaker()
+    return _default_breaker
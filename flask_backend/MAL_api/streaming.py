@@ -0,0 +1,184 @@
+# native imports
+
+from json import JSONDecodeError, JSONDecoder
+from typing import Any
+
+# whitespace allowed between json tokens
+_WHITESPACE : str = ' \t\n\r'
+
+class ListStreamDecoder :
+    """
+    (class object)
+
+    An incremental decoder for the body of a MAL list response, which has the
+    form {"data" : [{"node" : {...}}, ...], "paging" : {...}}. Text is fed in
+    as it arrives and every element of data is returned as soon as it is
+    complete, so nodes can be built before the body has been received and the
+    whole body is never held at once. Every other top level member, such as
+    paging, is kept in members.
+
+    The decoder is a small state machine over the top level object, with
+    json.JSONDecoder.raw_decode parsing each array element and member value.
+    An element cut off at the end of a chunk is decoded again once more text
+    arrives.
+
+    Attributes
+    ----------
+    members : dict[str, Any]
+        The top level members other than data, filled in as they complete.
+    done : bool
+        Whether the closing brace of the top level object was read.
+    """
+    # states
+    _OBJECT_START = 'object_start'
+    _KEY = 'key'
+    _COLON = 'colon'
+    _VALUE = 'value'
+    _ARRAY_START = 'array_start'
+    _ELEMENT = 'element'
+    _ELEMENT_END = 'element_end'
+    _MEMBER_END = 'member_end'
+    _DONE = 'done'
+
+    def __init__(self, array_key : str = 'data') :
+        self.array_key : str = array_key
+        self.members : dict[str, Any] = dict()
+
+        self._decoder : JSONDecoder = JSONDecoder()
+        self._buffer : str = ''
+        self._state : str = self._OBJECT_START
+        self._key : str | None = None
+
+    @property
+    def done(self) -> bool :
+        return self._state == self._DONE
+
+    def feed(self, text : str) -> list[Any] :
+        """
+        feed (public method)
+
+        Decode as much of the received text as possible.
+
+        Parameters
+        ----------
+        text : str
+            The next piece of the body.
+
+        Returns
+        -------
+        list[Any]
+            The array elements completed by this piece, in order.
+
+        Raises
+        ------
+        JSONDecodeError
+            The body is not a json object of the expected shape.
+        """
+        buffer : str = self._buffer + text
+        pos : int = 0
+        elements : list[Any] = []
+
+        while True :
+            # skip whitespace between tokens
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE :
+                pos += 1
+            if pos >= len(buffer) or self._state == self._DONE :
+                break
+            char : str = buffer[pos]
+
+            if self._state == self._OBJECT_START :
+                self._expect(buffer, pos, '{')
+                pos += 1
+                self._state = self._KEY
+            elif self._state == self._KEY :
+                if char == '}' :
+                    pos += 1
+                    self._state = self._DONE
+                    continue
+                decoded = self._decode(buffer, pos)
+                if decoded is None :
+                    break
+                self._key, pos = decoded
+                self._state = self._COLON
+            elif self._state == self._COLON :
+                self._expect(buffer, pos, ':')
+                pos += 1
+                self._state = self._ARRAY_START if self._key == self.array_key else self._VALUE
+            elif self._state == self._VALUE :
+                decoded = self._decode(buffer, pos)
+                if decoded is None :
+                    break
+                self.members[self._key], pos = decoded
+                self._state = self._MEMBER_END
+            elif self._state == self._ARRAY_START :
+                self._expect(buffer, pos, '[')
+                pos += 1
+                self._state = self._ELEMENT
+            elif self._state == self._ELEMENT :
+                if char == ']' :
+                    pos += 1
+                    self._state = self._MEMBER_END
+                    continue
+                decoded = self._decode(buffer, pos)
+                if decoded is None :
+                    break
+                element, pos = decoded
+                elements.append(element)
+                self._state = self._ELEMENT_END
+            elif self._state == self._ELEMENT_END :
+                if char == ']' :
+                    self._state = self._MEMBER_END
+                else :
+                    self._expect(buffer, pos, ',')
+                    self._state = self._ELEMENT
+                pos += 1
+            elif self._state == self._MEMBER_END :
+                if char == '}' :
+                    self._state = self._DONE
+                else :
+                    self._expect(buffer, pos, ',')
+                    self._state = self._KEY
+                pos += 1
+
+        self._buffer = buffer[pos:]
+        return elements
+
+    def close(self) -> None :
+        """
+        close (public method)
+
+        Verify the body ended with the top level object complete.
+
+        Raises
+        ------
+        JSONDecodeError
+            The body was cut off or malformed.
+        """
+        if not self.done or self._buffer.strip() :
+            raise JSONDecodeError('Unterminated or malformed list body', self._buffer, 0)
+
+    def _decode(self, buffer : str, pos : int) -> tuple[Any, int] | None :
+        """
+        _decode (private method)
+
+        Helper for decoding one json value at pos. Returns None when the value
+        may still be incomplete, which includes a value running to the end of
+        the buffer since a number could continue in the next piece.
+        """
+        try :
+            value, end = self._decoder.raw_decode(buffer, pos)
+        except JSONDecodeError :
+            return None
+        if end >= len(buffer) :
+            return None
+        return (value, end)
+
+    @staticmethod
+    def _expect(buffer : str, pos : int, token : str) -> None :
+        """
+        _expect (private method)
+
+        Helper for rejecting a body that does not have the expected shape.
+        """
+        if buffer[pos] != token :
+            raise JSONDecodeError(f'Expecting {token!r}', buffer, pos)
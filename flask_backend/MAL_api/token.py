@@ -2,16 +2,23 @@
 
 from dataclasses import dataclass
 from json import dump, load
-from os import makedirs
-from requests import post, Response, get, HTTPError
+from os import makedirs, replace, stat, unlink
+from requests import Response, HTTPError
 from secrets import token_urlsafe
+from tempfile import NamedTemporaryFile
 from termcolor import colored
+from threading import Lock, Timer
+from time import time
 
 # local imports
 
+from .client import MALClient, get_default_client
+from .key import get_default_credentials
 from .constants import (
     DANGER,
     MAL_OAUTH2_ENDPOINT,
+    MAL_TOKEN_REFRESH_MARGIN,
+    MAL_TOKEN_RETRY_DELAY,
     METADATA_PATH,
     TOKEN_PATH,
     WARNING
@@ -44,49 +51,146 @@ class TokenValidationError(Exception) :
     def __str__(self) :
         return f'{self.message} - {self.code}'
 
+def _write_token_file(token : dict) -> None :
+    """
+    _write_token_file (private function)
+
+    Write the token to TOKEN_PATH atomically. The token is written to a
+    temporary file in the same directory and moved over the old file, so a
+    reader never sees a partially written token.
+    """
+    makedirs(METADATA_PATH, exist_ok=True)
+    with NamedTemporaryFile('w', dir=METADATA_PATH, prefix='.token-', suffix='.json', delete=False) as file :
+        dump(token, file, indent = 4)
+    try :
+        replace(file.name, TOKEN_PATH)
+    except OSError :
+        unlink(file.name)
+        raise
+
+def _authorize(client : MALClient, client_id : str, client_secret : str) -> dict :
+    """
+    _authorize (private function)
+
+    Run the terminal authorization flow for a new token and write it to disk.
+
+    Parameters
+    ----------
+    client : MALClient
+        The client used to submit the token request.
+    client_id : str
+        API client id.
+    client_secret : str
+        API client secret.
+
+    Returns
+    -------
+    dict
+        Dictionary object containing token data.
+
+    Attributes
+    ----------
+    token_type
+        Type of token as a string.
+    expires_in
+        Amount of time till the token expires from creation as an int.
+    access_token
+        Access token as a string.
+    refresh_token
+        Refresh token as a string.
+
+    Raises
+    ------
+    HTTPError
+        Bad http response occured when sending a post request to the MAL API
+        gateway.
+    """
+    # get verifier code
+    verifier : str = token_urlsafe(100)[:128]
+
+    # get auhorization code
+    url : str = f'{MAL_OAUTH2_ENDPOINT}/authorize?response_type=code&client_id={client_id}&code_challenge={verifier}'
+    
+    # print information to terminal for authorization
+    print("To authorise this application please click the following link: ")
+    print(url)
+    print("(Please check the code generated in the localhost url)\n")
+
+    # gather input from the terminal for the code
+    auth_code = input('Enter code here: ').strip()
+
+    # establish data and the url to grab the token
+    url : str = str(f'{MAL_OAUTH2_ENDPOINT}/token')
+    data : dict = {
+        'client_id' : client_id,
+        'client_secret' : client_secret,
+        'code' : auth_code,
+        'code_verifier' : verifier,
+        'grant_type' : 'authorization_code'
+    }
+
+    # send a post request to MAL using the data we aquired
+    try :
+        response : Response = client.post(url, data)
+        response.raise_for_status()
+    except HTTPError :
+        raise HTTPError
+
+    # grab the token and close the response
+    token : dict = response.json()
+    response.close()
+    print("Token has been generated successfully")
+
+    # write the token to the directory
+    print("Writing the token to disk...")
+    _write_token_file(token)
+    print(f"Token successfully wrote to disk! Token stored in {TOKEN_PATH}")
+
+    # return the token contents
+    return token
+
 @dataclass(init=False)
 class APIToken :
     """
     (class object)
 
     A container for the API token information and should be called to make API
-    communication easier to initialize. It is required to pass in the API key
-    to begin.
+    communication easier to initialize. The token is served from the
+    process-wide TokenManager, which keeps it in memory and refreshes it ahead
+    of its expiry, so constructing an APIToken never touches the disk or MAL
+    once a token is stored. Only an already expired token is refreshed on the
+    calling thread.
+
+    Parameters
+    ----------
+    key : tuple[str, str], optional
+        The API client id and secret respectfully, used to authorize on the
+        terminal when no token is stored. If not provided, the key of the
+        process-wide credential provider is used.
+        By default None.
+    client : MALClient, optional
+        The pooled client used to authorize when no token is stored. If not
+        provided, the process-wide client is used.
+        By default None.
     
     Raises
     ------
     HTTPError
         Bad http response occured when sending a post request to the MAL API
         gateway.
-    TokenValidationError
-        400-404 error code was raised.
     """
 
-    _token : dict[str, str]
+    _manager : 'TokenManager'
 
-    def __init__(self, key : tuple[str, str]):
-        # attempt to get the token if it is stored on disc
+    def __init__(self, key : tuple[str, str] | None = None, client : MALClient | None = None):
         try :
-            token = self._loadTokenData()
+            manager : TokenManager = get_default_token_manager()
         except TokenFileNotFoundError :
-            # attemp to grab the token through manually submitting a request
-            try :
-                token = self._getAPIToken(key[0], key[1])
-            except HTTPError as error :
-                raise HTTPError
-        
-        # validate the token before proceeding with initialization
-        object.__setattr__(self, '_token', token)
-        try :
-            self._validateToken(self._token['access_token'])
-        except TokenValidationError as error :
-            # check if the token needs to be refreshed
-            if error.code == 401 :
-                try :
-                    new_token = self._refreshAPIToken(key[0], key[1], self._token['refresh_token'])
-                except HTTPError :
-                    raise error
-                object.__setattr__(self, '_token', new_token)
+            # no token is stored yet, authorize once on the terminal
+            key = key if key is not None else get_default_credentials().getKey()
+            _authorize(client if client is not None else get_default_client(), key[0], key[1])
+            manager = get_default_token_manager()
+        object.__setattr__(self, '_manager', manager)
         
     def getToken(self) -> dict :
         """
@@ -110,154 +214,116 @@ class APIToken :
         refresh_token
             Refresh token as a string.        
         """
-        return self._token
+        if self._manager.expiresIn() <= 0 :
+            # the background refresh has not caught up, e.g. a stale token file
+            return self._manager.refresh()
+        return self._manager.getToken()
 
-    def _loadTokenData(self) -> dict :
-        """
-        _loadTokenData (private method)
-
-        Grab the token data from token.json file.
+class TokenManager :
+    """
+    (class object)
 
-        Returns
-        -------
-        dict
-            The token stored in the file.
+    Keeps the OAuth token in memory and refreshes it in the background ahead
+    of its expiry, so authenticated calls never pay a validation round-trip or
+    wait on a refresh. The expiry is tracked from expires_in, counted from the
+    time the token was written to disk. A refresh is scheduled margin seconds
+    before expiry on a timer thread, only one refresh runs at a time, and a
+    failed refresh is retried every MAL_TOKEN_RETRY_DELAY seconds while the
+    current token is kept. Each refreshed token is written back to disk
+    atomically.
+
+    Parameters
+    ----------
+    key : tuple[str, str], optional
+        The API client id and secret respectfully. If not provided, the key of
+        the process-wide credential provider is used.
+        By default None.
+    client : MALClient, optional
+        The pooled client used for every OAuth request. If not provided, the
+        process-wide client is used.
+        By default None.
+    margin : float, optional
+        Seconds before expiry the token is refreshed.
+        By default MAL_TOKEN_REFRESH_MARGIN.
+    interactive : bool, optional
+        Whether to run the terminal authorization flow when no token is
+        stored. Server code must leave this False.
+        By default False.
 
-        Attributes
-        ----------
-        token_type
-            Type of token as a string.
-        expires_in
-            Amount of time till the token expires from creation as an int.
-        access_token
-            Access token as a string.
-        refresh_token
-            Refresh token as a string.        
+    Raises
+    ------
+    TokenFileNotFoundError
+        No token is stored and interactive is False.
+    """
+    def __init__(self,
+                 key : tuple[str, str] | None = None,
+                 client : MALClient | None = None,
+                 margin : float = MAL_TOKEN_REFRESH_MARGIN,
+                 interactive : bool = False
+                 ) :
+        self._key : tuple[str, str] = key if key is not None else get_default_credentials().getKey()
+        self._client : MALClient = client if client is not None else get_default_client()
+        self.margin : float = margin
+
+        self._lock : Lock = Lock()
+        self._timer : Timer | None = None
+        self._closed : bool = False
 
-        Raises
-        ------
-        TokenFileNotFoundError
-            When the original token file is missing or needs generated.
-        """
         try :
-            makedirs(METADATA_PATH, exist_ok=True)
             with open(TOKEN_PATH, 'r') as file :
                 token : dict = load(file)
-            return token
+            obtained_at : float = stat(TOKEN_PATH).st_mtime
         except FileNotFoundError :
-            raise TokenFileNotFoundError("Token file was not found")
-
-    def _getAPIToken(self, client_id : str, client_secret : str) -> dict :
-        """
-        _getAPIToken (private method)
-
-        Generate a token used by the API service.
+            if not interactive :
+                raise TokenFileNotFoundError("Token file was not found")
+            token = _authorize(self._client, self._key[0], self._key[1])
+            obtained_at = time()
 
-        Parameters
-        ----------
-        client_id : str
-            API client id.
-        client_secret : str
-            API client secret.
+        self._token : dict = token
+        self._expires_at : float = obtained_at + float(token.get('expires_in', 0))
+        self._schedule(self._expires_at - self.margin - time())
 
-        Returns
-        -------
-        dict
-            Dictionary object containing token data.
-        
-        Attributes
-        ----------
-        token_type
-            Type of token as a string.
-        expires_in
-            Amount of time till the token expires from creation as an int.
-        access_token
-            Access token as a string.
-        refresh_token
-            Refresh token as a string.
+    def getToken(self) -> dict :
+        """
+        getToken (public method)
 
-        Raises
-        ------
-        HTTPError
-            Bad http response occured when sending a post request to the MAL
-            API gateway.
+        Helper for returning the token held in memory.
         """
-        # get verifier code
-        verifier : str = token_urlsafe(100)[:128]
+        return self._token
 
-        # get auhorization code
-        url : str = f'{MAL_OAUTH2_ENDPOINT}/authorize?response_type=code&client_id={client_id}&code_challenge={verifier}'
-        
-        # print information to terminal for authorization
-        print("To authorise this application please click the following link: ")
-        print(url)
-        print("(Please check the code generated in the localhost url)\n")
-
-        # gather input from the terminal for the code
-        auth_code = input('Enter code here: ').strip()
-
-        # establish data and the url to grab the token
-        url : str = str(f'{MAL_OAUTH2_ENDPOINT}/token')
-        data : dict = {
-            'client_id' : client_id,
-            'client_secret' : client_secret,
-            'code' : auth_code,
-            'code_verifier' : verifier,
-            'grant_type' : 'authorization_code'
-        }
-
-        # send a post request to MAL using the data we aquired
-        try :
-            response : Response = post(url, data)
-            response.raise_for_status()
-        except HTTPError :
-            raise HTTPError
+    def getAccessToken(self) -> str :
+        """
+        getAccessToken (public method)
 
-        # grab the token and close the response
-        token : dict = response.json()
-        response.close()
-        print("Token has been generated successfully")
+        Helper for returning the access token held in memory.
+        """
+        return self._token['access_token']
 
-        # write the token to the directory
-        print("Writing the token to disk...")
-        makedirs(METADATA_PATH, exist_ok=True)
-        with open(TOKEN_PATH, 'w') as file :
-            dump(token, file, indent = 4)
-        print(f"Token successfully wrote to disk! Token stored in {TOKEN_PATH}")
+    def expiresIn(self) -> float :
+        """
+        expiresIn (public method)
 
-        # return the token contents
-        return token
+        Helper for returning the seconds until the token expires.
+        """
+        return self._expires_at - time()
 
-    def _refreshAPIToken(self, client_id : str, client_secret : str, refresh_token : str) -> dict :
+    def refresh(self, force : bool = False) -> dict :
         """
-        _refreshAPIToken (private method)
+        refresh (public method)
 
-        Refresh API token upon a 401 error code.
+        Refresh the token if it is inside the refresh margin. Concurrent
+        callers wait for the refresh in progress and then reuse its token.
 
         Parameters
         ----------
-        client_id : str
-            API client id.
-        client_secret : str
-            API client secret.
-        refresh_token : str
-            API refresh token.
+        force : bool, optional
+            Refresh even if the token is not close to expiry.
+            By default False.
 
         Returns
         -------
         dict
-            Current new token that was wrote to disk.
-
-        Attributes
-        ----------
-        token_type
-            Type of token as a string.
-        expires_in
-            Amount of time till the token expires from creation as an int.
-        access_token
-            Access token as a string.
-        refresh_token
-            Refresh token as a string.
+            The current token.
 
         Raises
         ------
@@ -265,68 +331,89 @@ class APIToken :
             Bad http response occured when sending a post request to the MAL
             API gateway.
         """
-        # establish data and the url to grab the token
-        url : str = str(f'{MAL_OAUTH2_ENDPOINT}/token')
-        data : dict = {
-            'client_id' : client_id,
-            'client_secret' : client_secret,
-            'grant_type' : 'refresh_token',
-            'refresh_token' : refresh_token,
-        }
-
-        # send a post request to MAL using the data we aquired
-        try :
-            response : Response = post(url, data)
+        with self._lock :
+            if not force and self.expiresIn() > self.margin :
+                return self._token
+
+            response : Response = self._client.post(f'{MAL_OAUTH2_ENDPOINT}/token', {
+                'client_id' : self._key[0],
+                'client_secret' : self._key[1],
+                'grant_type' : 'refresh_token',
+                'refresh_token' : self._token['refresh_token']
+            })
             response.raise_for_status()
-        except HTTPError :
-            raise HTTPError
-
-        # grab the token and close the response
-        new_token : dict = response.json()
-        response.close()
-        print("Token has been generated successfully")
+            token : dict = response.json()
+            response.close()
 
-        # update the token to the directory
-        print("Updating the token to disk...")
-        makedirs(METADATA_PATH, exist_ok=True)
-        with open(TOKEN_PATH, 'w') as file :
-            dump(new_token, file, indent = 4)
-        print(f"Token successfully updated to disk! New token stored in {TOKEN_PATH}")
+            _write_token_file(token)
+            self._token = token
+            self._expires_at = time() + float(token.get('expires_in', 0))
+            self._schedule(self._expires_at - self.margin - time())
+            return token
 
-        # return the token contents
-        return new_token
+    def _schedule(self, delay : float) -> None :
+        """
+        _schedule (private method)
 
-    def _validateToken(self, access_token : str) -> None :
+        Replace the pending refresh timer with one firing after delay seconds.
+        """
+        if self._timer is not None :
+            self._timer.cancel()
+        if self._closed :
+            return
+        self._timer = Timer(max(0.0, delay), self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self) -> None :
         """
-        _validateToken (private method)
+        _background_refresh (private method)
 
-        Verifies the usability of the current token stored.
+        Timer callback refreshing the token, keeping the current token and
+        retrying later when the refresh fails.
+        """
+        try :
+            self.refresh()
+        except Exception :
+            with self._lock :
+                self._schedule(MAL_TOKEN_RETRY_DELAY)
 
-        Parameters
-        ----------
-        access_token : str
-            API access token.
+    def close(self) -> None :
+        """
+        close (public method)
 
-        Raises
-        ------
-        TokenValidationError
-            400-404 error code was raised.
+        Cancel the pending refresh.
         """
-        # attempt to perform a simple GET response using the current token and API credentials
-        try :
-            url : str = 'https://api.myanimelist.net/v2/users/@me'
-            response : Response = get(url, 
-                        headers = {'Authorization': f'Bearer {access_token}'})
-            response.raise_for_status()
-            response.close()
-        except HTTPError :
-            match (response.status_code) :
-                case 400 :
-                    raise TokenValidationError("Invalid parameters detected", response.status_code)
-                case 401 :
-                    # attempt to refresh to try and fix it
-                    return TokenValidationError("Invalid/Expired token", response.status_code)
-                case 403 :
-                    raise TokenValidationError("DoD detected", response.status_code)
-                case 404 :
-                    raise TokenValidationError("Invalid Path/File Not Found", response.status_code)
+        with self._lock :
+            self._closed = True
+            if self._timer is not None :
+                self._timer.cancel()
+
+# shared token manager
+
+_default_token_manager : TokenManager | None = None
+_default_token_manager_lock : Lock = Lock()
+
+def get_default_token_manager() -> TokenManager :
+    """
+    get_default_token_manager (function)
+
+    Helper for returning the process-wide TokenManager. The manager is created
+    on first use from the stored token.
+
+    Returns
+    -------
+    TokenManager
+        The shared token manager.
+
+    Raises
+    ------
+    TokenFileNotFoundError
+        No token is stored.
+    """
+    global _default_token_manager
+    if _default_token_manager is None :
+        with _default_token_manager_lock :
+            if _default_token_manager is None :
+                _default_token_manager = TokenManager()
+    return _default_token_manager
@@ -40,6 +40,23 @@ def create_app() -> Flask :
     # declare the CSRF initialization
     init_csrf(app)
 
+    # encode and decode JSON through the fast codec
+    init_json(app)
+
+    # back the MAL response cache with the optional disk tier
+    if app.config['MAL_DISK_CACHE_ENABLED'] :
+        from MAL_api.cache import ResponseCache, set_default_cache
+        from MAL_api.disk_cache import DiskCache
+        set_default_cache(ResponseCache(disk=DiskCache()))
+
+    # reload the MAL key file on SIGHUP
+    from MAL_api.key import install_sighup_handler
+    install_sighup_handler()
+
+    # declare the background anime refresher
+    from .refresher import refresher
+    refresher.init_app(app)
+
     # make a CSRF handler
     @app.after_request
     def set_csrf_cookie(response) :
@@ -53,5 +70,9 @@ def create_app() -> Flask :
     app.register_blueprint(routes.user)
     app.register_blueprint(routes.anime)
 
+    # declare the CLI commands
+    from . import commands
+    commands.register_commands(app)
+
     # return the configured app
     return app
@@ -0,0 +1,27 @@
+# native imports
+
+from flask import Flask
+
+# module imports for use elsewhere
+
+from .anime import crawl_anime, export_anime, load_anime, sync_anime
+from .key import init_mal_key
+
+
+def register_commands(app : Flask) -> None :
+    """
+    register_commands (function)
+
+    Registers the CLI commands from the commands module, so they can be run
+    as 'flask <command>'.
+
+    Parameters
+    ----------
+    app : Flask
+        The Flask object holding the app information.
+    """
+    app.cli.add_command(init_mal_key)
+    app.cli.add_command(crawl_anime)
+    app.cli.add_command(sync_anime)
+    app.cli.add_command(load_anime)
+    app.cli.add_command(export_anime)
@@ -0,0 +1,120 @@
+# native imports
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+# local imports
+
+from ..crawler import AnimeCrawler, AnimeDeltaSync
+from ..exporter import EXPORT_FORMATS, iter_export, parse_since
+from ..loader import load_anime_ndjson
+
+from MAL_api.constants import MAL_BATCH_MAX_WORKERS, MAL_RANKING_MAX_LIMIT, MAL_RANKING_TYPES
+from MAL_api.MAL_exceptions import MALCircuitOpenError
+
+@click.command('crawl-anime')
+@click.option('--ranking-type', type=click.Choice(MAL_RANKING_TYPES), default='all', show_default=True,
+              help='The ranking walked to discover anime.')
+@click.option('--batch-size', type=click.IntRange(1, MAL_RANKING_MAX_LIMIT), default=100, show_default=True,
+              help='Anime per ranking page.')
+@click.option('--max-workers', type=click.IntRange(1), default=MAL_BATCH_MAX_WORKERS, show_default=True,
+              help='Details lookups running at once.')
+@click.option('--max-items', type=click.IntRange(1), default=None,
+              help='Stop after walking this many anime.')
+@click.option('--restart', is_flag=True,
+              help='Ignore the checkpoint and crawl from the start.')
+@with_appcontext
+def crawl_anime(ranking_type : str,
+                batch_size : int,
+                max_workers : int,
+                max_items : int | None,
+                restart : bool
+                ) -> None :
+    """
+    Mirror the MAL anime catalog into the anime table, resuming from the last
+    checkpoint.
+    """
+    crawler = AnimeCrawler(ranking_type, batch_size, max_workers, log=click.echo)
+    try :
+        checkpoint = crawler.run(max_items, restart)
+    except MALCircuitOpenError as err :
+        raise click.ClickException(f'MAL is unavailable, the crawl will resume from the checkpoint - {err}')
+
+    if checkpoint['complete'] :
+        click.echo(f'Crawl complete at offset {checkpoint["offset"]}, {len(checkpoint["failed"])} anime failed')
+    else :
+        click.echo(f'Crawl stopped at offset {checkpoint["offset"]}, run again to resume')
+
+@click.command('sync-anime')
+@click.option('--ranking-type', type=click.Choice(MAL_RANKING_TYPES), default='all', show_default=True,
+              help='The ranking walked to discover anime.')
+@click.option('--batch-size', type=click.IntRange(1), default=100, show_default=True,
+              help='Changed anime fetched and written together.')
+@click.option('--max-workers', type=click.IntRange(1), default=MAL_BATCH_MAX_WORKERS, show_default=True,
+              help='Details lookups running at once.')
+@click.option('--max-items', type=click.IntRange(1), default=None,
+              help='Stop after comparing this many anime.')
+@with_appcontext
+def sync_anime(ranking_type : str,
+               batch_size : int,
+               max_workers : int,
+               max_items : int | None
+               ) -> None :
+    """
+    Refetch only the anime that are new or were updated on MAL since they
+    were stored.
+    """
+    sync = AnimeDeltaSync(ranking_type, batch_size, max_workers, log=click.echo)
+    try :
+        report = sync.run(max_items)
+    except MALCircuitOpenError as err :
+        raise click.ClickException(f'MAL is unavailable, synced pages were kept - {err}')
+
+    click.echo(
+        f'Skipped {report["skipped"]}, refreshed {report["refreshed"]}, added {report["added"]}, '
+        f'failed {len(report["failed"])}'
+    )
+    click.echo(', '.join(f'{step} {seconds:.2f}s' for step, seconds in report['timings'].items()))
+
+@click.command('load-anime')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@with_appcontext
+def load_anime(path : str) -> None :
+    """
+    Load an NDJSON dump of MAL anime nodes into the anime table with COPY.
+    """
+    report = load_anime_ndjson(path, log=click.echo)
+    click.echo(
+        f'Read {report["read"]} lines, skipped {report["skipped"]}, merged {report["merged"]} rows '
+        f'(copy {report["timings"]["copy"]:.2f}s, merge {report["timings"]["merge"]:.2f}s)'
+    )
+    if report['skipped'] > 0 :
+        click.echo(f'Skipped lines : {", ".join(str(line) for line in report["skipped_lines"])}')
+
+@click.command('export-anime')
+@click.option('--format', 'format', type=click.Choice(list(EXPORT_FORMATS)), default='ndjson', show_default=True,
+              help='The output format.')
+@click.option('--columns', default=None,
+              help='Comma separated anime columns to export, every column by default.')
+@click.option('--since', default=None,
+              help='Only export rows refreshed at or after this ISO 8601 date or datetime.')
+@click.option('--output', type=click.File('wb'), default='-', show_default=True,
+              help='The file written to.')
+@with_appcontext
+def export_anime(format : str, columns : str | None, since : str | None, output) -> None :
+    """
+    Stream the anime table to a file through a server-side cursor.
+    """
+    try :
+        chunks = iter_export(
+            format,
+            columns.split(',') if columns else None,
+            parse_since(since),
+            current_app.config['ANIME_EXPORT_BATCH_SIZE']
+        )
+    except ValueError as err :
+        raise click.BadParameter(str(err))
+
+    for chunk in chunks :
+        output.write(chunk)
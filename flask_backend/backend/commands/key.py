@@ -0,0 +1,17 @@
+# native imports
+
+import click
+
+# local imports
+
+from MAL_api.constants import KEY_PATH
+from MAL_api.key import APIKey
+
+@click.command('init-mal-key')
+def init_mal_key() -> None :
+    """
+    Prompt for the MAL API client id and secret and write the key file the
+    server reads them from. An existing key file is kept.
+    """
+    APIKey(interactive=True)
+    click.echo(f'MAL API key is stored in {KEY_PATH}')
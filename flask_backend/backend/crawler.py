@@ -0,0 +1,493 @@
+# native imports
+
+from datetime import datetime, timezone
+from json import dump, load
+from os import makedirs, path, replace, unlink
+from requests import HTTPError
+from tempfile import NamedTemporaryFile
+from time import perf_counter
+from flask import current_app
+from typing import Any, Callable
+
+# local imports
+
+from .extensions import db
+from .routes._helpers import bulk_upsert
+
+from MAL_api.cache import get_default_details_cache
+from MAL_api.client import MALClient, get_default_client
+from MAL_api.constants import (
+    ANIMEDETAILSNODE_OPTIONAL_ATTRIBUTES,
+    CRAWL_CHECKPOINT_PATH,
+    MAL_BATCH_MAX_WORKERS,
+    MAL_RANKING_MAX_LIMIT
+)
+from MAL_api.MAL_classes import fetch_anime_ranking, fetch_many_details
+from MAL_api.MAL_exceptions import InvalidAnimeDetailsAnimeIdError, MALCircuitOpenError
+from MAL_api.rate_limit import BACKGROUND
+
+def new_checkpoint(ranking_type : str) -> dict[str, Any] :
+    """
+    new_checkpoint (function)
+
+    Helper for returning the checkpoint of a crawl that has not started.
+    """
+    return {
+        'ranking_type' : ranking_type,
+        'offset' : 0,
+        'failed' : [],
+        'complete' : False,
+        'updated_at' : None
+    }
+
+def load_checkpoint(checkpoint_path : str = CRAWL_CHECKPOINT_PATH) -> dict[str, Any] | None :
+    """
+    load_checkpoint (function)
+
+    Read the checkpoint of the last crawl.
+
+    Parameters
+    ----------
+    checkpoint_path : str, optional
+        The checkpoint file.
+        By default CRAWL_CHECKPOINT_PATH.
+
+    Returns
+    -------
+    dict[str, Any] | None
+        The checkpoint, or None if no crawl has been checkpointed.
+    """
+    if not path.exists(checkpoint_path) :
+        return None
+    with open(checkpoint_path, 'r') as file :
+        return load(file)
+
+def _write_checkpoint(checkpoint : dict[str, Any], checkpoint_path : str) -> None :
+    """
+    _write_checkpoint (private function)
+
+    Write the checkpoint atomically. The checkpoint is written to a temporary
+    file in the same directory and moved over the old file, so a crash while
+    writing leaves the previous checkpoint in place.
+    """
+    directory : str = path.dirname(checkpoint_path) or '.'
+    makedirs(directory, exist_ok=True)
+    checkpoint['updated_at'] = datetime.now(timezone.utc).isoformat()
+    with NamedTemporaryFile('w', dir=directory, prefix='.crawl-', suffix='.json', delete=False) as file :
+        dump(checkpoint, file, indent = 4)
+    try :
+        replace(file.name, checkpoint_path)
+    except OSError :
+        unlink(file.name)
+        raise
+
+def upsert_anime(nodes : dict[int, dict[str, Any]]) -> tuple[int, list[int]] :
+    """
+    upsert_anime (function)
+
+    Write the rows of many anime from their MAL nodes with bulk_upsert(), in
+    batches of ANIME_UPSERT_BATCH_SIZE rows. Must be called within an
+    application context.
+
+    Parameters
+    ----------
+    nodes : dict[int, dict[str, Any]]
+        The nodes returned by MAL keyed by anime id.
+
+    Returns
+    -------
+    tuple[int, list[int]]
+        The number of rows written and the ids of the rows in failed batches.
+    """
+    from .models.anime import Anime
+
+    written, errors = bulk_upsert(
+        db,
+        Anime,
+        (Anime.to_row(anime_id, node) for anime_id, node in nodes.items()),
+        current_app.config['ANIME_UPSERT_BATCH_SIZE']
+    )
+    failed : list[int] = []
+    for error in errors :
+        current_app.logger.warning(f'Anime upsert failed for {len(error["keys"])} rows - {error["message"]} - {error["details"]}')
+        failed.extend(error['keys'])
+    return (written, failed)
+
+def store_anime(ids : list[int],
+                max_workers : int = MAL_BATCH_MAX_WORKERS,
+                client : MALClient | None = None,
+                upsert : Callable[[dict[int, dict[str, Any]]], tuple[int, list[int]]] = upsert_anime
+                ) -> tuple[int, list[int]] :
+    """
+    store_anime (function)
+
+    Fetch the full details of a batch of anime and upsert their rows. Anime
+    MAL no longer knows about are skipped. The lookups bypass the response
+    cache, since the rows are the copy kept. Must be called within an
+    application context.
+
+    Parameters
+    ----------
+    ids : list[int]
+        The anime ids.
+    max_workers : int, optional
+        The maximum number of details lookups running at once.
+        By default MAL_BATCH_MAX_WORKERS.
+    client : MALClient, optional
+        The pooled client used to submit the queries. If not provided, the
+        process-wide client is used. Lookups are always submitted at the
+        BACKGROUND limiter priority.
+        By default None.
+    upsert : Callable[[dict[int, dict[str, Any]]], tuple[int, list[int]]], optional
+        Stores the nodes keyed by anime id and returns the number of rows
+        stored and the ids that could not be stored.
+        By default upsert_anime.
+
+    Returns
+    -------
+    tuple[int, list[int]]
+        The number of rows stored and the ids whose lookups or writes failed.
+
+    Raises
+    ------
+    MALCircuitOpenError
+        MAL became unavailable, nothing from the batch was stored.
+    """
+    nodes : dict[int, dict[str, Any]] = dict()
+    failed : list[int] = []
+    for anime_id, result in fetch_many_details(
+        ids, ANIMEDETAILSNODE_OPTIONAL_ATTRIBUTES, max_workers, client, cache=False
+    ) :
+        if isinstance(result, MALCircuitOpenError) :
+            raise result
+        if isinstance(result, InvalidAnimeDetailsAnimeIdError) :
+            continue
+        if isinstance(result, HTTPError) and result.response is not None and result.response.status_code == 404 :
+            continue
+        if isinstance(result, Exception) :
+            failed.append(anime_id)
+            continue
+        nodes[anime_id] = result.get_attribute_dict()
+    stored, unstored = upsert(nodes)
+    return (stored, sorted(failed + unstored))
+
+class AnimeCrawler :
+    """
+    (class object)
+
+    Mirrors the MAL anime catalog into the anime table. A ranking is walked a
+    page at a time, the full details of every anime on the page are fetched on
+    a bounded worker pool, and the page is written with bulk upserts. After each
+    page the offset of the next page is checkpointed, so a crawl stopped by a
+    crash or deploy resumes from the last stored page instead of the start.
+
+    Upserts are idempotent, so a page stored twice, or an anime seen twice
+    because the ranking shifted between runs, only refreshes its row. Anime
+    whose lookups failed are kept in the checkpoint and retried first on the
+    next run. All MAL traffic is sent at the BACKGROUND limiter priority. Must
+    be run within an application context.
+
+    Parameters
+    ----------
+    ranking_type : str, optional
+        The ranking walked, one of MAL_RANKING_TYPES.
+        By default 'all'.
+    batch_size : int, optional
+        The number of anime on each ranking page.
+        By default 100.
+    max_workers : int, optional
+        The maximum number of details lookups running at once.
+        By default MAL_BATCH_MAX_WORKERS.
+    checkpoint_path : str, optional
+        The checkpoint file.
+        By default CRAWL_CHECKPOINT_PATH.
+    client : MALClient, optional
+        The pooled client used to submit the queries. If not provided, the
+        process-wide client is used.
+        By default None.
+    log : Callable[[str], Any], optional
+        Receives a line of progress after every page.
+        By default print.
+    """
+    def __init__(self,
+                 ranking_type : str = 'all',
+                 batch_size : int = 100,
+                 max_workers : int = MAL_BATCH_MAX_WORKERS,
+                 checkpoint_path : str = CRAWL_CHECKPOINT_PATH,
+                 client : MALClient | None = None,
+                 log : Callable[[str], Any] = print
+                 ) :
+        self.ranking_type : str = ranking_type
+        self.batch_size : int = max(1, batch_size)
+        self.max_workers : int = max(1, max_workers)
+        self.checkpoint_path : str = checkpoint_path
+        self.client : MALClient = (client if client is not None else get_default_client()).with_priority(BACKGROUND)
+        self.log : Callable[[str], Any] = log
+
+    def run(self, max_items : int | None = None, restart : bool = False) -> dict[str, Any] :
+        """
+        run (public method)
+
+        Crawl from the checkpoint until the ranking ends or max_items anime
+        have been walked.
+
+        Parameters
+        ----------
+        max_items : int, optional
+            Stop once this many ranking entries have been walked in this run.
+            If not provided, the whole ranking is walked.
+            By default None.
+        restart : bool, optional
+            Ignore the checkpoint and walk the ranking from the start.
+            By default False.
+
+        Returns
+        -------
+        dict[str, Any]
+            The checkpoint after the run.
+
+        Raises
+        ------
+        MALCircuitOpenError
+            MAL became unavailable. The checkpoint holds the last stored page.
+        HTTPError
+            A ranking page could not be queried.
+        """
+        checkpoint : dict[str, Any] | None = None if restart else load_checkpoint(self.checkpoint_path)
+        if checkpoint is None or checkpoint.get('ranking_type') != self.ranking_type :
+            checkpoint = new_checkpoint(self.ranking_type)
+        elif checkpoint['complete'] and len(checkpoint['failed']) == 0 :
+            self.log(f'The {self.ranking_type} ranking was already crawled, restart to crawl it again')
+            return checkpoint
+        else :
+            self.log(f'Resuming the {self.ranking_type} ranking at offset {checkpoint["offset"]}')
+
+        # retry the lookups that failed in earlier runs first
+        if len(checkpoint['failed']) > 0 :
+            retried : list[int] = checkpoint['failed']
+            stored, checkpoint['failed'] = self.store(retried)
+            _write_checkpoint(checkpoint, self.checkpoint_path)
+            self.log(f'Retried {len(retried)} failed anime, stored {stored}')
+
+        walked : int = 0
+        while not checkpoint['complete'] and (max_items is None or walked < max_items) :
+            limit : int = self.batch_size if max_items is None else min(self.batch_size, max_items - walked)
+            page : dict[str, Any] = fetch_anime_ranking(
+                self.ranking_type, limit, checkpoint['offset'], client=self.client
+            )
+            ids : list[int] = [entry['node']['id'] for entry in page.get('data', [])]
+            stored, failed = self.store(ids)
+
+            walked += len(ids)
+            checkpoint['offset'] += len(ids)
+            checkpoint['failed'].extend(failed)
+            checkpoint['complete'] = len(ids) == 0 or 'next' not in page.get('paging', {})
+            _write_checkpoint(checkpoint, self.checkpoint_path)
+            self.log(
+                f'Offset {checkpoint["offset"]} : stored {stored} of {len(ids)} anime'
+                + (f', {len(failed)} failed' if len(failed) > 0 else '')
+            )
+        return checkpoint
+
+    def store(self, ids : list[int]) -> tuple[int, list[int]] :
+        """
+        store (public method)
+
+        Fetch the full details of a batch of anime and upsert their rows, see
+        store_anime().
+        """
+        return store_anime(ids, self.max_workers, self.client)
+
+def _utc_naive(value : datetime | None) -> datetime | None :
+    """
+    _utc_naive (private function)
+
+    Helper for comparing datetimes with the anime columns, which are stored
+    without a time zone in UTC.
+    """
+    if value is None or value.tzinfo is None :
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+class AnimeDeltaSync :
+    """
+    (class object)
+
+    Brings the anime table up to date with MAL without refetching unchanged
+    titles. A ranking is walked with only id and updated_at requested, which
+    fits MAL_RANKING_MAX_LIMIT anime in one light page, and each page is
+    compared against the stored updated_at column. Full details are fetched
+    and upserted only for anime that are new or were updated on MAL since
+    they were stored, and the cached details of updated anime are dropped.
+    Must be run within an application context.
+
+    Parameters
+    ----------
+    ranking_type : str, optional
+        The ranking walked, one of MAL_RANKING_TYPES.
+        By default 'all'.
+    batch_size : int, optional
+        The number of changed anime fetched and written together.
+        By default 100.
+    max_workers : int, optional
+        The maximum number of details lookups running at once.
+        By default MAL_BATCH_MAX_WORKERS.
+    client : MALClient, optional
+        The pooled client used to submit the queries. If not provided, the
+        process-wide client is used.
+        By default None.
+    log : Callable[[str], Any], optional
+        Receives a line of progress after every page.
+        By default print.
+    """
+    # steps timed by run()
+    STEPS : tuple[str, ...] = ('list', 'compare', 'fetch', 'store')
+
+    def __init__(self,
+                 ranking_type : str = 'all',
+                 batch_size : int = 100,
+                 max_workers : int = MAL_BATCH_MAX_WORKERS,
+                 client : MALClient | None = None,
+                 log : Callable[[str], Any] = print
+                 ) :
+        self.ranking_type : str = ranking_type
+        self.batch_size : int = max(1, batch_size)
+        self.max_workers : int = max(1, max_workers)
+        self.client : MALClient = (client if client is not None else get_default_client()).with_priority(BACKGROUND)
+        self.log : Callable[[str], Any] = log
+
+    def run(self, max_items : int | None = None) -> dict[str, Any] :
+        """
+        run (public method)
+
+        Walk the ranking and sync every page until the ranking ends or
+        max_items anime have been compared.
+
+        Parameters
+        ----------
+        max_items : int, optional
+            Stop once this many ranking entries have been compared. If not
+            provided, the whole ranking is walked.
+            By default None.
+
+        Returns
+        -------
+        dict[str, Any]
+            The report of the run, with the number of anime skipped as
+            unchanged, refreshed, added and failed, and the seconds spent in
+            each of STEPS under timings.
+
+        Raises
+        ------
+        MALCircuitOpenError
+            MAL became unavailable. Pages already synced stay stored.
+        HTTPError
+            A ranking page could not be queried.
+        """
+        report : dict[str, Any] = {
+            'skipped' : 0, 'refreshed' : 0, 'added' : 0, 'failed' : [],
+            'timings' : {step : 0.0 for step in self.STEPS}
+        }
+        timings : dict[str, float] = report['timings']
+
+        offset : int = 0
+        while max_items is None or offset < max_items :
+            limit : int = MAL_RANKING_MAX_LIMIT if max_items is None else min(MAL_RANKING_MAX_LIMIT, max_items - offset)
+            start : float = perf_counter()
+            page : dict[str, Any] = fetch_anime_ranking(
+                self.ranking_type, limit, offset, ['updated_at'], self.client
+            )
+            remote : dict[int, datetime | None] = {
+                entry['node']['id'] : self._remote_updated_at(entry['node']) for entry in page.get('data', [])
+            }
+            timings['list'] += perf_counter() - start
+
+            start = perf_counter()
+            changed, added = self.compare(remote)
+            timings['compare'] += perf_counter() - start
+
+            report['skipped'] += len(remote) - len(changed) - len(added)
+            # a cached node predates the change on MAL, drop it for interactive readers
+            for anime_id in changed :
+                get_default_details_cache().invalidate(anime_id)
+            for ids, key in ((changed, 'refreshed'), (added, 'added')) :
+                for i in range(0, len(ids), self.batch_size) :
+                    stored, failed = self._store(ids[i:i + self.batch_size], timings)
+                    report[key] += stored
+                    report['failed'].extend(failed)
+
+            offset += len(page.get('data', []))
+            self.log(
+                f'Offset {offset} : {len(changed)} changed, {len(added)} new, '
+                f'{len(remote) - len(changed) - len(added)} unchanged'
+            )
+            if len(remote) == 0 or 'next' not in page.get('paging', {}) :
+                break
+        return report
+
+    def compare(self, remote : dict[int, datetime | None]) -> tuple[list[int], list[int]] :
+        """
+        compare (public method)
+
+        Compare the updated_at of a page of anime on MAL with their rows.
+
+        Parameters
+        ----------
+        remote : dict[int, datetime | None]
+            The updated_at of every anime on MAL keyed by anime id.
+
+        Returns
+        -------
+        tuple[list[int], list[int]]
+            The ids of the stored anime that changed on MAL, or have no stored
+            updated_at, and the ids of the anime that are not stored. Anime
+            MAL reports no updated_at for are treated as unchanged.
+        """
+        from .models.anime import Anime
+
+        stored : dict[int, datetime | None] = {
+            row.id : _utc_naive(row.updated_at) for row in db.session.execute(
+                db.select(Anime.id, Anime.updated_at).where(Anime.id.in_(list(remote)))
+            )
+        }
+        changed : list[int] = []
+        added : list[int] = []
+        for anime_id, updated_at in remote.items() :
+            if anime_id not in stored :
+                added.append(anime_id)
+            elif updated_at is not None and (stored[anime_id] is None or updated_at > stored[anime_id]) :
+                changed.append(anime_id)
+        return (changed, added)
+
+    def _store(self, ids : list[int], timings : dict[str, float]) -> tuple[int, list[int]] :
+        """
+        _store (private method)
+
+        Helper for store_anime() that adds its lookup and commit time to
+        timings separately.
+        """
+        commit_time : list[float] = [0.0]
+
+        def _timed_upsert(nodes : dict[int, dict[str, Any]]) -> tuple[int, list[int]] :
+            start : float = perf_counter()
+            try :
+                return upsert_anime(nodes)
+            finally :
+                commit_time[0] += perf_counter() - start
+
+        start : float = perf_counter()
+        result = store_anime(ids, self.max_workers, self.client, _timed_upsert)
+        timings['fetch'] += perf_counter() - start - commit_time[0]
+        timings['store'] += commit_time[0]
+        return result
+
+    @staticmethod
+    def _remote_updated_at(node : dict[str, Any]) -> datetime | None :
+        """
+        _remote_updated_at (private method)
+
+        Helper for converting the updated_at of a MAL node for comparison.
+        """
+        from .models.anime import to_column_value
+
+        return _utc_naive(to_column_value('updated_at', node.get('updated_at')))
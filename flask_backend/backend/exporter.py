@@ -0,0 +1,166 @@
+# native imports
+
+from csv import writer as csv_writer
+from datetime import date, datetime, time, timezone
+from io import StringIO
+from typing import Any, Iterator
+
+# local imports
+
+from .extensions import db
+
+from MAL_api import codec
+
+# export formats with their mimetypes
+EXPORT_FORMATS : dict[str, str] = {
+    'ndjson' : 'application/x-ndjson',
+    'csv' : 'text/csv'
+}
+
+def _json_default(value : Any) -> Any :
+    """
+    _json_default (private function)
+
+    Helper for encoding the datetime columns as ISO 8601 text.
+    """
+    if isinstance(value, (datetime, date, time)) :
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def _csv_value(value : Any) -> Any :
+    """
+    _csv_value (private function)
+
+    Helper for writing a column value in a CSV cell. JSONB values are written
+    as json text and NULL as an empty cell.
+    """
+    if isinstance(value, (dict, list)) :
+        return codec.dumps(value, default=_json_default).decode()
+    if isinstance(value, (datetime, date, time)) :
+        return value.isoformat()
+    return value
+
+def export_columns(columns : list[str] | None = None) -> list[str] :
+    """
+    export_columns (function)
+
+    Verifies the columns projected by an export.
+
+    Parameters
+    ----------
+    columns : list[str], optional
+        The requested columns. If not provided, every column is exported.
+        By default None.
+
+    Returns
+    -------
+    list[str]
+        The columns in the requested order, or in table order when every
+        column is exported.
+
+    Raises
+    ------
+    ValueError
+        A column is not an anime column.
+    """
+    from .models.anime import Anime
+
+    table_columns : list[str] = [column.name for column in Anime.__table__.columns]
+    if not columns :
+        return table_columns
+    unknown : list[str] = [column for column in columns if column not in table_columns]
+    if len(unknown) > 0 :
+        raise ValueError(f'Unknown anime columns: {", ".join(unknown)}')
+    return list(dict.fromkeys(columns))
+
+def parse_since(since : str | None) -> datetime | None :
+    """
+    parse_since (function)
+
+    Parses the since filter of an export, an ISO 8601 date or datetime. A
+    time zone is converted to UTC, which last_refreshed is stored in.
+
+    Raises
+    ------
+    ValueError
+        The value is not an ISO 8601 date or datetime.
+    """
+    if not since :
+        return None
+    value : datetime = datetime.fromisoformat(since.replace('Z', '+00:00'))
+    if value.tzinfo is not None :
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def iter_export(format : str = 'ndjson',
+                columns : list[str] | None = None,
+                since : datetime | None = None,
+                batch_size : int = 1000
+                ) -> Iterator[bytes] :
+    """
+    iter_export (function)
+
+    Stream the anime table in id order as NDJSON or CSV. Rows are read through
+    a server-side cursor batch_size rows at a time, and every batch is encoded
+    into one chunk. The next batch is only fetched once the consumer asks for
+    the next chunk, so a slow consumer holds the cursor back instead of rows
+    piling up in memory. Must be consumed within an application context, and
+    closing the iterator early closes the cursor.
+
+    Parameters
+    ----------
+    format : str, optional
+        One of EXPORT_FORMATS.
+        By default 'ndjson'.
+    columns : list[str], optional
+        The columns exported, see export_columns().
+        By default None.
+    since : datetime, optional
+        Only export rows with last_refreshed at or after this UTC time.
+        By default None.
+    batch_size : int, optional
+        The number of rows fetched and encoded at a time.
+        By default 1000.
+
+    Returns
+    -------
+    Iterator[bytes]
+        The encoded rows, starting with the header line for CSV.
+
+    Raises
+    ------
+    ValueError
+        The format is unknown or a column is not an anime column.
+    """
+    from .models.anime import Anime
+
+    if format not in EXPORT_FORMATS :
+        raise ValueError(f'Unknown export format: {format}')
+    names : list[str] = export_columns(columns)
+
+    stmt = db.select(*[Anime.__table__.c[name] for name in names]).order_by(Anime.id)
+    if since is not None :
+        stmt = stmt.where(Anime.last_refreshed >= since)
+    stmt = stmt.execution_options(yield_per=max(1, batch_size))
+
+    def _chunks() -> Iterator[bytes] :
+        if format == 'csv' :
+            buffer : StringIO = StringIO()
+            csv_writer(buffer).writerow(names)
+            yield buffer.getvalue().encode()
+
+        result = db.session.execute(stmt)
+        try :
+            for rows in result.partitions() :
+                if format == 'ndjson' :
+                    yield b''.join(
+                        codec.dumps(dict(zip(names, row)), default=_json_default) + b'\n' for row in rows
+                    )
+                else :
+                    buffer = StringIO()
+                    csv_writer(buffer).writerows([_csv_value(value) for value in row] for row in rows)
+                    yield buffer.getvalue().encode()
+        finally :
+            result.close()
+
+    return _chunks()
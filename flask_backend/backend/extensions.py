@@ -1,10 +1,16 @@
 # native imports
 
-from flask import Flask
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from flask_wtf import CSRFProtect
+from typing import Any
+
+# local imports
+
+from MAL_api import codec
 
 # database for postgresql
 db : SQLAlchemy = SQLAlchemy()
@@ -51,3 +57,52 @@ def init_csrf(app : Flask) -> None :
         The application being created.
     """
     CSRFProtect(app)
+
+# JSON encoding
+class FastJSONProvider(DefaultJSONProvider) :
+    """
+    (class object)
+
+    A JSON provider encoding responses straight to bytes through the MAL_api
+    codec, which uses orjson when it is installed. Values json cannot encode,
+    such as datetimes, go through the default provider hook, so responses
+    decode to the same values as with the default provider. Without orjson
+    the response bodies are also byte-identical, since ensure_ascii is
+    honored, while dumps() writes compact json. orjson always writes non-ASCII
+    characters, such as Japanese titles, as raw UTF-8 instead of escaping
+    them, so its bytes differ. Calls passing json.dumps or json.loads specific
+    arguments fall back to the default provider.
+    """
+    def dumps(self, obj : Any, **kwargs : Any) -> str :
+        if kwargs :
+            return super().dumps(obj, **kwargs)
+        return codec.dumps(
+            obj, default=self.default, sort_keys=self.sort_keys, ensure_ascii=self.ensure_ascii
+        ).decode()
+
+    def loads(self, s : str | bytes, **kwargs : Any) -> Any :
+        if kwargs :
+            return super().loads(s, **kwargs)
+        return codec.loads(s)
+
+    def response(self, *args : Any, **kwargs : Any) -> Response :
+        obj = self._prepare_response_obj(args, kwargs)
+        indent : bool = (self.compact is None and self._app.debug) or self.compact is False
+        body : bytes = codec.dumps(
+            obj, default=self.default, sort_keys=self.sort_keys, indent=indent, ensure_ascii=self.ensure_ascii
+        )
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+def init_json(app : Flask) -> None :
+    """
+    init_json (function)
+
+    This function replaces the JSON provider of the flask application, so
+    jsonify and request parsing use the fast codec.
+
+    Parameters
+    ----------
+    app : Flask
+        The application being created.
+    """
+    app.json = FastJSONProvider(app)
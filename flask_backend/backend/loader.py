@@ -0,0 +1,220 @@
+# native imports
+
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import JSONB
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator
+
+# local imports
+
+from .extensions import db
+
+from MAL_api import codec
+
+# characters escaped in the COPY text format
+_COPY_ESCAPES : dict[int, str] = str.maketrans({
+    '\\' : '\\\\', '\n' : '\\n', '\r' : '\\r', '\t' : '\\t'
+})
+
+# NULL in the COPY text format
+_COPY_NULL : str = '\\N'
+
+# skipped line numbers kept in a load report
+_MAX_SKIPPED_LINES : int = 1000
+
+def _copy_value(value : Any, is_json : bool) -> str :
+    """
+    _copy_value (private function)
+
+    Helper for writing a column value in the COPY text format.
+    """
+    if value is None :
+        return _COPY_NULL
+    if is_json :
+        text = codec.dumps(value).decode()
+    elif isinstance(value, datetime) :
+        text = value.isoformat()
+    else :
+        text = str(value)
+    if '\\' in text or '\n' in text or '\r' in text or '\t' in text :
+        return text.translate(_COPY_ESCAPES)
+    return text
+
+class _CopyStream :
+    """
+    (class object)
+
+    A read-only file object over lines produced on demand, so COPY can pull a
+    whole dump through without it ever being held in memory.
+    """
+    def __init__(self, lines : Iterable[str]) :
+        self._lines : Iterator[str] = iter(lines)
+        self._buffer : str = ''
+
+    def read(self, size : int = -1) -> str :
+        parts : list[str] = [self._buffer]
+        length : int = len(self._buffer)
+        while size < 0 or length < size :
+            line : str | None = next(self._lines, None)
+            if line is None :
+                break
+            parts.append(line)
+            length += len(line)
+        text : str = ''.join(parts)
+        if size < 0 :
+            self._buffer = ''
+            return text
+        self._buffer = text[size:]
+        return text[:size]
+
+def read_nodes(path : str, report : dict[str, Any]) -> Iterator[tuple[int, dict[str, Any]]] :
+    """
+    read_nodes (function)
+
+    Stream the MAL nodes of an NDJSON dump one line at a time. Every line may
+    be a details node or a list element holding its node under "node". Blank
+    lines are ignored, and lines that are not json or whose node has no id or
+    title are counted in report['skipped'] with the first _MAX_SKIPPED_LINES
+    of their line numbers kept in report['skipped_lines'].
+
+    Parameters
+    ----------
+    path : str
+        The NDJSON file.
+    report : dict[str, Any]
+        The load report being filled in.
+
+    Yields
+    ------
+    tuple[int, dict[str, Any]]
+        The line number paired with the node on it.
+    """
+    with open(path, 'rb') as file :
+        for line_number, line in enumerate(file, start=1) :
+            if not line.strip() :
+                continue
+            report['read'] += 1
+            try :
+                node = codec.loads(line)
+            except ValueError :
+                node = None
+            if isinstance(node, dict) and isinstance(node.get('node'), dict) :
+                node = node['node']
+            if not isinstance(node, dict) or not isinstance(node.get('id'), int) or node.get('title') is None :
+                report['skipped'] += 1
+                if len(report['skipped_lines']) < _MAX_SKIPPED_LINES :
+                    report['skipped_lines'].append(line_number)
+                continue
+            yield (line_number, node)
+
+def load_anime_ndjson(path : str, log : Callable[[str], Any] = print) -> dict[str, Any] :
+    """
+    load_anime_ndjson (function)
+
+    Load an NDJSON dump of MAL nodes into the anime table without the ORM.
+    The file is streamed through COPY into a temporary staging table, with
+    every value converted the way Anime.to_row() converts it, and the staging
+    table is merged into anime with a single statement. As with
+    Anime.apply_node(), an existing row only has the columns present on the
+    line overwritten, so a partial node such as a list element never clears
+    the rest of the row. When an id appears on more than one line, the last
+    line wins. The copy
+    and the merge share one transaction, so a failed load leaves the anime
+    table untouched. Memory use does not grow with the size of the file. Must
+    be called within an application context.
+
+    Parameters
+    ----------
+    path : str
+        The NDJSON file.
+    log : Callable[[str], Any], optional
+        Receives a line of progress after each step.
+        By default print.
+
+    Returns
+    -------
+    dict[str, Any]
+        The report of the load, with the number of lines read, skipped and
+        staged, the number of rows merged into anime split into updated and
+        inserted, the line numbers of the skipped lines and the seconds spent
+        in copy and merge under timings.
+
+    Raises
+    ------
+    psycopg2.Error
+        The copy or merge failed, nothing was loaded.
+    """
+    from .models.anime import Anime
+
+    columns : list[db.Column] = list(Anime.__table__.columns)
+    names : list[str] = [column.name for column in columns]
+    # COPY position and json flag of every column, after the line number
+    positions : dict[str, tuple[int, bool]] = {
+        column.name : (i + 1, isinstance(column.type, JSONB)) for i, column in enumerate(columns)
+    }
+    quoted : str = ', '.join(f'"{name}"' for name in names)
+    # a column keeps its stored value unless the line supplied it
+    updates : str = ', '.join(
+        f'"{name}" = CASE WHEN \'{name}\' = ANY(src."_present") THEN src."{name}" ELSE anime."{name}" END'
+        for name in names if name != 'id'
+    )
+
+    report : dict[str, Any] = {
+        'read' : 0, 'skipped' : 0, 'staged' : 0, 'merged' : 0, 'updated' : 0, 'inserted' : 0,
+        'skipped_lines' : [],
+        'timings' : {'copy' : 0.0, 'merge' : 0.0}
+    }
+
+    def _copy_lines() -> Iterator[str] :
+        nulls : list[str] = [_COPY_NULL] * (len(columns) + 2)
+        for line_number, node in read_nodes(path, report) :
+            # a row only holds the columns on its node, the rest stay NULL
+            values : list[str] = nulls.copy()
+            values[0] = str(line_number)
+            row : dict[str, Any] = Anime.to_row(node['id'], node)
+            for name, value in row.items() :
+                position, is_json = positions[name]
+                values[position] = _copy_value(value, is_json)
+            values[-1] = '{' + ','.join(row) + '}'
+            report['staged'] += 1
+            yield '\t'.join(values) + '\n'
+
+    connection = db.engine.raw_connection()
+    try :
+        cursor = connection.cursor()
+        cursor.execute(
+            f'CREATE TEMP TABLE anime_staging ON COMMIT DROP AS '
+            f'SELECT 0::bigint AS "_line", {quoted}, NULL::text[] AS "_present" FROM anime WITH NO DATA'
+        )
+
+        start : float = perf_counter()
+        cursor.copy_expert(
+            f'COPY anime_staging ("_line", {quoted}, "_present") FROM STDIN',
+            _CopyStream(_copy_lines())
+        )
+        report['timings']['copy'] = perf_counter() - start
+        log(f'Staged {report["staged"]} rows, skipped {report["skipped"]} lines')
+
+        start = perf_counter()
+        cursor.execute(
+            f'WITH src AS ('
+            f'SELECT DISTINCT ON ("id") * FROM anime_staging ORDER BY "id", "_line" DESC'
+            f'), updated AS ('
+            f'UPDATE anime SET {updates} FROM src WHERE anime."id" = src."id" RETURNING anime."id"'
+            f'), inserted AS ('
+            f'INSERT INTO anime ({quoted}) SELECT {quoted} FROM src '
+            f'WHERE NOT EXISTS (SELECT 1 FROM updated WHERE updated."id" = src."id") '
+            f'ON CONFLICT ("id") DO NOTHING RETURNING "id"'
+            f') SELECT (SELECT count(*) FROM updated), (SELECT count(*) FROM inserted)'
+        )
+        report['updated'], report['inserted'] = cursor.fetchone()
+        report['merged'] = report['updated'] + report['inserted']
+        connection.commit()
+        report['timings']['merge'] = perf_counter() - start
+        log(f'Merged {report["merged"]} rows into anime')
+    except Exception :
+        connection.rollback()
+        raise
+    finally :
+        connection.close()
+    return report
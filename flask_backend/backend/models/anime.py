@@ -1,17 +1,79 @@
 # native imports
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from requests import RequestException
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import IntegrityError
+from typing import Any, Callable
 
 # local imports
 
 from .base import BaseModel, db
 
+from MAL_api.client import MALClient
 from MAL_api.MAL_classes import (
     AnimeDetails, AnimeDetailsGetAttributeError, HTTPError,
     InvalidAnimeDetailsAnimeIdError
 )
-from MAL_api.constants import ANIMEDETAILSNODE_ATTRIBUTES
+from MAL_api.constants import (
+    ANIMEDETAILSNODE_ATTRIBUTES,
+    ANIMEDETAILSNODE_OPTIONAL_ATTRIBUTES
+)
+from MAL_api.MAL_exceptions import MALCircuitOpenError
+
+# columns holding MAL datetime strings
+DATETIME_COLUMNS : frozenset[str] = frozenset({
+    'start_date', 'end_date', 'created_at', 'updated_at'
+})
+
+def utc_now() -> datetime :
+    """
+    utc_now (function)
+
+    Helper for returning the current time as stored in the anime columns,
+    which are naive datetimes in UTC.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def to_column_value(attr : str, value : Any) -> Any :
+    """
+    to_column_value (function)
+
+    Helper for converting a value from a MAL node into the value stored in
+    its anime column. MAL dates may be partial ('2005' or '2005-04') and are
+    padded to the first day of the period. Datetimes with a time zone are
+    converted to naive UTC, since the columns have no time zone and Postgres
+    would otherwise shift them into the session time zone.
+
+    Parameters
+    ----------
+    attr : str
+        The column name.
+    value : Any
+        The value from the MAL node.
+
+    Returns
+    -------
+    Any
+        The value to be stored.
+    """
+    if attr not in DATETIME_COLUMNS or value is None :
+        return value
+    if isinstance(value, datetime) :
+        parsed : datetime = value
+    else :
+        text : str = str(value)
+        if len(text) == 4 :
+            text += '-01-01'
+        elif len(text) == 7 :
+            text += '-01'
+        try :
+            parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError :
+            return None
+    if parsed.tzinfo is not None :
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
 
 class Anime(BaseModel):
     """
@@ -151,22 +213,274 @@ class Anime(BaseModel):
         nullable=False,
         onupdate=datetime.now(timezone.utc)
     )
+    refresh_failed_at = db.Column(
+        db.DateTime(),
+        nullable=True
+    )
 
-    def __init__(self, id : int, attrs : list = []) :
+    def __init__(self, id : int, attrs : list = [], node : dict[str, Any] | None = None) :
         # make a call to the MAL API to get the anime details
-        try :
-            anime_data = AnimeDetails(id, attrs)
-        except InvalidAnimeDetailsAnimeIdError :
-            raise Exception(f'Invalid Id: {id}')
-        except HTTPError :
-            raise Exception(f'HTTP Error for Id: {id}')
+        if node is None :
+            try :
+                anime_data = AnimeDetails(id, attrs)
+            except InvalidAnimeDetailsAnimeIdError :
+                raise Exception(f'Invalid Id: {id}')
+            except HTTPError :
+                raise Exception(f'HTTP Error for Id: {id}')
+
+            try :
+                node = anime_data.get_attribute_dict()
+            except AnimeDetailsGetAttributeError :
+                raise Exception(f'Error getting attribute for Id: {id}')
         
         # set the attributes of the Anime object
-        try :
-            for attr, val in anime_data.get_attribute_dict().values() :
-                self.__setattr__(attr, val)
-        except AnimeDetailsGetAttributeError :
-            raise Exception(f'Error getting attribute for Id: {id}')
+        self.id = id
+        self.apply_node(node)
         
     def __repr__(self):
         return f'<Anime {self.title}>'
+
+    def apply_node(self, node : dict[str, Any]) -> None :
+        """
+        apply_node (public method)
+
+        Copy the values of a MAL node into the columns of this row and mark
+        the row as refreshed, clearing any failed refresh. Keys that are not
+        anime columns are ignored.
+
+        Parameters
+        ----------
+        node : dict[str, Any]
+            The node returned by MAL.
+        """
+        for attr, val in node.items() :
+            if attr in ANIMEDETAILSNODE_ATTRIBUTES :
+                self.__setattr__(attr, to_column_value(attr, val))
+        self.last_refreshed = utc_now()
+        self.refresh_failed_at = None
+
+    def is_stale(self, max_age : timedelta) -> bool :
+        """
+        is_stale (public method)
+
+        Helper for checking if the row was refreshed longer than max_age ago.
+
+        Parameters
+        ----------
+        max_age : timedelta
+            The freshness window of a row.
+
+        Returns
+        -------
+        bool
+            True if the row needs refreshed, else False.
+        """
+        if self.last_refreshed is None :
+            return True
+        refreshed : datetime = self.last_refreshed
+        if refreshed.tzinfo is None :
+            # the column is stored without a time zone in UTC
+            refreshed = refreshed.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - refreshed > max_age
+
+    def refresh_backed_off(self, backoff : timedelta) -> bool :
+        """
+        refresh_backed_off (public method)
+
+        Helper for checking if a refresh of the row failed less than backoff
+        ago.
+
+        Parameters
+        ----------
+        backoff : timedelta
+            The wait after a failed refresh.
+
+        Returns
+        -------
+        bool
+            True if the row should not be refreshed yet, else False.
+        """
+        return self.refresh_failed_at is not None and utc_now() - self.refresh_failed_at < backoff
+
+    def to_dict(self) -> dict :
+        """
+        to_dict (public method)
+
+        This is a helper method for returning dictionary objects.
+
+        Returns
+        -------
+        dict
+            json-like object
+        """
+        return {column.name: getattr(self, column.name) for column in self.__table__.columns}
+
+    @classmethod
+    def fetch_node(cls, id : int, client : MALClient | None = None) -> dict[str, Any] :
+        """
+        fetch_node (class method)
+
+        Query MAL for every column of an anime.
+
+        Parameters
+        ----------
+        id : int
+            The anime id.
+        client : MALClient, optional
+            The client used to submit the query.
+            By default None.
+
+        Returns
+        -------
+        dict[str, Any]
+            The node returned by MAL.
+        """
+        return AnimeDetails(id, ANIMEDETAILSNODE_OPTIONAL_ATTRIBUTES, client).get_attribute_dict()
+
+    @classmethod
+    def upsert_node(cls, id : int, node : dict[str, Any]) -> 'Anime' :
+        """
+        upsert_node (class method)
+
+        Insert or update the row of an anime from a MAL node and commit it.
+
+        Parameters
+        ----------
+        id : int
+            The anime id.
+        node : dict[str, Any]
+            The node returned by MAL.
+
+        Returns
+        -------
+        Anime
+            The stored row.
+        """
+        anime = db.session.get(cls, id)
+        if anime is None :
+            anime = cls(id, node=node)
+            db.session.add(anime)
+        else :
+            anime.apply_node(node)
+
+        try :
+            db.session.commit()
+        except IntegrityError :
+            # another worker inserted the row first, update theirs instead
+            db.session.rollback()
+            anime = db.session.get(cls, id)
+            anime.apply_node(node)
+            db.session.commit()
+        return anime
+
+    @classmethod
+    def to_row(cls, id : int, node : dict[str, Any]) -> dict[str, Any] :
+        """
+        to_row (class method)
+
+        Convert a MAL node into the column values of its row, for writers that
+        bypass the ORM such as bulk_upsert(). Keys that are not anime columns
+        are ignored and the row is marked as refreshed, clearing any failed
+        refresh.
+
+        Parameters
+        ----------
+        id : int
+            The anime id.
+        node : dict[str, Any]
+            The node returned by MAL.
+
+        Returns
+        -------
+        dict[str, Any]
+            The column values keyed by column name.
+        """
+        row : dict[str, Any] = {
+            attr : to_column_value(attr, val) for attr, val in node.items() if attr in ANIMEDETAILSNODE_ATTRIBUTES
+        }
+        row['id'] = id
+        row['last_refreshed'] = utc_now()
+        row['refresh_failed_at'] = None
+        return row
+
+    @classmethod
+    def record_refresh_failure(cls, id : int) -> None :
+        """
+        record_refresh_failure (class method)
+
+        Mark the last refresh of an anime as failed and commit it, so the row
+        is backed off instead of being retried on every pass. The stored
+        values and last_refreshed are left as they are.
+
+        Parameters
+        ----------
+        id : int
+            The anime id.
+        """
+        # last_refreshed is set explicitly to keep its onupdate from firing
+        db.session.execute(
+            db.update(cls).where(cls.id == id).values(
+                refresh_failed_at=utc_now(), last_refreshed=cls.last_refreshed
+            )
+        )
+        db.session.commit()
+
+    @classmethod
+    def read_through(cls,
+                     id : int,
+                     max_age : timedelta,
+                     refresh : Callable[[int], Any] | None = None
+                     ) -> 'Anime' :
+        """
+        read_through (class method)
+
+        Serve an anime from the anime table, using it as a read-through cache
+        in front of MAL. A row younger than max_age is returned directly. A
+        missing row is fetched and inserted. A stale row is handed to refresh
+        and returned as is, or refetched and updated when no refresh is given.
+        When MAL cannot be reached the stored row is returned even if it is
+        stale.
+
+        Parameters
+        ----------
+        id : int
+            The anime id.
+        max_age : timedelta
+            The freshness window of a row.
+        refresh : Callable[[int], Any], optional
+            Queues a background refresh of a stale row, so the caller does not
+            wait on MAL.
+            By default None.
+
+        Returns
+        -------
+        Anime
+            The stored row.
+
+        Raises
+        ------
+        HTTPError
+            MAL answered with an error and there is no stored row.
+        InvalidAnimeDetailsAnimeIdError
+            The id is invalid or not in the correct range.
+        MALCircuitOpenError
+            MAL is unavailable and there is no stored row.
+        RequestException
+            MAL could not be reached and there is no stored row.
+        """
+        anime = db.session.get(cls, id)
+        if anime is not None and not anime.is_stale(max_age) :
+            return anime
+
+        # stale while revalidate
+        if anime is not None and refresh is not None :
+            refresh(id)
+            return anime
+
+        try :
+            node = cls.fetch_node(id)
+        except (HTTPError, RequestException, MALCircuitOpenError) :
+            if anime is not None :
+                return anime
+            raise
+        return cls.upsert_node(id, node)
@@ -0,0 +1,270 @@
+# native imports
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from flask import Flask
+from sqlalchemy import Connection
+from sqlalchemy.exc import DBAPIError
+from threading import Event, Lock, Thread
+
+# local imports
+
+from .extensions import db
+
+from MAL_api.client import get_default_client
+from MAL_api.rate_limit import BACKGROUND
+
+# postgres advisory lock held by the one process running the proactive loop
+_PROACTIVE_LOCK_KEY : int = 0x4d414c52
+
+class AnimeRefresher :
+    """
+    (class object)
+
+    Refreshes stored anime rows in the background. Stale rows served on the
+    request path are queued through schedule() and refetched by a small worker
+    pool, and a proactive loop walks the rows closest to expiry, most popular
+    first, so hot titles are refreshed before a request ever sees them stale.
+
+    All MAL traffic from the refresher is sent at the BACKGROUND limiter
+    priority, so it never eats into the budget reserved for user requests.
+
+    A failed refresh is recorded on the row, which is then skipped for
+    ANIME_REFRESH_RETRY_BACKOFF seconds, so an anime MAL no longer serves
+    does not hold the head of the proactive order. Every process of the
+    application starts the loop, but on postgres only the process holding a
+    session advisory lock runs it, so adding workers does not multiply the
+    proactive traffic. Another process takes over once the holder exits.
+    """
+    def __init__(self) :
+        self._app : Flask | None = None
+        self._executor : ThreadPoolExecutor | None = None
+        self._lock : Lock = Lock()
+        self._queued : set[int] = set()
+        self._stop : Event = Event()
+        self._loop : Thread | None = None
+        self._runner : Connection | None = None
+
+    def init_app(self, app : Flask) -> None :
+        """
+        init_app (public method)
+
+        Bind the refresher to the application. The proactive loop starts with
+        the first request so CLI commands such as migrations never start it.
+
+        Parameters
+        ----------
+        app : Flask
+            The application being created.
+        """
+        self._app = app
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, app.config['ANIME_REFRESH_WORKERS']),
+            thread_name_prefix='anime-refresh'
+        )
+        app.before_request(self._start_proactive_loop)
+
+    def schedule(self, anime_id : int) -> bool :
+        """
+        schedule (public method)
+
+        Queue a background refresh of an anime row. A row already queued is
+        not queued twice.
+
+        Parameters
+        ----------
+        anime_id : int
+            The anime id.
+
+        Returns
+        -------
+        bool
+            True if the refresh was queued, else False.
+        """
+        with self._lock :
+            if anime_id in self._queued :
+                return False
+            self._queued.add(anime_id)
+        self._executor.submit(self._refresh, anime_id)
+        return True
+
+    def queue_depth(self) -> int :
+        """
+        queue_depth (public method)
+
+        Helper for returning the number of rows queued or being refreshed.
+        """
+        with self._lock :
+            return len(self._queued)
+
+    def _refresh(self, anime_id : int) -> None :
+        """
+        _refresh (private method)
+
+        Refetch an anime from MAL and update its row. The row is skipped if it
+        was refreshed meanwhile, for example by another process, or if its
+        last refresh failed within ANIME_REFRESH_RETRY_BACKOFF seconds.
+        """
+        from .models.anime import Anime
+
+        config = self._app.config
+        # rows are queued once they come within the proactive lead of expiry
+        due : timedelta = timedelta(seconds=config['ANIME_CACHE_MAX_AGE'] - config['ANIME_PROACTIVE_REFRESH_LEAD'])
+        backoff : timedelta = timedelta(seconds=config['ANIME_REFRESH_RETRY_BACKOFF'])
+        try :
+            with self._app.app_context() :
+                anime = db.session.get(Anime, anime_id)
+                if anime is not None and (not anime.is_stale(due) or anime.refresh_backed_off(backoff)) :
+                    return
+                try :
+                    node = Anime.fetch_node(anime_id, get_default_client().with_priority(BACKGROUND))
+                    Anime.upsert_node(anime_id, node)
+                except Exception :
+                    db.session.rollback()
+                    if anime is not None :
+                        Anime.record_refresh_failure(anime_id)
+                    raise
+        except Exception as err :
+            self._app.logger.warning(f'Background refresh failed for Id: {anime_id} - {err}')
+        finally :
+            with self._lock :
+                self._queued.discard(anime_id)
+
+    def _start_proactive_loop(self) -> None :
+        """
+        _start_proactive_loop (private method)
+
+        Start the proactive loop once, if ANIME_PROACTIVE_REFRESH_INTERVAL is
+        set.
+        """
+        if self._loop is not None or self._app.config['ANIME_PROACTIVE_REFRESH_INTERVAL'] <= 0 :
+            return
+        with self._lock :
+            if self._loop is None :
+                self._loop = Thread(target=self._proactive_loop, name='anime-proactive-refresh', daemon=True)
+                self._loop.start()
+
+    def _proactive_loop(self) -> None :
+        """
+        _proactive_loop (private method)
+
+        Queue the rows closest to expiry every interval until stopped, on the
+        intervals this process holds the runner lock.
+        """
+        interval : int = self._app.config['ANIME_PROACTIVE_REFRESH_INTERVAL']
+        while not self._stop.wait(interval) :
+            try :
+                with self._app.app_context() :
+                    if not self._claim_runner() :
+                        continue
+                    for anime_id in self.expiring_ids() :
+                        self.schedule(anime_id)
+            except Exception as err :
+                self._app.logger.warning(f'Proactive refresh failed - {err}')
+        self._release_runner()
+
+    def _claim_runner(self) -> bool :
+        """
+        _claim_runner (private method)
+
+        Check that this process runs the proactive loop, trying to take the
+        session advisory lock on a dedicated connection if it does not hold it
+        yet. A lost connection loses the lock, so the held connection is
+        pinged first. Other databases run a single process and always claim
+        it. Must be called within an application context.
+
+        Returns
+        -------
+        bool
+            True if this process runs the proactive loop, else False.
+        """
+        if db.engine.dialect.name != 'postgresql' :
+            return True
+        if self._runner is not None :
+            try :
+                self._runner.execute(db.text('SELECT 1'))
+                self._runner.commit()
+                return True
+            except DBAPIError :
+                self._runner.invalidate()
+                self._runner.close()
+                self._runner = None
+
+        connection : Connection = db.engine.connect()
+        try :
+            claimed : bool = connection.execute(
+                db.text('SELECT pg_try_advisory_lock(:key)'), {'key' : _PROACTIVE_LOCK_KEY}
+            ).scalar()
+            connection.commit()
+        except Exception :
+            connection.close()
+            raise
+        if not claimed :
+            connection.close()
+            return False
+        self._runner = connection
+        return True
+
+    def _release_runner(self) -> None :
+        """
+        _release_runner (private method)
+
+        Release the runner lock, if held, so another process takes over the
+        proactive loop.
+        """
+        if self._runner is None :
+            return
+        try :
+            self._runner.execute(db.text('SELECT pg_advisory_unlock(:key)'), {'key' : _PROACTIVE_LOCK_KEY})
+            self._runner.commit()
+        except DBAPIError :
+            self._runner.invalidate()
+        finally :
+            self._runner.close()
+            self._runner = None
+
+    def expiring_ids(self) -> list[int] :
+        """
+        expiring_ids (public method)
+
+        Query the ids of the rows that expire within ANIME_PROACTIVE_REFRESH_LEAD
+        seconds, or already have, ordered by popularity. Rows whose last
+        refresh failed within ANIME_REFRESH_RETRY_BACKOFF seconds are left out.
+        Must be called within an application context.
+
+        Returns
+        -------
+        list[int]
+            At most ANIME_PROACTIVE_REFRESH_BATCH anime ids.
+        """
+        from .models.anime import Anime
+
+        config = self._app.config
+        max_age : timedelta = timedelta(seconds=config['ANIME_CACHE_MAX_AGE'])
+        lead : timedelta = timedelta(seconds=config['ANIME_PROACTIVE_REFRESH_LEAD'])
+        backoff : timedelta = timedelta(seconds=config['ANIME_REFRESH_RETRY_BACKOFF'])
+
+        # last_refreshed is stored without a time zone in UTC
+        now : datetime = datetime.now(timezone.utc).replace(tzinfo=None)
+        cutoff : datetime = now - max_age + lead
+        rows = db.session.execute(
+            db.select(Anime.id)
+            .where(Anime.last_refreshed <= cutoff)
+            .where(db.or_(Anime.refresh_failed_at.is_(None), Anime.refresh_failed_at <= now - backoff))
+            .order_by(Anime.popularity.asc().nulls_last(), Anime.last_refreshed.asc())
+            .limit(config['ANIME_PROACTIVE_REFRESH_BATCH'])
+        )
+        return [row.id for row in rows]
+
+    def stop(self) -> None :
+        """
+        stop (public method)
+
+        Stop the proactive loop and wait for queued refreshes to finish.
+        """
+        self._stop.set()
+        if self._executor is not None :
+            self._executor.shutdown(wait=True)
+
+# refresher for stored anime rows
+refresher : AnimeRefresher = AnimeRefresher()
@@ -4,6 +4,7 @@ from flask import Response, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from os import getenv
 from re import search as rsearch
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import (
     IntegrityError,
     InvalidRequestError,
@@ -11,6 +12,7 @@ from sqlalchemy.exc import (
     DataError,
     OperationalError
 )
+from typing import Any, Iterable
 
 def check_if_id_exists(db : SQLAlchemy, model : object, id : int) -> bool :    
     """
@@ -38,6 +40,79 @@ def check_if_id_exists(db : SQLAlchemy, model : object, id : int) -> bool :
     else :
         return False
 
+def describe_integrity_error(err : StatementError) -> tuple[str, Any] :
+    """
+    describe_integrity_error (function)
+
+    This is a helper function to classify a failed PostgreSQL statement by the
+    psycopg2 violation it raised.
+
+    Parameters
+    ----------
+    err : StatementError
+        The error raised by the statement, holding the psycopg2 error in orig.
+
+    Returns
+    -------
+    tuple[str, Any]
+        The message for the frontend and the attribute in question, which is
+        'ERROR' when it cannot be found.
+    """
+    # violations in accordance to pyycog2 errors
+    msg = None
+    attr_in_question = None
+    if str(err.orig).find('UniqueViolation') >= 0 :
+        # try to get the attr_in_question
+        try :
+            attr_in_question = rsearch(r'Key \((.*?)\)', str(err.orig)).group(1)
+        except :
+            attr_in_question = 'ERROR'
+        
+        msg = "Integrity constraint error caused by unique constraint"
+    elif str(err.orig).find('NotNullViolation') >= 0 :
+        # try to get the attr_in_question
+        try :
+            attr_in_question = rsearch(r'null value in column \"(.*?)\"', str(err.orig)).group(1)
+        except :
+            attr_in_question = 'ERROR'
+
+        msg = "Integrity constraint error caused by not-null constraint"
+    elif str(err.orig).find('ForeignKeyViolation') >= 0 :
+        # try to get the attr_in_question
+        try :
+            attr_in_question = rsearch(r'Key \((.*?)\)', str(err.orig)).group(1)
+        except :
+            attr_in_question = 'ERROR'
+
+        msg = "Integrity constraint error caused by foreign key constraint"
+    elif str(err.orig).find('CheckViolation') >= 0 :
+        # try to get the attr_in_question
+        try :
+            attr_in_question = rsearch(r'value for the column \"(.*?)\"', str(err.orig)).group(1)
+        except :
+            attr_in_question = 'ERROR'
+
+        msg = "Integrity constraint error caused by check constraint"
+    elif str(err.orig).find('ExclusionViolation') >= 0 :
+        # try to get the attr_in_question
+        try :
+            attr_in_question = rsearch(r'Key \((.*?)\)', str(err.orig)).group(1)
+            if attr_in_question.find(', ') >= 0 :
+                attr_in_question = attr_in_question.split(', ')
+        except :
+            attr_in_question = 'ERROR'
+
+        msg = "Integrity constraint error caused by exclusion constraint"
+    elif str(err.orig).find('InvalidTextRepresentation') >= 0 :
+        # attr is not provided so this must be a forum error
+        attr_in_question = 'ERROR'
+        msg = "Integrity constraint error caused by Invalid or incomplete data type conversion"
+    else :
+        attr_in_question = 'ERROR'
+        msg = "An unhandled exception occured please check details."
+
+    return (msg, attr_in_question)
+
 def insert_data_to_session(db : SQLAlchemy, data : object) -> Response :
     """
     insert_data_to_session (function)
@@ -74,58 +149,8 @@ def insert_data_to_session(db : SQLAlchemy, data : object) -> Response :
         db.session.rollback()
 
         # violations in accordance to pyycog2 errors
-        msg = None
-        attr_in_question = None
-        if str(err.orig).find('UniqueViolation') >= 0 :
-            # try to get the attr_in_question
-            try :
-                attr_in_question = rsearch(r'Key \((.*?)\)', str(err.orig)).group(1)
-            except :
-                attr_in_question = 'ERROR'
-            
-            msg = "Integrity constraint error caused by unique constraint"
-        elif str(err.orig).find('NotNullViolation') >= 0 :
-            # try to get the attr_in_question
-            try :
-                attr_in_question = rsearch(r'null value in column \"(.*?)\"', str(err.orig)).group(1)
-            except :
-                attr_in_question = 'ERROR'
-
-            msg = "Integrity constraint error caused by not-null constraint"
-        elif str(err.orig).find('ForeignKeyViolation') >= 0 :
-            # try to get the attr_in_question
-            try :
-                attr_in_question = rsearch(r'Key \((.*?)\)', str(err.orig)).group(1)
-            except :
-                attr_in_question = 'ERROR'
-
-            msg = "Integrity constraint error caused by foreign key constraint"
-        elif str(err.orig).find('CheckViolation') >= 0 :
-            # try to get the attr_in_question
-            try :
-                attr_in_question = rsearch(r'value for the column \"(.*?)\"', str(err.orig)).group(1)
-            except :
-                attr_in_question = 'ERROR'
-
-            msg = "Integrity constraint error caused by check constraint"
-        elif str(err.orig).find('ExclusionViolation') >= 0 :
-            # try to get the attr_in_question
-            try :
-                attr_in_question = rsearch(r'Key \((.*?)\)', str(err.orig)).group(1)
-                if attr_in_question.find(', ') >= 0 :
-                    attr_in_question = attr_in_question.split(', ')
-            except :
-                attr_in_question = 'ERROR'
-
-            msg = "Integrity constraint error caused by exclusion constraint"
-        elif str(err.orig).find('InvalidTextRepresentation') >= 0 :
-            # attr is not provided so this must be a forum error
-            attr_in_question = 'ERROR'
-            msg = "Integrity constraint error caused by Invalid or incomplete data type conversion"
-        else :
-            attr_in_question = 'ERROR'
-            msg = "An unhandled exception occured please check details."
-        
+        msg, attr_in_question = describe_integrity_error(err)
+
         # send out a response for the frontend
         return jsonify(
             {
@@ -141,3 +166,97 @@ def insert_data_to_session(db : SQLAlchemy, data : object) -> Response :
                 'details' : str(err.orig)
             }
         ), 500
+
+def bulk_upsert(db : SQLAlchemy,
+                model : object,
+                rows : Iterable[dict[str, Any]],
+                batch_size : int = 1000,
+                index_elements : tuple[str, ...] = ('id',)
+                ) -> tuple[int, list[dict]] :
+    """
+    bulk_upsert (function)
+
+    This is a helper function to insert or update many rows of a table with
+    PostgreSQL INSERT ... ON CONFLICT DO UPDATE, one statement and one
+    transaction per batch. A row whose key already exists has only the
+    columns given in that row overwritten, so a duplicate updates instead of
+    failing and a row fetched with fewer columns never clears the rest.
+
+    The rows of a batch are grouped by the columns they hold, with one
+    statement per group, so rows of different shapes can be mixed freely.
+    When a key appears more than once in a batch only the last row is
+    written.
+
+    Parameters
+    ----------
+    db : SQLAlchemy
+        The flask database
+    model : object
+        The model class for the table.
+    rows : Iterable[dict[str, Any]]
+        The column values of every row.
+    batch_size : int, optional
+        The number of rows written per statement.
+        By default 1000.
+    index_elements : tuple[str, ...], optional
+        The columns of the unique constraint rows conflict on.
+        By default ('id',).
+
+    Returns
+    -------
+    tuple[int, list[dict]]
+        The number of rows written and a report for every batch that failed,
+        with the keys of its rows under keys alongside the message and details
+        of insert_data_to_session(). A failed batch is rolled back and the
+        remaining batches are still written.
+
+    Raises
+    ------
+    InvalidRequestError
+        The session could not be used.
+    OperationalError
+        The database could not be reached.
+    """
+    written : int = 0
+    errors : list[dict] = []
+    batch : dict[tuple, dict[str, Any]] = dict()
+
+    def _flush() -> None :
+        nonlocal written
+        groups : dict[tuple[str, ...], list[dict[str, Any]]] = dict()
+        for row in batch.values() :
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        try :
+            for columns, params in groups.items() :
+                stmt = pg_insert(model)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(index_elements),
+                    set_={column : stmt.excluded[column] for column in columns if column not in index_elements}
+                )
+                db.session.execute(stmt, params)
+            db.session.commit()
+            written += len(batch)
+        except (InvalidRequestError, OperationalError) :
+            # OperationalError is a StatementError, so it must be caught first
+            db.session.rollback()
+            raise
+        except (IntegrityError, StatementError, DataError) as err :
+            # rollback the session
+            db.session.rollback()
+
+            msg, _ = describe_integrity_error(err)
+            errors.append({
+                'keys' : [key[0] if len(index_elements) == 1 else list(key) for key in batch],
+                'message' : msg,
+                'details' : str(err.orig)
+            })
+        batch.clear()
+
+    for row in rows :
+        batch[tuple(row[column] for column in index_elements)] = row
+        if len(batch) >= batch_size :
+            _flush()
+    if len(batch) > 0 :
+        _flush()
+
+    return (written, errors)
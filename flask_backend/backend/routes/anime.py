@@ -1,22 +1,32 @@
 # native imports
 
-from flask import Blueprint, jsonify, Response, request
+from datetime import timedelta
+from flask import Blueprint, current_app, jsonify, Response, request, stream_with_context
+from requests import HTTPError, RequestException
 
 # local imports
 
+from ..exporter import EXPORT_FORMATS, iter_export, parse_since
 from ..models.anime import Anime
+from ..refresher import refresher
 
-from ._helpers import insert_data_to_session
+from MAL_api.MAL_exceptions import (
+    InvalidAnimeDetailsAnimeIdError,
+    MALCircuitOpenError
+)
 
 # blueprint for module access
 anime : Blueprint = Blueprint('anime', __name__)
 
-@anime.route('/search/anime/<anime_id>', methods=['GET'])
+@anime.route('/search/anime/<int:anime_id>', methods=['GET'])
 def get_anime(anime_id : int) -> Response :
     """
     get_anime (function)
 
     A route to extend queries for accessing anime in the postgresql database.
+    The anime table acts as a read-through cache, so rows younger than
+    ANIME_CACHE_MAX_AGE are served without contacting MAL. Older rows are
+    served as is while a background refresh is queued.
 
     Parameters
     ----------
@@ -28,6 +38,10 @@ def get_anime(anime_id : int) -> Response :
     ~flask.Response
         A response object based on the flask module containing data for the
         anime in the database.
+
+        If the anime is unknown to MAL a 404 code.
+
+        If MAL could not be reached and the anime was never stored a 503 code.
     """
     # check to make sure that the request is json
     if not request.is_json:
@@ -35,5 +49,73 @@ def get_anime(anime_id : int) -> Response :
             "error": "Invalid JSON"
         }), 400
 
-    # add the new anime information to an object
-    anime_data : Anime = Anime(anime_id, )
\ No newline at end of file
+    # serve the anime from the database, refreshing stale rows in the background
+    max_age : timedelta = timedelta(seconds=current_app.config['ANIME_CACHE_MAX_AGE'])
+    try :
+        anime_data : Anime = Anime.read_through(anime_id, max_age, refresher.schedule)
+    except InvalidAnimeDetailsAnimeIdError :
+        return jsonify({
+            "error": f"Invalid Id: {anime_id}"
+        }), 400
+    except HTTPError as err :
+        if err.response is not None and err.response.status_code == 404 :
+            return jsonify({
+                "error": f"Anime not found: {anime_id}"
+            }), 404
+        return jsonify({
+            "error": f"HTTP Error for Id: {anime_id}"
+        }), 502
+    except (RequestException, MALCircuitOpenError) :
+        return jsonify({
+            "error": "MAL is currently unavailable"
+        }), 503
+
+    return jsonify(anime_data.to_dict()), 200
+
+@anime.route('/export/anime', methods=['GET'])
+def export_anime() -> Response :
+    """
+    export_anime (function)
+
+    A route streaming the anime table for bulk analysis. Rows are read through
+    a server-side cursor and sent as they are encoded, so the whole table is
+    never held in memory and a slow client only slows the cursor down.
+
+    Query Parameters
+    ----------------
+    format : str, optional
+        'ndjson' or 'csv'.
+        By default 'ndjson'.
+    columns : str, optional
+        Comma separated anime columns to be exported.
+        By default every column.
+    since : str, optional
+        An ISO 8601 date or datetime, only rows with last_refreshed at or after
+        it are exported.
+
+    Returns
+    -------
+    ~flask.Response
+        A streamed response of the rows in id order.
+
+        If the format, a column or since is invalid a 400 code.
+    """
+    format : str = request.args.get('format', 'ndjson')
+    columns : str | None = request.args.get('columns')
+    try :
+        chunks = iter_export(
+            format,
+            columns.split(',') if columns else None,
+            parse_since(request.args.get('since')),
+            current_app.config['ANIME_EXPORT_BATCH_SIZE']
+        )
+    except ValueError as err :
+        return jsonify({
+            "error": str(err)
+        }), 400
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[format],
+        headers={'Content-Disposition' : f'attachment; filename=anime.{format}'}
+    )
@@ -0,0 +1,69 @@
+"""
+bench_client (benchmark)
+
+Compares per-call connections through the module-level requests.get against
+the pooled, keep-alive MALClient. A local stub server stands in for MAL so the
+numbers only reflect connection handling.
+
+Run from the flask_backend directory :
+
+    python -m benchmarks.bench_client [n_requests]
+"""
+
+# native imports
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from requests import get
+from sys import argv
+from threading import Thread
+from time import perf_counter
+
+# local imports
+
+from MAL_api.client import MALClient
+from MAL_api.rate_limit import TokenBucket
+
+STUB_BODY : bytes = b'{"id": 1, "title": "Cowboy Bebop", "main_picture": {}}'
+
+class _StubHandler(BaseHTTPRequestHandler) :
+    # HTTP/1.1 keeps the connection open between requests
+    protocol_version = 'HTTP/1.1'
+    # headers and body are separate writes, avoid delayed-ACK stalls on reuse
+    disable_nagle_algorithm = True
+
+    def do_GET(self) :
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(STUB_BODY)))
+        self.end_headers()
+        self.wfile.write(STUB_BODY)
+
+    def log_message(self, *args) :
+        pass
+
+def _time_calls(n : int, call) -> float :
+    start = perf_counter()
+    for _ in range(n) :
+        call().json()
+    return perf_counter() - start
+
+def main(n : int) -> None :
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/v2/anime/1'
+
+    try :
+        unpooled = _time_calls(n, lambda : get(url))
+        # an effectively unlimited bucket keeps pacing out of the measurement
+        with MALClient(limiter=TokenBucket(rate=1e9, capacity=n)) as client :
+            pooled = _time_calls(n, lambda : client.get(url))
+    finally :
+        server.shutdown()
+
+    print(f'{n} requests')
+    print(f'requests.get : {unpooled * 1e3 / n:8.3f} ms/request')
+    print(f'MALClient    : {pooled * 1e3 / n:8.3f} ms/request')
+    print(f'speedup      : {unpooled / pooled:8.2f}x')
+
+if __name__ == '__main__' :
+    main(int(argv[1]) if len(argv) > 1 else 2000)
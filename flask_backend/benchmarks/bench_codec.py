@@ -0,0 +1,81 @@
+"""
+bench_codec (benchmark)
+
+Compares the standard library json module against the MAL_api codec on
+payloads shaped like MAL responses: a details node with every optional field
+and a 100 node search page with the heavy list fields. When orjson is not
+installed the codec falls back to json and both columns match.
+
+Run from the flask_backend directory :
+
+    python -m benchmarks.bench_codec [n_rounds]
+"""
+
+# native imports
+
+import json
+from sys import argv
+from time import perf_counter
+
+# local imports
+
+from MAL_api import codec
+
+def _details_node(i : int) -> dict :
+    return {
+        'id' : i, 'title' : f'Anime {i}',
+        'main_picture' : {'medium' : f'https://cdn.myanimelist.net/images/anime/{i}.jpg', 'large' : f'https://cdn.myanimelist.net/images/anime/{i}l.jpg'},
+        'alternative_titles' : {'synonyms' : [f'Synonym {i}', f'Alias {i}'], 'en' : f'English {i}', 'ja' : 'カウボーイビバップ'},
+        'start_date' : '1998-04-03', 'end_date' : '1999-04-24',
+        'synopsis' : 'Crime is timeless. By the year 2071, humanity has expanded across the galaxy. ' * 12,
+        'mean' : 8.75, 'rank' : i, 'popularity' : i * 3, 'num_list_users' : 1771505, 'num_scoring_users' : 919482,
+        'nsfw' : 'white',
+        'genres' : [{'id' : g, 'name' : f'Genre {g}'} for g in range(1, 6)],
+        'created_at' : '2007-02-10T00:00:00+00:00', 'updated_at' : '2023-05-01T12:30:00+00:00',
+        'media_type' : 'tv', 'status' : 'finished_airing', 'num_episodes' : 26,
+        'start_season' : {'year' : 1998, 'season' : 'spring'},
+        'broadcast' : {'day_of_the_week' : 'saturday', 'start_time' : '01:00'},
+        'source' : 'original', 'average_episode_duration' : 1440, 'rating' : 'r',
+        'studios' : [{'id' : 14, 'name' : 'Sunrise'}],
+        'pictures' : [{'medium' : f'https://cdn.myanimelist.net/images/anime/{p}.jpg'} for p in range(8)],
+        'background' : 'When Cowboy Bebop first aired in spring of 1998 on TV Tokyo, only 12 episodes were broadcast. ' * 4,
+        'related_anime' : [{'node' : {'id' : r, 'title' : f'Related {r}'}, 'relation_type' : 'side_story'} for r in range(4)],
+        'related_manga' : [],
+        'recommendations' : [{'node' : {'id' : r, 'title' : f'Recommended {r}'}, 'num_recommendations' : r} for r in range(10)],
+        'statistics' : {'status' : {'watching' : '98183', 'completed' : '1232461'}, 'num_list_users' : 1771505}
+    }
+
+def _list_page() -> dict :
+    list_fields = (
+        'id', 'title', 'main_picture', 'alternative_titles', 'start_date', 'end_date', 'synopsis',
+        'mean', 'rank', 'popularity', 'num_list_users', 'genres', 'media_type', 'status', 'num_episodes'
+    )
+    return {
+        'data' : [{'node' : {k : v for k, v in _details_node(i).items() if k in list_fields}} for i in range(1, 101)],
+        'paging' : {'next' : 'https://api.myanimelist.net/v2/anime?offset=100&q=bebop&limit=100'}
+    }
+
+def _time(n : int, call) -> float :
+    start = perf_counter()
+    for _ in range(n) :
+        call()
+    return (perf_counter() - start) / n
+
+def main(n : int) -> None :
+    payloads : dict[str, dict] = {'details node' : _details_node(1), 'list page' : _list_page()}
+
+    print(f'codec backend : {codec.BACKEND}, {n} rounds')
+    print(f'{"":<22}{"json (us)":>12}{"codec (us)":>12}{"speedup":>10}')
+    for name, payload in payloads.items() :
+        text : str = json.dumps(payload)
+        body : bytes = codec.dumps(payload)
+        for label, slow, fast in (
+            ('loads', lambda : json.loads(text), lambda : codec.loads(body)),
+            ('dumps', lambda : json.dumps(payload).encode(), lambda : codec.dumps(payload))
+        ) :
+            slow_time, fast_time = _time(n, slow) * 1e6, _time(n, fast) * 1e6
+            print(f'{name + " " + label:<22}{slow_time:>12.1f}{fast_time:>12.1f}{slow_time / fast_time:>9.1f}x')
+        print(f'{name + " size":<22}{len(text):>12}{len(body):>12}')
+
+if __name__ == '__main__' :
+    main(int(argv[1]) if len(argv) > 1 else 200)
@@ -0,0 +1,118 @@
+"""
+bench_nodes (benchmark)
+
+Compares attribute access and memory per node between eager and lazy
+slotted AnimeListNode objects and a replica of the previous design, which kept
+every field in the instance __dict__ and rebuilt a list from dir() on each
+attribute read. Memory is reported for the node alone and together with the
+raw node it was built from.
+
+Run from the flask_backend directory :
+
+    python -m benchmarks.bench_nodes [n_nodes]
+"""
+
+# native imports
+
+from functools import partial
+from sys import argv
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+
+# local imports
+
+from MAL_api.constants import ANIME_DEFAULT_ATTRIBUTES, ANIMELISTNODE_OPTIONAL_ATTRIBUTES
+from MAL_api.MAL_classes import AnimeListNode
+from MAL_api.MAL_exceptions import AnimeListNodeGetAttributeError
+
+ATTRIBUTES : list[str] = ANIME_DEFAULT_ATTRIBUTES + ['mean', 'rank', 'popularity', 'num_episodes', 'status']
+
+class _LegacyNode :
+    """
+    (class object)
+
+    The node representation replaced by the slotted AnimeListNode.
+    """
+    def __init__(self, raw_node : dict, attributes : list[str]) :
+        object.__setattr__(self, 'attributes', attributes)
+        object.__setattr__(self, 'raw_node', raw_node)
+        for attribute in attributes :
+            object.__setattr__(self, attribute, raw_node.get(attribute, None))
+
+    def __getattribute__(self, attribute : str) :
+        x_list = ['raw_node', 'attributes', 'get_attribute_dict']
+        x_list = x_list + [
+            method for method in dir(_LegacyNode) if method.startswith("__") and method.endswith("__")
+        ]
+        if attribute in x_list :
+            return super().__getattribute__(attribute)
+        if attribute not in self.attributes :
+            raise AnimeListNodeGetAttributeError(attribute)
+        return super().__getattribute__(attribute)
+
+    def get_attribute_dict(self) -> dict :
+        attr_dict = dict()
+        for attr in self.attributes :
+            attr_dict[attr] = self.__getattribute__(attr)
+        return attr_dict
+
+def _raw_node(i : int) -> dict :
+    return {
+        'id' : i, 'title' : f'Anime {i}', 'main_picture' : {'medium' : 'x', 'large' : 'y'},
+        'mean' : 7.5, 'rank' : i, 'popularity' : i, 'num_episodes' : 12, 'status' : 'finished_airing'
+    }
+
+def _bytes_per_node(cls : type, raw_nodes : list[dict]) -> float :
+    # raw payloads are allocated up front so only the node objects are measured
+    start()
+    nodes = [cls(raw_node, ATTRIBUTES) for raw_node in raw_nodes]
+    current, _ = get_traced_memory()
+    stop()
+    return current / len(nodes)
+
+def _bytes_per_raw_node(n : int) -> float :
+    start()
+    raw_nodes = [_raw_node(i) for i in range(1, n + 1)]
+    current, _ = get_traced_memory()
+    stop()
+    return current / len(raw_nodes)
+
+def _access_time(cls : type, raw_nodes : list[dict]) -> tuple[float, float] :
+    nodes = [cls(raw_node, ATTRIBUTES) for raw_node in raw_nodes]
+
+    begin = perf_counter()
+    for node in nodes :
+        node.mean
+        node.rank
+        node.title
+    reads = (perf_counter() - begin) / (len(nodes) * 3)
+
+    begin = perf_counter()
+    for node in nodes :
+        node.get_attribute_dict()
+    dicts = (perf_counter() - begin) / len(nodes)
+    return (reads, dicts)
+
+def main(n : int) -> None :
+    raw_nodes = [_raw_node(i) for i in range(1, n + 1)]
+
+    builders : dict[str, type] = {
+        'legacy' : _LegacyNode,
+        'eager' : partial(AnimeListNode, lazy=False),
+        'lazy' : partial(AnimeListNode, lazy=True)
+    }
+
+    print(f'{n} nodes, {len(ATTRIBUTES)} attributes each')
+    print(f'{"":<26}' + ''.join(f'{name:>12}' for name in builders))
+
+    times = {name : _access_time(cls, raw_nodes) for name, cls in builders.items()}
+    for label, index in (('attribute read (us)', 0), ('get_attribute_dict (us)', 1)) :
+        print(f'{label:<26}' + ''.join(f'{times[name][index] * 1e6:>12.3f}' for name in builders))
+
+    raw_bytes = _bytes_per_raw_node(n)
+    node_bytes = {name : _bytes_per_node(cls, raw_nodes) for name, cls in builders.items()}
+    print(f'{"bytes per node":<26}' + ''.join(f'{node_bytes[name]:>12.0f}' for name in builders))
+    print(f'{"bytes per node + raw":<26}' + ''.join(f'{node_bytes[name] + raw_bytes:>12.0f}' for name in builders))
+
+if __name__ == '__main__' :
+    main(int(argv[1]) if len(argv) > 1 else 10000)
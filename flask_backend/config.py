@@ -13,3 +13,12 @@ class Config :
         self.SQLALCHEMY_DATABASE_URI : str | None = getenv("DATABASE_URL", None)
         self.SQLALCHEMY_TRACK_MODIFICATIONS : bool = True
         self.SECRET_KEY : str | None = getenv("SECRET_KEY", None)
+        self.ANIME_CACHE_MAX_AGE : int = int(getenv("ANIME_CACHE_MAX_AGE", 86400))
+        self.ANIME_REFRESH_WORKERS : int = int(getenv("ANIME_REFRESH_WORKERS", 2))
+        self.ANIME_PROACTIVE_REFRESH_INTERVAL : int = int(getenv("ANIME_PROACTIVE_REFRESH_INTERVAL", 300))
+        self.ANIME_PROACTIVE_REFRESH_LEAD : int = int(getenv("ANIME_PROACTIVE_REFRESH_LEAD", 3600))
+        self.ANIME_PROACTIVE_REFRESH_BATCH : int = int(getenv("ANIME_PROACTIVE_REFRESH_BATCH", 50))
+        self.ANIME_REFRESH_RETRY_BACKOFF : int = int(getenv("ANIME_REFRESH_RETRY_BACKOFF", 3600))
+        self.ANIME_UPSERT_BATCH_SIZE : int = int(getenv("ANIME_UPSERT_BATCH_SIZE", 1000))
+        self.ANIME_EXPORT_BATCH_SIZE : int = int(getenv("ANIME_EXPORT_BATCH_SIZE", 1000))
+        self.MAL_DISK_CACHE_ENABLED : bool = getenv("MAL_DISK_CACHE_ENABLED", "False").lower() in ('1', 'true', 'yes')